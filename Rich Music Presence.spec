@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('logo.png', '.')],
-    hiddenimports=[],
+    hiddenimports=['main'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -1,15 +1,33 @@
+import os
 import sys
 from pathlib import Path
-from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QIcon
-from ui.main_window import MainWindow
+
+
+def run_daemon(argv):
+    # Background presence service the window attaches to; never loads Qt
+    import main as daemon
+
+    daemon.main(argv)
+
 
 def main():
+    if "--daemon" in sys.argv[1:]:
+        run_daemon([a for a in sys.argv[1:] if a != "--daemon"])
+        return
+
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtGui import QIcon
+    from ui.main_window import MainWindow
+
     app = QApplication(sys.argv)
     icon_path = Path(__file__).resolve().parent / "logo.png"
     if icon_path.exists():
         app.setWindowIcon(QIcon(str(icon_path)))
     app.setQuitOnLastWindowClosed(False)
+    if os.environ.get("RMP_METRICS_PORT"):
+        from core.metrics import serve_metrics
+
+        serve_metrics(int(os.environ["RMP_METRICS_PORT"]))
     win = MainWindow()
     win.show()
     app.aboutToQuit.connect(win._stop_worker)
@@ -0,0 +1,168 @@
+# bench/arbitration.py
+"""
+Source arbitration: SourceAggregator with fake sources whose reads sleep
+for an injected latency. Real time.
+
+  isolation  a source whose reads take 1.5 s next to one polled every
+             0.1 s; the fast source's samples must keep their cadence
+             (no gap much longer than its poll) while the slow one reads
+  playing    a playing source beats a paused one of higher priority
+  priority   of two playing sources the higher priority is active, and
+             the other takes over when it pauses
+
+Exit status is 1 when a check fails.
+
+    python -m bench.arbitration --out arbitration.json
+"""
+import argparse
+import json
+import sys
+import time
+
+from core.models import NowPlaying
+from core.sources import Source, SourceAggregator
+
+POLL = 0.1
+SLOW_READ = 1.5
+# Longest gap allowed between two samples of the fast source
+GAP_BUDGET = 0.3
+
+
+class SleepyPlayer:
+    """read() sleeps `latency` seconds, then returns `np`; counts its reads."""
+
+    def __init__(self, np, latency: float = 0.0):
+        self.np = np
+        self.latency = latency
+        self.read_at = []
+
+    def read(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.read_at.append(time.monotonic())
+        return self.np
+
+
+def track(title: str, playing: bool = True) -> NowPlaying:
+    return NowPlaying(title, "Arbitration Artist", "Arbitration Album", 300.0, 5.0, playing)
+
+
+def aggregator(players: dict) -> SourceAggregator:
+    sources = [
+        Source(name, player.read, priority=priority, poll_seconds=POLL, timeout=5.0)
+        for name, (player, priority) in players.items()
+    ]
+    return SourceAggregator(sources, cadence=POLL)
+
+
+def until(predicate, timeout: float) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def active_title(agg: SourceAggregator):
+    np = agg.current()
+    return np.title if np else None
+
+
+def isolation(seconds: float) -> dict:
+    slow = SleepyPlayer(track("Slow Track"), latency=SLOW_READ)
+    fast = SleepyPlayer(track("Fast Track"))
+    agg = aggregator({"slow": (slow, 10), "fast": (fast, 0)})
+    agg.start()
+    try:
+        first_fast = until(lambda: active_title(agg) == "Fast Track", 1.0)
+        time.sleep(seconds)
+        # Once its first read lands, the slow source outranks the fast one
+        slow_took_over = until(lambda: active_title(agg) == "Slow Track", SLOW_READ + 1.0)
+    finally:
+        agg.stop()
+    reads = list(fast.read_at)
+    gaps = [b - a for a, b in zip(reads, reads[1:])]
+    return {
+        "fast_reads": len(reads),
+        "slow_reads": len(slow.read_at),
+        "fast_first_while_slow_reads": first_fast,
+        "fast_max_gap_s": round(max(gaps), 3) if gaps else None,
+        "slow_took_over": slow_took_over,
+    }
+
+
+def playing_beats_paused() -> dict:
+    paused = SleepyPlayer(track("Paused Track", playing=False))
+    playing = SleepyPlayer(track("Playing Track"), latency=0.2)
+    agg = aggregator({"paused": (paused, 10), "playing": (playing, 0)})
+    agg.start()
+    try:
+        shown = until(lambda: active_title(agg) == "Playing Track", 2.0)
+        settled = active_title(agg)
+        time.sleep(0.5)
+        held = active_title(agg)
+    finally:
+        agg.stop()
+    return {"playing_shown": shown, "settled": settled, "held": held}
+
+
+def priority() -> dict:
+    high = SleepyPlayer(track("High Track"), latency=0.05)
+    low = SleepyPlayer(track("Low Track"))
+    agg = aggregator({"high": (high, 10), "low": (low, 0)})
+    agg.start()
+    try:
+        high_shown = until(lambda: active_title(agg) == "High Track", 2.0)
+        time.sleep(0.5)
+        held = active_title(agg)
+        high.np = track("High Track", playing=False)
+        low_took_over = until(lambda: active_title(agg) == "Low Track", 2.0)
+    finally:
+        agg.stop()
+    return {"high_shown": high_shown, "held": held, "low_after_high_paused": low_took_over}
+
+
+def run(seconds: float) -> dict:
+    results = {
+        "isolation": isolation(seconds),
+        "playing": playing_beats_paused(),
+        "priority": priority(),
+    }
+    i, p, r = results["isolation"], results["playing"], results["priority"]
+    checks = {
+        "fast_not_delayed": i["fast_first_while_slow_reads"] and i["fast_max_gap_s"] is not None
+        and i["fast_max_gap_s"] <= GAP_BUDGET,
+        "slow_still_read": i["slow_reads"] >= 1 and i["slow_took_over"],
+        "playing_beats_paused": p["playing_shown"] and p["held"] == "Playing Track",
+        "priority_wins": r["high_shown"] and r["held"] == "High Track",
+        "priority_falls_back": r["low_after_high_paused"],
+    }
+    return {
+        "benchmark": "arbitration",
+        "unit": "s",
+        "config": {"poll": POLL, "slow_read": SLOW_READ, "seconds": seconds},
+        "results": results,
+        "budgets": {"fast_max_gap_s": GAP_BUDGET},
+        "checks": checks,
+        "passed": all(checks.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3.0, help="how long the slow source reads alongside")
+    parser.add_argument("--out", help="write JSON results here")
+    args = parser.parse_args()
+
+    result = run(args.seconds)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
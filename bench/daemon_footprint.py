@@ -0,0 +1,197 @@
+# bench/daemon_footprint.py
+"""
+Footprint of the headless daemon (main.py) against local stand-ins.
+
+Spawns the daemon's serve() in a child process with a pushed source, a fake
+Discord IPC endpoint and a fake iTunes server, and measures:
+
+  rss_mb            resident set size once warmed up
+  cpu_playing_pct   CPU while a track changes every few seconds
+  cpu_idle_pct      CPU once nothing is playing
+  shutdown_s        SIGTERM -> exit, and whether the presence was cleared
+  qt_loaded         whether any PySide6 module got imported (must be false)
+  samples           NowPlaying samples carry no __dict__ (slots) and
+                    survive a pickle round trip (process pools)
+
+Exit status is 1 when a budget is exceeded.
+
+    python -m bench.daemon_footprint --out footprint.json
+"""
+import argparse
+import json
+import os
+import pickle
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+BUDGETS = {
+    "rss_mb": 48.0,
+    "cpu_playing_pct": 2.0,
+    "cpu_idle_pct": 0.5,
+    "shutdown_s": 3.0,
+}
+
+
+def proc_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status", "r") as fh:
+        for line in fh:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def proc_cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat", "r") as fh:
+        fields = fh.read().rsplit(")", 1)[1].split()
+    # utime and stime are fields 14 and 15 (1-based, counting pid and comm)
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def child(ipc_path: str, itunes_url: str, play: float, idle: float, track_seconds: float):
+    """Runs inside the daemon process."""
+    import asyncio
+    import functools
+    import threading
+
+    import main as daemon
+    from core import itunes_lookup
+    from core.discord_rpc import connect_to_discord
+    from core.engine import PresenceEngine
+    from core.models import NowPlaying
+    from core.settings import SETTINGS
+    from core.sources import Source, SourceAggregator
+
+    itunes_lookup.ITUNES_API = itunes_url
+    aggregator = SourceAggregator([Source("bench")])
+    engine = PresenceEngine(
+        sources=aggregator, poll_seconds=SETTINGS.profile.poll_background, connect=functools.partial(connect_to_discord, ipc_path)
+    )
+    daemon.configure_logging(quiet=True)
+    daemon.log_events(engine)
+
+    def track(i: int) -> NowPlaying:
+        return NowPlaying(f"Footprint {i % 20}", "Bench Artist", "Bench Album", 240.0, 0.0, True)
+
+    def feed():
+        # Track changes, then nothing playing, then one track left on for shutdown
+        end = time.monotonic() + play
+        i = 0
+        while time.monotonic() < end:
+            aggregator.push("bench", track(i))
+            i += 1
+            time.sleep(track_seconds)
+        aggregator.push("bench", None)
+        time.sleep(idle + 2.0)
+        aggregator.push("bench", track(i))
+
+    threading.Thread(target=feed, daemon=True).start()
+    asyncio.run(daemon.serve(engine, control_path=os.path.join(os.path.dirname(ipc_path), "daemon.json")))
+    sample = NowPlaying("Footprint", "Bench Artist", "Bench Album", 240.0, 0.0, True, "bench", "ABC123")
+    copy = pickle.loads(pickle.dumps(sample))
+    print(json.dumps({
+        "qt_loaded": any(m.startswith("PySide6") for m in sys.modules),
+        "samples_slotted": not hasattr(sample, "__dict__"),
+        "samples_pickle": copy == sample and copy.track_id == sample.track_id,
+    }), flush=True)
+
+
+def run(warmup: float, play: float, idle: float, track_seconds: float) -> dict:
+    from bench.fake_discord import FakeDiscord
+    from bench.fake_itunes import FakeITunes
+
+    itunes = FakeITunes()
+    for i in range(20):
+        itunes.add_track(f"Footprint {i}", "Bench Artist", "Bench Album")
+    itunes.start()
+    ipc_path = os.path.join(tempfile.mkdtemp(prefix="rmp-footprint-"), "discord-ipc-0")
+    # No rate limit: this measures our cost, not Discord's throttling
+    discord = FakeDiscord(ipc_path, rate_limit=None)
+    discord.serve_in_thread()
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "bench.daemon_footprint", "--child",
+         ipc_path, itunes.url, str(play), str(idle), str(track_seconds)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        time.sleep(warmup)
+        cpu0, t0 = proc_cpu_seconds(proc.pid), time.monotonic()
+        time.sleep(max(0.0, play - warmup))
+        cpu1, t1 = proc_cpu_seconds(proc.pid), time.monotonic()
+        rss = proc_rss_mb(proc.pid)
+
+        time.sleep(1.0)  # let the clear go out
+        cpu2, t2 = proc_cpu_seconds(proc.pid), time.monotonic()
+        time.sleep(idle)
+        cpu3, t3 = proc_cpu_seconds(proc.pid), time.monotonic()
+
+        # The child starts a track again; shutdown must clear it
+        time.sleep(4.0)
+        shown = discord.last_activity is not None
+        updates_before = len(discord.activities)
+        proc.send_signal(signal.SIGTERM)
+        stop_at = time.monotonic()
+        out, _ = proc.communicate(timeout=10)
+        shutdown = time.monotonic() - stop_at
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        discord.shutdown_thread()
+        itunes.stop()
+
+    child_report = json.loads(out.strip().splitlines()[-1]) if out.strip() else {}
+    metrics = {
+        "rss_mb": round(rss, 1),
+        "cpu_playing_pct": round(100 * (cpu1 - cpu0) / max(1e-9, t1 - t0), 3),
+        "cpu_idle_pct": round(100 * (cpu3 - cpu2) / max(1e-9, t3 - t2), 3),
+        "shutdown_s": round(shutdown, 3),
+    }
+    checks = {key: metrics[key] <= budget for key, budget in BUDGETS.items()}
+    checks["qt_not_loaded"] = child_report.get("qt_loaded") is False
+    checks["samples_slotted"] = child_report.get("samples_slotted") is True
+    checks["samples_pickle"] = child_report.get("samples_pickle") is True
+    checks["exit_code_zero"] = proc.returncode == 0
+    checks["presence_cleared_on_sigterm"] = shown and discord.last_activity is None
+    return {
+        "benchmark": "daemon_footprint",
+        "config": {"warmup_s": warmup, "play_s": play, "idle_s": idle, "track_seconds": track_seconds},
+        "metrics": metrics,
+        "budgets": BUDGETS,
+        "counts": {
+            "rpc_updates": updates_before,
+            "itunes_requests": itunes.requests,
+        },
+        "checks": checks,
+        "passed": all(checks.values()),
+    }
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        ipc_path, itunes_url, play, idle, track_seconds = sys.argv[2:7]
+        child(ipc_path, itunes_url, float(play), float(idle), float(track_seconds))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--warmup", type=float, default=10.0)
+    parser.add_argument("--play", type=float, default=40.0, help="seconds of track changes (includes warm-up)")
+    parser.add_argument("--idle", type=float, default=30.0, help="seconds of nothing playing")
+    parser.add_argument("--track-seconds", type=float, default=5.0)
+    parser.add_argument("--out", help="write JSON results here")
+    args = parser.parse_args()
+
+    result = run(args.warmup, args.play, args.idle, args.track_seconds)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# bench/discord_faults.py
+"""
+Discord faults: the real PresenceEngine + DiscordSupervisor and the native
+IPC client against bench/fake_discord.py, with a pushed fake source and the
+counting lookup from bench/replay.py. Real time.
+
+  restart     Discord quits (the server stops and drops the client) and
+              comes back; the presence must be replayed to the new
+              instance within --budget seconds of it listening again
+  disconnect  Discord drops every client but keeps listening; the engine
+              must reconnect and replay within --budget seconds
+  rate_limit  Discord rejects updates beyond a few per window while tracks
+              change quickly; SET_ACTIVITY attempts (rejected ones
+              included) must stay inside the engine's token bucket, and the
+              latest track must be shown once Discord accepts again
+  no_ack      Discord stops answering SET_ACTIVITY; the call must time out
+              (RPC_TIMEOUT, shortened here), the status must say so, and
+              the latest track must be shown once Discord answers again
+
+The replayed activity must be the one shown before the outage.
+Exit status is 1 when a check fails.
+
+    python -m bench.discord_faults --out discord.json
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import tempfile
+import time
+
+from bench.fake_discord import FakeDiscord
+from bench.replay import CountingLookup
+from core import engine as engine_module
+from core.clock import SYSTEM_CLOCK
+from core.discord_rpc import connect_to_discord
+from core.engine import PresenceEngine
+from core.models import NowPlaying
+from core.publisher import RATE_LIMIT_UPDATES, RATE_LIMIT_WINDOW
+from core.sources import Source, SourceAggregator
+
+POLL = 0.1
+BUDGET = 1.0
+RPC_TIMEOUT = 1.0
+
+
+class Harness:
+    """Engine on this loop, FakeDiscord on the same loop at a temp path."""
+
+    def __init__(self, **fake_options):
+        self.path = os.path.join(tempfile.mkdtemp(prefix="rmp-discord-"), "discord-ipc-0")
+        self.discord = FakeDiscord(self.path, **fake_options)
+        self.aggregator = SourceAggregator([Source("bench")], cadence=POLL)
+        self.engine = PresenceEngine(
+            sources=self.aggregator, poll_seconds=POLL,
+            connect=functools.partial(connect_to_discord, self.path),
+            lookup=CountingLookup(SYSTEM_CLOCK, latency=0.0),
+        )
+        self.statuses = []
+        self.engine.add_listener(self._on_event)
+        self._task = None
+
+    def _on_event(self, event, data):
+        if event == "status":
+            self.statuses.append(data)
+
+    async def __aenter__(self):
+        await self.discord.start()
+        self._task = asyncio.create_task(self.engine.run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self.engine.stop()
+        await self._task
+        await self.discord.stop()
+        try:
+            os.remove(self.path)
+            os.rmdir(os.path.dirname(self.path))
+        except OSError:
+            pass
+
+    def play(self, title: str):
+        self.aggregator.push("bench", NowPlaying(title, "Fault Artist", "Fault Album", 600.0, 10.0, True))
+
+    def details_since(self, since: float) -> list:
+        return [(t, (a or {}).get("details")) for t, a in self.discord.activities if t >= since]
+
+    async def until(self, predicate, timeout: float):
+        """Seconds until predicate() holds, or None."""
+        start = time.monotonic()
+        while time.monotonic() - start < timeout:
+            if predicate():
+                return time.monotonic() - start
+            await asyncio.sleep(0.005)
+        return None
+
+
+async def shown(h: Harness, title: str) -> bool:
+    h.play(title)
+    return await h.until(lambda: any(d == title for _, d in h.details_since(0)), 5.0) is not None
+
+
+async def restart(down: float) -> dict:
+    async with Harness() as h:
+        started = await shown(h, "Before Restart")
+        handshakes = h.discord.handshakes
+        await h.discord.stop()
+        await asyncio.sleep(down)
+        await h.discord.start()
+        back_at = time.monotonic()
+        await h.until(lambda: h.details_since(back_at), BUDGET * 5)
+        replayed = h.details_since(back_at)
+        return {
+            "started": started,
+            "replay_s": round(replayed[0][0] - back_at, 3) if replayed else None,
+            "replayed": replayed[0][1] if replayed else None,
+            "reconnected": h.discord.handshakes > handshakes,
+        }
+
+
+async def disconnect() -> dict:
+    async with Harness() as h:
+        started = await shown(h, "Before Drop")
+        handshakes = h.discord.handshakes
+        h.discord.disconnect_all()
+        dropped_at = time.monotonic()
+        await h.until(lambda: h.details_since(dropped_at), BUDGET * 5)
+        replayed = h.details_since(dropped_at)
+        return {
+            "started": started,
+            "replay_s": round(replayed[0][0] - dropped_at, 3) if replayed else None,
+            "replayed": replayed[0][1] if replayed else None,
+            "reconnected": h.discord.handshakes > handshakes,
+        }
+
+
+async def rate_limit(seconds: float) -> dict:
+    async with Harness(rate_limit=(3, 4.0)) as h:
+        started_at = time.monotonic()
+        n = 0
+        while time.monotonic() - started_at < seconds:
+            n += 1
+            h.play(f"Burst Track {n}")
+            await asyncio.sleep(0.25)
+        elapsed = time.monotonic() - started_at
+        attempts = sum(1 for t in h.discord.attempts if t >= started_at)
+        last = f"Burst Track {n}"
+        caught_up = await h.until(lambda: (h.discord.last_activity or {}).get("details") == last, 15.0)
+        return {
+            "tracks": n,
+            "attempts": attempts,
+            # What the bucket lets through in that time, plus one in flight
+            "allowed": int(RATE_LIMIT_UPDATES + elapsed * RATE_LIMIT_UPDATES / RATE_LIMIT_WINDOW) + 1,
+            "rejected": h.discord.errors,
+            "caught_up_s": round(caught_up, 3) if caught_up is not None else None,
+        }
+
+
+async def no_ack() -> dict:
+    async with Harness() as h:
+        started = await shown(h, "Answered")
+        h.discord.silent = True
+        h.play("Unanswered")
+        reported = await h.until(lambda: any("didn't answer" in s for s in h.statuses), RPC_TIMEOUT * 5)
+        h.discord.silent = False
+        answering_at = time.monotonic()
+        back = await h.until(lambda: any(d == "Unanswered" for _, d in h.details_since(answering_at)), 15.0)
+        return {
+            "started": started,
+            "reported_s": round(reported, 3) if reported is not None else None,
+            "shown_after_s": round(back, 3) if back is not None else None,
+        }
+
+
+async def run(down: float, budget: float, burst: float) -> dict:
+    engine_module.RPC_TIMEOUT = RPC_TIMEOUT
+    results = {
+        "restart": await restart(down),
+        "disconnect": await disconnect(),
+        "rate_limit": await rate_limit(burst),
+        "no_ack": await no_ack(),
+    }
+    r, d = results["restart"], results["disconnect"]
+    rl, na = results["rate_limit"], results["no_ack"]
+    checks = {
+        "restart_replayed": r["started"] and r["reconnected"] and r["replayed"] == "Before Restart",
+        "restart_within_budget": r["replay_s"] is not None and r["replay_s"] <= budget,
+        "disconnect_replayed": d["started"] and d["reconnected"] and d["replayed"] == "Before Drop",
+        "disconnect_within_budget": d["replay_s"] is not None and d["replay_s"] <= budget,
+        "rate_limit_exercised": rl["rejected"] >= 1,
+        "rate_limit_paced": rl["attempts"] <= rl["allowed"],
+        "rate_limit_caught_up": rl["caught_up_s"] is not None,
+        "no_ack_reported": na["started"] and na["reported_s"] is not None,
+        "no_ack_recovers": na["shown_after_s"] is not None,
+    }
+    return {
+        "benchmark": "discord_faults",
+        "unit": "s",
+        "config": {"poll": POLL, "down": down, "burst": burst, "rpc_timeout": RPC_TIMEOUT},
+        "results": results,
+        "budgets": {"replay_s": budget},
+        "checks": checks,
+        "passed": all(checks.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--down", type=float, default=3.0, help="seconds Discord stays quit")
+    parser.add_argument("--budget", type=float, default=BUDGET, help="replay deadline, seconds")
+    parser.add_argument("--burst", type=float, default=8.0, help="seconds of rapid track changes")
+    parser.add_argument("--out", help="write JSON results here")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.down, args.budget, args.burst))
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
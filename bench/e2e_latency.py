@@ -0,0 +1,206 @@
+# bench/e2e_latency.py
+"""
+End-to-end latency of the real PresenceWorker + lookup code against local
+stand-ins: a pushed fake source, a fake iTunes HTTP server and a fake
+Discord IPC endpoint. Runs headless (offscreen Qt).
+
+Measures, as p50/p95/p99 in ms:
+  track_to_presence     track change -> first SET_ACTIVITY for it
+  artwork_in_presence   track change -> first SET_ACTIVITY carrying its artwork
+  artwork_in_ui         track change -> artwork painted in MainWindow
+  tick_overhead         time spent in one engine tick (excluding the sleep)
+
+With --album-tracks N, tracks come in albums of N played in order, so the
+counts show what album priming saves (one search + one album lookup per
+album instead of a search per track).
+
+    python -m bench.e2e_latency --out e2e.json [--compare baseline.json]
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from bench.fake_discord import FakeDiscord
+from bench.fake_itunes import FakeITunes
+from bench.stats import compare, summarize
+from core import itunes_lookup
+from core.discord_rpc import connect_to_discord
+from core.models import NowPlaying
+from core.sources import Source, SourceAggregator
+
+
+def run(iterations: int, interval: float, itunes_latency: float, discord_latency: float, ui: bool,
+        album_tracks: int = 1) -> dict:
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+
+    itunes = FakeITunes(latency=itunes_latency)
+    itunes.start()
+    itunes_lookup.ITUNES_API = itunes.url
+    # The whole catalogue up front, so album lookups list every track
+    album_tracks = max(1, album_tracks)
+    playlist = []
+    for i in range(iterations):
+        title, album = f"Bench Track {i:03d}", f"Bench Album {i // album_tracks:03d}"
+        itunes.add_track(title, "Bench Artist", album, collection_id=500000 + i // album_tracks,
+                         track_number=i % album_tracks + 1)
+        playlist.append((title, album))
+
+    ipc_path = os.path.join(tempfile.mkdtemp(prefix="rmp-bench-"), "discord-ipc-0")
+    discord = FakeDiscord(ipc_path, latency=discord_latency)
+    discord.serve_in_thread()
+
+    aggregator = SourceAggregator([Source("bench")])
+    options = {
+        "sources": aggregator,
+        "connect": functools.partial(connect_to_discord, ipc_path),
+    }
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    win = None
+    if ui:
+        from ui.main_window import MainWindow
+
+        win = MainWindow(worker_options=options)
+        win.show()
+        win._start_worker()
+        # As after Connect: the dashboard is only filled once it is shown
+        win._switch_page(win._dashboard())
+        worker = win.worker
+    else:
+        from ui.worker import PresenceWorker
+
+        worker = PresenceWorker(poll_seconds=1, **options)
+        worker.start()
+
+    # Per-tick overhead: wrap the engine's tick (the sleep happens outside it)
+    tick_times = []
+    engine = worker.engine
+    inner_tick = engine._tick
+
+    async def timed_tick():
+        t = time.perf_counter()
+        try:
+            return await inner_tick()
+        finally:
+            tick_times.append(time.perf_counter() - t)
+
+    engine._tick = timed_tick
+
+    tracks = {}  # title -> {"t0", "presence", "art_presence", "art_ui"}
+    seen_activities = [0]
+
+    def on_now_playing(d: dict):
+        # Connected after MainWindow's slots, so cached artwork is already painted
+        rec = tracks.get(d.get("title"))
+        if not rec or "art_ui" in rec or not d.get("artwork_url"):
+            return
+        if win is None or (win._artwork_url == d["artwork_url"] and win._artwork_pixmap is not None):
+            rec["art_ui"] = time.monotonic()
+
+    worker.now_playing.connect(on_now_playing)
+    if win is not None:
+        # Artwork the cache didn't have is painted when its download lands
+        win._artwork_fetcher.fetched.connect(lambda *_: on_now_playing(win._last_np or {}))
+
+    def scan_discord():
+        acts = discord.activities
+        while seen_activities[0] < len(acts):
+            t, activity = acts[seen_activities[0]]
+            seen_activities[0] += 1
+            rec = tracks.get((activity or {}).get("details"))
+            if not rec:
+                continue
+            rec.setdefault("presence", t)
+            if (activity.get("assets") or {}).get("large_image", "").startswith(itunes.url):
+                rec.setdefault("art_presence", t)
+
+    def push(i: int):
+        title, album = playlist[i]
+        tracks[title] = {"t0": time.monotonic()}
+        aggregator.push("bench", NowPlaying(title, "Bench Artist", album, 200.0, 0.0, True))
+
+    scanner = QTimer()
+    scanner.timeout.connect(scan_discord)
+    scanner.start(2)
+
+    warmup = 1.0
+    for i in range(iterations):
+        QTimer.singleShot(int((warmup + i * interval) * 1000), functools.partial(push, i))
+    QTimer.singleShot(int((warmup + iterations * interval + 1.0) * 1000), app.quit)
+    app.exec()
+
+    scanner.stop()
+    scan_discord()
+    worker.stop()
+    worker.wait(3000)
+    discord.shutdown_thread()
+    itunes.stop()
+
+    def deltas(key):
+        return [rec[key] - rec["t0"] for rec in tracks.values() if key in rec]
+
+    metrics = {
+        "track_to_presence": summarize(deltas("presence")),
+        "artwork_in_presence": summarize(deltas("art_presence")),
+        "tick_overhead": summarize(tick_times),
+    }
+    if ui:
+        metrics["artwork_in_ui"] = summarize(deltas("art_ui"))
+
+    return {
+        "benchmark": "e2e_latency",
+        "unit": "ms",
+        "config": {
+            "iterations": iterations,
+            "interval_s": interval,
+            "itunes_latency_s": itunes_latency,
+            "discord_latency_s": discord_latency,
+            "ui": ui,
+            "album_tracks": album_tracks,
+        },
+        "metrics": metrics,
+        "counts": {
+            "rpc_updates": len(discord.activities),
+            "itunes_requests": itunes.requests,
+            "itunes_searches": itunes.searches,
+            "itunes_album_lookups": itunes.lookups,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=15)
+    # Discord allows ~5 updates per 20 s; 4 s per track stays inside that
+    parser.add_argument("--interval", type=float, default=4.0, help="seconds between track changes")
+    parser.add_argument("--itunes-latency", type=float, default=0.15)
+    parser.add_argument("--discord-latency", type=float, default=0.005)
+    parser.add_argument("--no-ui", action="store_true", help="worker only, no MainWindow")
+    parser.add_argument("--album-tracks", type=int, default=1, help="tracks per album, played in order")
+    parser.add_argument("--out", help="write JSON results here")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    args = parser.parse_args()
+
+    result = run(args.iterations, args.interval, args.itunes_latency, args.discord_latency, not args.no_ui,
+                 args.album_tracks)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        result["p95_vs_baseline"] = compare(result["metrics"], baseline.get("metrics", {}))
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# bench/fake_discord.py
+"""
+Local stand-in for the Discord client's IPC endpoint (unix socket).
+
+Speaks the same framing as core.discord_ipc and can inject response latency,
+disconnects, rate-limit errors and silence (SET_ACTIVITY never answered). Received activities are kept with their
+arrival time so harnesses can count and time them.
+
+    python -m bench.fake_discord /tmp/discord-ipc-0
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from core.discord_ipc import FRAME_HEADER, OP_CLOSE, OP_FRAME, OP_HANDSHAKE, OP_PING, OP_PONG
+
+FAKE_USER = {
+    "id": "100000000000000000",
+    "username": "fakeuser",
+    "discriminator": "0",
+    "avatar": None,
+}
+
+
+class FakeDiscord:
+    def __init__(
+        self,
+        path: str,
+        latency: float = 0.0,
+        rate_limit: Optional[Tuple[int, float]] = None,
+    ):
+        self.path = path
+        # Seconds before each response is written
+        self.latency = latency
+        # (updates, window seconds): answer with an ERROR beyond that
+        self.rate_limit = rate_limit
+        # While set, SET_ACTIVITY is read but never answered
+        self.silent = False
+
+        self.activities: List[Tuple[float, Optional[dict]]] = []
+        self.handshakes = 0
+        self.errors = 0
+        # SET_ACTIVITY commands received, answered or not
+        self.attempts: List[float] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers = set()
+        self._recent: List[float] = []
+
+    async def start(self):
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+
+    async def stop(self):
+        """Like quitting Discord: stop listening and drop every client."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.disconnect_all()
+
+    def serve_in_thread(self):
+        """Run on a private event loop in a daemon thread; returns once listening."""
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def _run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=_run, name="fake-discord", daemon=True).start()
+        ready.wait(5)
+
+    def shutdown_thread(self):
+        loop = getattr(self, "_loop", None)
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.stop(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+
+    def disconnect_all(self):
+        for writer in list(self._writers):
+            writer.close()
+        self._writers.clear()
+
+    @property
+    def last_activity(self) -> Optional[dict]:
+        return self.activities[-1][1] if self.activities else None
+
+    # ----------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                op, length = FRAME_HEADER.unpack(header)
+                data = json.loads(await reader.readexactly(length)) if length else {}
+
+                if op == OP_HANDSHAKE:
+                    self.handshakes += 1
+                    self._send(writer, OP_FRAME, {
+                        "cmd": "DISPATCH",
+                        "evt": "READY",
+                        "data": {"v": 1, "user": FAKE_USER},
+                    })
+                elif op == OP_PING:
+                    self._send(writer, OP_PONG, data)
+                elif op == OP_CLOSE:
+                    break
+                elif op == OP_FRAME:
+                    asyncio.create_task(self._command(writer, data))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _command(self, writer: asyncio.StreamWriter, data: dict):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        nonce = data.get("nonce")
+        cmd = data.get("cmd")
+
+        if cmd == "SET_ACTIVITY":
+            self.attempts.append(time.monotonic())
+            if self.silent:
+                return
+
+        if cmd == "SET_ACTIVITY" and self._limited():
+            self.errors += 1
+            self._send(writer, OP_FRAME, {
+                "cmd": cmd, "evt": "ERROR", "nonce": nonce,
+                "data": {"code": 5000, "message": "Rate limited"},
+            })
+            return
+
+        if cmd == "SET_ACTIVITY":
+            activity = (data.get("args") or {}).get("activity")
+            self.activities.append((time.monotonic(), activity))
+            self._send(writer, OP_FRAME, {"cmd": cmd, "evt": None, "nonce": nonce, "data": activity or {}})
+        else:
+            self._send(writer, OP_FRAME, {"cmd": cmd, "evt": None, "nonce": nonce, "data": {}})
+
+    def _limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+        count, window = self.rate_limit
+        now = time.monotonic()
+        self._recent = [t for t in self._recent if now - t < window]
+        if len(self._recent) >= count:
+            return True
+        self._recent.append(now)
+        return False
+
+    @staticmethod
+    def _send(writer: asyncio.StreamWriter, op: int, payload: dict):
+        if writer.is_closing():
+            return
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(FRAME_HEADER.pack(op, len(body)) + body)
+
+
+async def _serve(path: str):
+    fake = FakeDiscord(path)
+    await fake.start()
+    print(f"[FakeDiscord] listening on {path}")
+    last = 0
+    while True:
+        await asyncio.sleep(0.5)
+        if len(fake.activities) != last:
+            last = len(fake.activities)
+            print(f"[FakeDiscord] {last} activities, latest: {fake.last_activity}")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_serve(sys.argv[1] if len(sys.argv) > 1 else "/tmp/discord-ipc-0"))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,160 @@
+# bench/fake_itunes.py
+"""
+Local stand-in for the iTunes Search API and its artwork CDN.
+
+    /search?term=...        -> results for tracks registered with add_track()
+    /lookup?id=...          -> collection lookups (album track lists)
+    /art/<id>/<w>x<h>bb.png -> a small solid-colour PNG
+
+Every response waits `latency` seconds first. Point core.itunes_lookup at it
+with `itunes_lookup.ITUNES_API = fake.url`.
+"""
+import json
+import struct
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+
+def solid_png(width: int = 64, height: int = 64, rgb=(114, 137, 218)) -> bytes:
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    row = b"\x00" + bytes(rgb) * width
+    raw = row * height
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FakeITunes:
+    def __init__(self, latency: float = 0.0, art_size: int = 64):
+        self.latency = latency
+        self.requests = 0
+        self.searches = 0
+        self.lookups = 0
+        self.art_requests = 0
+        self._tracks: List[dict] = []
+        self._lock = threading.Lock()
+        self._png = solid_png(art_size, art_size)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_track(self, title: str, artist: str, album: str, collection_id: int = 0, track_number: int = 1) -> dict:
+        with self._lock:
+            track_id = len(self._tracks) + 1
+            item = {
+                "wrapperType": "track",
+                "kind": "song",
+                "trackId": track_id,
+                "collectionId": collection_id or 100000 + track_id,
+                "trackName": title,
+                "artistName": artist,
+                "collectionName": album,
+                "trackNumber": track_number,
+                "artworkUrl100": f"{self.url}/art/{track_id}/100x100bb.png",
+                "trackViewUrl": f"https://music.apple.com/us/song/{track_id}",
+                "collectionViewUrl": f"https://music.apple.com/us/album/{collection_id or track_id}",
+            }
+            self._tracks.append(item)
+            return item
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-itunes", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ----------------------------------------------------------------
+
+    def _search(self, term: str) -> List[dict]:
+        words = term.lower().split()
+        with self._lock:
+            tracks = list(self._tracks)
+        hits = []
+        for item in tracks:
+            hay = f"{item['trackName']} {item['artistName']} {item['collectionName']}".lower()
+            if all(w in hay for w in words):
+                hits.append(item)
+        return [self._with_count(item, tracks) for item in hits[:25]]
+
+    @staticmethod
+    def _with_count(item: dict, tracks: List[dict]) -> dict:
+        """The item with trackCount filled in, like the real API."""
+        count = sum(1 for t in tracks if t["collectionId"] == item["collectionId"])
+        return dict(item, trackCount=count)
+
+    def _collection(self, collection_id: int) -> List[dict]:
+        with self._lock:
+            tracks = [t for t in self._tracks if t["collectionId"] == collection_id]
+        if not tracks:
+            return []
+        tracks = [self._with_count(t, tracks) for t in tracks]
+        first = tracks[0]
+        head = {
+            "wrapperType": "collection",
+            "collectionId": collection_id,
+            "collectionName": first["collectionName"],
+            "artistName": first["artistName"],
+            "artworkUrl100": first["artworkUrl100"],
+            "collectionViewUrl": first["collectionViewUrl"],
+        }
+        return [head] + tracks
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.requests += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                parsed = urllib.parse.urlparse(self.path)
+                query = urllib.parse.parse_qs(parsed.query)
+
+                if parsed.path == "/search":
+                    fake.searches += 1
+                    results = fake._search(query.get("term", [""])[0])
+                    self._json({"resultCount": len(results), "results": results})
+                elif parsed.path == "/lookup":
+                    fake.lookups += 1
+                    try:
+                        cid = int(query.get("id", ["0"])[0])
+                    except ValueError:
+                        cid = 0
+                    results = fake._collection(cid)
+                    self._json({"resultCount": len(results), "results": results})
+                elif parsed.path.startswith("/art/"):
+                    fake.art_requests += 1
+                    self._send(200, "image/png", fake._png)
+                else:
+                    self._send(404, "text/plain", b"not found")
+
+            def _json(self, payload: Dict):
+                self._send(200, "application/json", json.dumps(payload).encode("utf-8"))
+
+            def _send(self, code: int, ctype: str, body: bytes):
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
@@ -0,0 +1,130 @@
+# bench/fake_listenbrainz.py
+"""
+Local stand-in for the ListenBrainz submit API.
+
+    POST /1/submit-listens  (Authorization: Token <token>)
+
+Accepted listens are kept in `listens`, in arrival order. Like the real
+server it answers 401 for a wrong token, 400 for a payload with a listen
+that has no artist_name, and 429 with X-RateLimit-Reset-In once more than
+`rate_limit` requests arrive within a second. Fault injection:
+
+    fail_rate   share of requests answered 503
+    down        drop connections without answering (offline)
+    latency     seconds to wait before answering
+
+Point a client at it with ListenBrainzClient(token, fake.url).
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+
+class FakeListenBrainz:
+    def __init__(self, token: str = "bench-token", latency: float = 0.0, fail_rate: float = 0.0,
+                 rate_limit: Optional[int] = None, seed: int = 1):
+        self.token = token
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.rate_limit = rate_limit
+        self.down = False
+        self.listens: List[dict] = []
+        self.requests = 0
+        self.accepted = 0
+        self.errors = {}        # status -> count
+        self._rng = random.Random(seed)
+        self._window = (0.0, 0)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-listenbrainz", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # ----------------------------------------------------------------
+
+    def _decide(self, auth: str, body: dict):
+        """(status, extra headers) for one request; records accepted listens."""
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            start, count = self._window
+            if now - start >= 1.0:
+                start, count = now, 0
+            self._window = (start, count + 1)
+            if auth != f"Token {self.token}":
+                return 401, {}
+            if self.rate_limit is not None and count >= self.rate_limit:
+                return 429, {"X-RateLimit-Reset-In": f"{max(0.0, 1.0 - (now - start)):.3f}"}
+            if self.fail_rate and self._rng.random() < self.fail_rate:
+                return 503, {}
+            payload = body.get("payload") if isinstance(body, dict) else None
+            if not isinstance(payload, list) or not payload:
+                return 400, {}
+            for listen in payload:
+                meta = listen.get("track_metadata") or {}
+                if not meta.get("artist_name") or not meta.get("track_name") or "listened_at" not in listen:
+                    return 400, {}
+            self.listens.extend(payload)
+            self.accepted += len(payload)
+            return 200, {}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without this,
+            # Nagle + delayed ACKs add ~40 ms to every keep-alive request
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                if fake.down:
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length)
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if self.path != "/1/submit-listens":
+                    self._send(404, {"error": "not found"}, {})
+                    return
+                try:
+                    body = json.loads(raw)
+                except ValueError:
+                    body = None
+                status, headers = fake._decide(self.headers.get("Authorization", ""), body)
+                if status != 200:
+                    with fake._lock:
+                        fake.errors[status] = fake.errors.get(status, 0) + 1
+                self._send(status, {"status": "ok"} if status == 200 else {"code": status, "error": "bench"}, headers)
+
+            def _send(self, code: int, payload: dict, headers: dict):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
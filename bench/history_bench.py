@@ -0,0 +1,145 @@
+# bench/history_bench.py
+"""
+Listening history at scale: fills a fresh SQLite file with years of
+simulated plays through the real batched HistoryWriter, then times the
+stats queries the dashboard runs.
+
+Reports (ms unless noted):
+  enqueue            HistoryWriter.add() as seen by the caller
+  insert_rows_per_s  sustained write throughput (rows/s)
+  top_artists_week   HistoryStats.top_artists(last 7 days)
+  top_albums_week    HistoryStats.top_albums(last 7 days)
+  daily_30           HistoryStats.daily_totals(last 30 days)
+  daily_30_past      the same for a random 30 days in the past
+
+Exit status is 1 when a query p95 exceeds the budget.
+
+    python -m bench.history_bench --rows 2000000 --years 5 --out history.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from bench.stats import summarize
+from core.history import HistoryStats, HistoryWriter, day_number
+
+QUERY_BUDGET_MS = 50.0
+
+
+def simulate(writer: HistoryWriter, rows: int, years: float, seed: int) -> list:
+    rng = random.Random(seed)
+    artists = [f"Artist {i:04d}" for i in range(2000)]
+    # Skewed taste: a few artists get most plays
+    weights = [1.0 / (i + 1) ** 0.8 for i in range(len(artists))]
+    end = time.time()
+    start = end - years * 365 * 86400
+    step = (end - start) / rows
+    enqueue = []
+    t = start
+    artist = artists[0]
+    for i in range(rows):
+        t += step * rng.uniform(0.5, 1.5)
+        if i % 64 == 0:
+            artist = rng.choices(artists, weights)[0]
+        album = f"{artist} — Album {rng.randrange(8)}"
+        duration = rng.uniform(120, 360)
+        played = duration * rng.choice((1.0, 1.0, 1.0, 0.5, 0.2))
+        row = (t, day_number(t), f"Track {rng.randrange(12)}", artist, album, "bench",
+               duration, round(played, 1), round(rng.choice((0.0, 0.0, 0.0, 30.0)), 1))
+        if i % 1000 == 0:
+            c = time.perf_counter()
+            writer.add(row)
+            enqueue.append(time.perf_counter() - c)
+        else:
+            writer.add(row)
+    return enqueue
+
+
+def time_query(fn, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        c = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - c)
+    return summarize(samples)
+
+
+def run(rows: int, years: float, runs: int, seed: int, keep: bool) -> dict:
+    # URI-special characters in the folder, as a user's data folder may have
+    folder = os.path.join(tempfile.mkdtemp(prefix="rmp-history-"), "data #1 50%?")
+    os.mkdir(folder)
+    path = os.path.join(folder, "history.sqlite3")
+    writer = HistoryWriter(path, batch_size=5000, flush_seconds=0.5)
+
+    c = time.perf_counter()
+    enqueue = simulate(writer, rows, years, seed)
+    writer.close(timeout=None)
+    insert_seconds = time.perf_counter() - c
+
+    stats = HistoryStats(path)
+    now = time.time()
+    rng = random.Random(seed + 1)
+
+    def past_start(days_back: int) -> float:
+        return now - rng.uniform(days_back, years * 365) * 86400
+
+    metrics = {
+        "enqueue": summarize(enqueue),
+        "top_artists_week": time_query(lambda: stats.top_artists(now - 7 * 86400), runs),
+        "top_albums_week": time_query(lambda: stats.top_albums(now - 7 * 86400), runs),
+        "daily_30": time_query(lambda: stats.daily_totals(day_number(now - 30 * 86400), day_number(now)), runs),
+        "daily_30_past": time_query(
+            lambda: (lambda s: stats.daily_totals(day_number(s), day_number(s + 30 * 86400)))(past_start(30)), runs
+        ),
+    }
+    queries = [k for k in metrics if k != "enqueue"]
+    checks = {k: metrics[k]["p95"] <= QUERY_BUDGET_MS for k in queries}
+    # The queries read the file that was written, not an empty stand-in
+    checks["stats_read"] = bool(stats.top_artists(now - 7 * 86400))
+
+    result = {
+        "benchmark": "history",
+        "unit": "ms",
+        "config": {"rows": rows, "years": years, "runs": runs, "seed": seed},
+        "insert_seconds": round(insert_seconds, 2),
+        "insert_rows_per_s": int(rows / max(1e-9, insert_seconds)),
+        "db_mb": round(sum(os.path.getsize(path + s) for s in ("", "-wal") if os.path.exists(path + s)) / 2 ** 20, 1),
+        "metrics": metrics,
+        "budget_ms": QUERY_BUDGET_MS,
+        "checks": checks,
+        "passed": all(checks.values()),
+    }
+    if keep:
+        result["path"] = path
+    else:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--years", type=float, default=5.0)
+    parser.add_argument("--runs", type=int, default=50, help="timed runs per query")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="keep the generated database")
+    parser.add_argument("--out", help="write JSON results here")
+    args = parser.parse_args()
+
+    result = run(args.rows, args.years, args.runs, args.seed, args.keep)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
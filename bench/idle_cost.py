@@ -0,0 +1,289 @@
+# bench/idle_cost.py
+"""
+Idle cost: what the app spends per hour while it sits in the tray with
+nothing to do. Scenarios:
+
+  engine_closed    PresenceWorker, Music closed (the source reads nothing)
+  engine_paused    PresenceWorker, a track paused
+  window_visible   MainWindow on the dashboard, paused track, window open
+  window_hidden    the same window hidden to the tray
+
+Engine scenarios run on a virtual clock (--speed), so an hour of idling
+passes in seconds of real time, and count the whole process. Qt's
+animation clock can't be sped up, so window scenarios run in real time
+(--window-seconds), are scaled to an hour and count the GUI thread only
+(the window is fed the paused track and artwork once, no worker). The
+polled fake source starts a process per read (`true`) the way osascript
+does on macOS.
+
+Per hour:
+  wakeups       voluntary context switches over all threads (Linux /proc)
+  source_reads  source invocations
+  spawns        subprocesses started
+  signals       PresenceWorker signal emissions
+  timer_fires   Qt timer events on the GUI thread (animations included)
+  paints        paint events on the GUI thread
+  cpu_s         process CPU seconds
+
+Exit status is 1 when a number exceeds bench/idle_budgets.json;
+--update-budgets records the current numbers (with headroom) instead.
+
+    python -m bench.idle_cost --out idle.json
+"""
+import argparse
+import functools
+import glob
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt
+
+from bench.fake_discord import FakeDiscord
+from core.clock import ScaledClock
+from core.discord_rpc import connect_to_discord
+from core.models import NowPlaying
+from core.settings import SETTINGS
+from core.sources import Source, SourceAggregator
+
+BUDGETS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "idle_budgets.json")
+# --update-budgets: measured * HEADROOM, rounded up, and never below the floor
+HEADROOM = 1.5
+FLOORS = {"wakeups": 50, "source_reads": 5, "spawns": 5, "signals": 5, "timer_fires": 20, "paints": 10, "cpu_s": 0.5}
+
+PAUSED = NowPlaying("Idle Track", "Idle Artist", "Idle Album", 240.0, 73.0, False)
+
+_spawns = [0]
+
+
+class _CountingPopen(subprocess.Popen):
+    def __init__(self, *args, **kwargs):
+        _spawns[0] += 1
+        super().__init__(*args, **kwargs)
+
+
+def wakeups(tid: str = "*") -> int:
+    """Voluntary context switches of every live thread of this process (or one)."""
+    total = 0
+    for path in glob.glob(f"/proc/self/task/{tid}/status"):
+        try:
+            with open(path, "r") as fh:
+                for line in fh:
+                    if line.startswith("voluntary_ctxt_switches:"):
+                        total += int(line.split()[1])
+                        break
+        except OSError:
+            pass
+    return total
+
+
+class Counters:
+    def __init__(self, gui_only: bool = False):
+        # gui_only: wakeups and CPU of the calling (GUI) thread only
+        self._tid = str(threading.get_native_id()) if gui_only else "*"
+        self.source_reads = 0
+        self.signals = 0
+        self.timer_fires = 0
+        self.paints = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "wakeups": wakeups(self._tid),
+            "source_reads": self.source_reads,
+            "spawns": _spawns[0],
+            "signals": self.signals,
+            "timer_fires": self.timer_fires,
+            "paints": self.paints,
+            "cpu_s": time.thread_time() if self._tid != "*" else time.process_time(),
+        }
+
+
+def per_hour(before: dict, after: dict, hours: float) -> dict:
+    return {k: round((after[k] - before[k]) / hours, 3 if k == "cpu_s" else 1) for k in before}
+
+
+def fake_source(counters: Counters, sample, spawn: bool) -> Source:
+    def read():
+        counters.source_reads += 1
+        if spawn:
+            subprocess.run(["true"], check=False)
+        return sample()
+
+    return Source("apple-music", read, priority=10)
+
+
+def count_signals(worker, counters: Counters):
+    def bump(*_):
+        counters.signals += 1
+
+    # Direct: the engine scenarios have no event loop to deliver queued calls
+    for signal in (worker.status, worker.account, worker.now_playing):
+        signal.connect(bump, Qt.DirectConnection)
+
+
+def run_engine(sample, speed: float, hours: float, spawn: bool, ipc_path: str) -> dict:
+    """PresenceWorker on the tray cadence (poll_background), whole process."""
+    from ui.worker import PresenceWorker
+
+    counters = Counters()
+    clock = ScaledClock(speed=speed)
+    aggregator = SourceAggregator([fake_source(counters, sample, spawn)], clock=clock)
+    worker = PresenceWorker(
+        poll_seconds=SETTINGS.profile.poll_background, sources=aggregator, clock=clock,
+        connect=functools.partial(connect_to_discord, ipc_path),
+    )
+    count_signals(worker, counters)
+    worker.start()
+    # Connect and settle; the hour starts after the first couple of minutes
+    time.sleep(clock.real(120))
+    before = counters.snapshot()
+    time.sleep(clock.real(hours * 3600))
+    after = counters.snapshot()
+    worker.stop()
+    worker.wait(5000)
+    return per_hour(before, after, hours)
+
+
+def run_window(seconds: float) -> dict:
+    """GUI thread only: the engine's share is what the engine scenarios measure."""
+    from PySide6.QtCore import QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    from bench.fake_itunes import solid_png
+    from ui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    counters = Counters(gui_only=True)
+
+    class EventCounter(QObject):
+        def eventFilter(self, obj, event):
+            kind = event.type()
+            if kind == QEvent.Timer:
+                counters.timer_fires += 1
+            elif kind == QEvent.Paint:
+                counters.paints += 1
+            return False
+
+    event_counter = EventCounter()
+    app.installEventFilter(event_counter)
+
+    # Engine options make the window keep presence in-process, and no worker
+    # is started: the dashboard is fed the paused track and its artwork once
+    win = MainWindow(worker_options={"sources": SourceAggregator([])})
+    win.show()
+    results = {}
+    marks = {}
+
+    def setup():
+        np = dict(asdict(PAUSED), source="apple-music", artwork_url="bench://art")
+        win._switch_page(win._dashboard())
+        win._artwork_url = np["artwork_url"]
+        win._set_artwork(np["artwork_url"], solid_png(600, 600, (180, 60, 90)))
+        win._on_now_playing(np)
+
+    def begin(label: str):
+        marks[label] = counters.snapshot()
+
+    def end(label: str):
+        results[label] = per_hour(marks[label], counters.snapshot(), seconds / 3600)
+
+    settle = 2.0
+    QTimer.singleShot(200, setup)
+    QTimer.singleShot(int(settle * 1000), lambda: begin("window_visible"))
+    QTimer.singleShot(int((settle + seconds) * 1000), lambda: (end("window_visible"), win.hide()))
+    QTimer.singleShot(int((2 * settle + seconds) * 1000), lambda: begin("window_hidden"))
+    QTimer.singleShot(int((2 * settle + 2 * seconds) * 1000), lambda: (end("window_hidden"), app.quit()))
+    app.exec()
+    app.removeEventFilter(event_counter)
+    win._force_quit = True
+    win.close()
+    return results
+
+
+def check(results: dict, budgets: dict) -> dict:
+    checks = {}
+    for scenario, metrics in results.items():
+        limits = budgets.get(scenario, {})
+        for key, value in metrics.items():
+            if key in limits:
+                checks[f"{scenario}.{key}"] = value <= limits[key]
+    return checks
+
+
+def record_budgets(results: dict) -> dict:
+    budgets = {}
+    for scenario, metrics in results.items():
+        budgets[scenario] = {}
+        for key, value in metrics.items():
+            limit = max(FLOORS.get(key, 1), value * HEADROOM)
+            budgets[scenario][key] = round(limit, 2) if key == "cpu_s" else math.ceil(limit)
+    return budgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--speed", type=float, default=600.0, help="virtual clock speed for engine scenarios")
+    parser.add_argument("--hours", type=float, default=1.0, help="simulated hours per engine scenario")
+    parser.add_argument("--window-seconds", type=float, default=10.0, help="real seconds per window scenario")
+    parser.add_argument("--profile", default="balanced", help="settings profile to measure")
+    parser.add_argument("--no-spawn", action="store_true", help="fake source doesn't start a process per read")
+    parser.add_argument("--budgets", default=BUDGETS_PATH)
+    parser.add_argument("--update-budgets", action="store_true", help="record these numbers as the new budgets")
+    parser.add_argument("--out", help="write JSON results here")
+    args = parser.parse_args()
+
+    SETTINGS.select(args.profile, save=False)
+    subprocess.Popen = _CountingPopen
+    spawn = not args.no_spawn
+    ipc_path = os.path.join(tempfile.mkdtemp(prefix="rmp-idle-"), "discord-ipc-0")
+    discord = FakeDiscord(ipc_path)
+    discord.serve_in_thread()
+
+    results = {
+        "engine_closed": run_engine(lambda: None, args.speed, args.hours, spawn, ipc_path),
+        "engine_paused": run_engine(lambda: PAUSED, args.speed, args.hours, spawn, ipc_path),
+    }
+    results.update(run_window(args.window_seconds))
+    discord.shutdown_thread()
+
+    if args.update_budgets:
+        with open(args.budgets, "w", encoding="utf-8") as fh:
+            json.dump(record_budgets(results), fh, indent=2)
+            fh.write("\n")
+    try:
+        with open(args.budgets, "r", encoding="utf-8") as fh:
+            budgets = json.load(fh)
+    except (OSError, ValueError):
+        budgets = {}
+
+    checks = check(results, budgets)
+    result = {
+        "benchmark": "idle_cost",
+        "unit": "per hour",
+        "config": {
+            "speed": args.speed, "hours": args.hours, "window_seconds": args.window_seconds,
+            "spawn": spawn, "profile": SETTINGS.profile_name,
+        },
+        "metrics": results,
+        "budgets": budgets,
+        "checks": checks,
+        "passed": bool(checks) and all(checks.values()),
+    }
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+# bench/pack_bench.py
+"""
+Resolution packs at fleet scale: builds a pack of --entries synthetic
+resolutions (iTunes-shaped URLs, canonical track keys), then measures
+
+  build_s           write_pack() for the whole set (s)
+  bytes_per_entry   file size / entries, next to the JSON resolution cache
+  open              ResolutionPack() on the file (ms)
+  hit / miss        ResolutionPack.get() for present / absent keys (us)
+  cold_hit          hits after the file is dropped from the page cache (us, Linux)
+  merge_s           merge_packs() of the pack with a 10% overlapping one (s)
+  mapped_rss_mb     resident pages of the mapping (Linux): after opening,
+                    after the misses (index only), after a day's worth of
+                    hits (--day-hits) and after every lookup
+  import            --import-pack into an existing installed pack: every
+                    track of both must be there afterwards, and the pack
+                    must not be mapped by this process when it is replaced
+                    (Windows refuses that; checked via /proc on Linux)
+  portable          a track resolved under one library ID (against
+                    bench/fake_itunes.py) and exported must be answered by
+                    the pack, without a search, under another machine's ID;
+                    the export must hold text identities only
+
+Exit status is 1 when a latency or size budget is exceeded.
+
+    python -m bench.pack_bench --entries 1000000 --out pack.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+
+from bench.fake_itunes import FakeITunes
+from bench.stats import summarize
+from core import itunes_lookup
+from core.resolution_pack import ResolutionPack, merge_packs, pack_hash, write_pack
+
+BUDGETS = {
+    "hit_p99_us": 500.0,
+    "miss_p99_us": 50.0,
+    "open_ms": 10.0,
+    "bytes_per_entry": 80.0,
+}
+
+
+def key_of(i: int) -> str:
+    return "t:" + hashlib.blake2b(i.to_bytes(8, "little"), digest_size=8).hexdigest()
+
+
+def resolution_of(i: int) -> tuple:
+    """Shaped like real iTunes answers: per-album artwork paths, numeric IDs."""
+    album = i // 12
+    h = hashlib.md5(album.to_bytes(8, "little")).hexdigest()
+    art = (f"https://is{album % 5 + 1}-ssl.mzstatic.com/image/thumb/Music{album % 200}/v4/"
+           f"{h[:2]}/{h[2:4]}/{h[4:6]}/{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}/"
+           f"{album:010d}.jpg/600x600bb.jpg")
+    album_url = f"https://music.apple.com/us/album/album-{album}/{1400000000 + album}?uo=4"
+    track_url = f"https://music.apple.com/us/album/album-{album}/{1400000000 + album}?i={1500000000 + i}&uo=4"
+    return art, track_url, album_url
+
+
+def sorted_entries(n: int, offset: int = 0):
+    """(key, resolution) in pack_hash order without holding every row in memory."""
+    hashes = array("Q", (pack_hash(key_of(offset + i)) for i in range(n)))
+    for i in sorted(range(n), key=hashes.__getitem__):
+        yield key_of(offset + i), resolution_of(offset + i)
+
+
+def mapped_rss_mb(path: str) -> float:
+    """Resident pages of every mapping of `path` in this process (Linux)."""
+    total_kb, inside = 0, False
+    try:
+        with open("/proc/self/smaps", "r") as fh:
+            for line in fh:
+                if "-" in line.split(" ", 1)[0]:
+                    inside = line.rstrip("\n").endswith(path)
+                elif inside and line.startswith("Rss:"):
+                    total_kb += int(line.split()[1])
+    except OSError:
+        return -1.0
+    return round(total_kb / 1024, 2)
+
+
+def is_mapped(path: str) -> bool:
+    """Whether this process maps `path` (Linux; False elsewhere)."""
+    try:
+        with open("/proc/self/maps", "r") as fh:
+            return any(line.rstrip("\n").endswith(" " + path) for line in fh)
+    except OSError:
+        return False
+
+
+def drop_page_cache(path: str) -> bool:
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
+
+
+def time_gets(pack: ResolutionPack, keys: list) -> list:
+    samples = []
+    for key in keys:
+        c = time.perf_counter()
+        pack.get(key)
+        samples.append(time.perf_counter() - c)
+    return samples
+
+
+def imported(tmp: str) -> dict:
+    """Import another machine's pack over an installed one sharing half its tracks."""
+    installed = os.path.join(tmp, "installed.rmppack")
+    other = os.path.join(tmp, "import.rmppack")
+    write_pack(installed, ((key_of(i), resolution_of(i)) for i in range(100)))
+    write_pack(other, ((key_of(i), resolution_of(i)) for i in range(50, 150)))
+    replaced_while_mapped = []
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if os.path.abspath(dst) == os.path.abspath(installed):
+            replaced_while_mapped.append(is_mapped(os.path.abspath(installed)))
+        real_replace(src, dst)
+
+    os.replace = replace
+    try:
+        entries = itunes_lookup.import_resolution_packs([other], path=installed)
+    finally:
+        os.replace = real_replace
+    pack = ResolutionPack(installed)
+    complete = all(pack.get(key_of(i)) == resolution_of(i) for i in range(150))
+    pack.close()
+    return {
+        "entries": entries,
+        "complete": complete,
+        "replaced": len(replaced_while_mapped),
+        "replaced_while_mapped": any(replaced_while_mapped),
+    }
+
+
+def portable(tmp: str) -> dict:
+    """Export on one machine, look up on another whose player IDs differ."""
+    itunes = FakeITunes()
+    itunes.add_track("Portable Song", "Pack Artist", "Pack Album")
+    itunes.start()
+    itunes_lookup.ITUNES_API = itunes.url
+    out = os.path.join(tmp, "portable.rmppack")
+    try:
+        itunes_lookup.RESOLUTIONS.clear()
+        resolved = itunes_lookup.lookup_artwork_and_urls("Portable Song", "Pack Artist", "Pack Album", "p:MACHINE-A")
+        exported = itunes_lookup.export_resolution_pack(out)
+        pack = ResolutionPack(out)
+        keys = [key for _, key, _ in pack.items()]
+        pack.close()
+
+        itunes_lookup.RESOLUTIONS.clear()
+        itunes_lookup.load_resolution_pack(out)
+        searches = itunes.searches
+        answered = itunes_lookup.lookup_artwork_and_urls("Portable Song", "Pack Artist", "Pack Album", "p:MACHINE-B")
+        return {
+            "exported": exported,
+            "text_keys_only": bool(keys) and all(key.startswith("t:") for key in keys),
+            "hit": answered[0] is not None and answered == resolved,
+            "searched": itunes.searches - searches,
+        }
+    finally:
+        if itunes_lookup.PACK is not None:
+            itunes_lookup.PACK.close()
+            itunes_lookup.PACK = None
+        itunes_lookup.RESOLUTIONS.clear()
+        itunes.stop()
+
+
+def run(entries: int, lookups: int, day_hits: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    tmp = tempfile.mkdtemp(prefix="rmp-pack-")
+    path = os.path.join(tmp, "bench.rmppack")
+
+    c = time.perf_counter()
+    written = write_pack(path, sorted_entries(entries), presorted=True)
+    build_s = time.perf_counter() - c
+    size = os.path.getsize(path)
+    # The JSON cache, extrapolated from a sample of the same rows
+    sample = [[key_of(i), list(resolution_of(i))] for i in range(0, entries, max(1, entries // 10000))]
+    json_bytes_per_entry = len(json.dumps(sample, separators=(",", ":"))) / len(sample)
+
+    hit_keys = [key_of(rng.randrange(entries)) for _ in range(lookups)]
+    miss_keys = [key_of(entries + rng.randrange(entries)) for _ in range(lookups)]
+
+    cold = []
+    if drop_page_cache(path):
+        pack = ResolutionPack(path)
+        cold = time_gets(pack, hit_keys[:200])
+        pack.close()
+
+    opens = []
+    for _ in range(20):
+        c = time.perf_counter()
+        ResolutionPack(path).close()
+        opens.append(time.perf_counter() - c)
+
+    # Footprint from a cold start, so only what lookups touch is resident;
+    # the timed lookups after it run on a warm index
+    drop_page_cache(path)
+    pack = ResolutionPack(path)
+    rss = {"open": mapped_rss_mb(path)}
+    assert all(pack.get(k) is None for k in miss_keys)
+    rss["misses"] = mapped_rss_mb(path)
+    assert all(pack.get(k) is not None for k in hit_keys[:day_hits])
+    rss["day_hits"] = mapped_rss_mb(path)
+    misses = time_gets(pack, miss_keys)
+    hits = time_gets(pack, hit_keys)
+    rss["all"] = mapped_rss_mb(path)
+
+    # Another machine's pack sharing 10% of the tracks
+    other_path = os.path.join(tmp, "other.rmppack")
+    other_n = max(1, entries // 10)
+    write_pack(other_path, sorted_entries(other_n, offset=entries - other_n // 10), presorted=True)
+    other = ResolutionPack(other_path)
+    merged_path = os.path.join(tmp, "merged.rmppack")
+    c = time.perf_counter()
+    merged = merge_packs(merged_path, pack, other)
+    merge_s = time.perf_counter() - c
+    other.close()
+    pack.close()
+    expected_merged = entries + other_n - other_n // 10
+
+    imports = imported(tmp)
+    across = portable(tmp)
+
+    for name in os.listdir(tmp):
+        os.remove(os.path.join(tmp, name))
+    os.rmdir(tmp)
+
+    metrics = {
+        "hit": summarize(hits, scale=1e6),
+        "miss": summarize(misses, scale=1e6),
+        "open": summarize(opens),
+    }
+    if cold:
+        metrics["cold_hit"] = summarize(cold, scale=1e6)
+    bytes_per_entry = size / max(1, written)
+    checks = {
+        "entries_written": written == entries,
+        "merge_entries": merged == expected_merged,
+        "hit_p99": metrics["hit"]["p99"] <= BUDGETS["hit_p99_us"],
+        "miss_p99": metrics["miss"]["p99"] <= BUDGETS["miss_p99_us"],
+        "open": metrics["open"]["p50"] <= BUDGETS["open_ms"],
+        "bytes_per_entry": bytes_per_entry <= BUDGETS["bytes_per_entry"],
+        "import_entries": imports["entries"] == 150 and imports["complete"],
+        "import_unmapped": imports["replaced"] >= 1 and not imports["replaced_while_mapped"],
+        "portable_keys": across["text_keys_only"],
+        "portable_hit": across["hit"] and across["searched"] == 0,
+    }
+    return {
+        "benchmark": "pack",
+        "unit": "us (open: ms)",
+        "config": {"entries": entries, "lookups": lookups, "day_hits": day_hits, "seed": seed,
+                   "python": sys.version.split()[0]},
+        "build_s": round(build_s, 2),
+        "file_mb": round(size / 1024 ** 2, 2),
+        "bytes_per_entry": round(bytes_per_entry, 1),
+        "json_cache_bytes_per_entry": round(json_bytes_per_entry, 1),
+        "mapped_rss_mb": rss,
+        "merge_s": round(merge_s, 2),
+        "import": imports,
+        "portable": across,
+        "metrics": metrics,
+        "budgets": BUDGETS,
+        "checks": checks,
+        "passed": all(checks.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--day-hits", type=int, default=300, help="track changes in a day of listening")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write JSON results here")
+    args = parser.parse_args()
+
+    result = run(args.entries, args.lookups, args.day_hits, args.seed)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# bench/render_bench.py
+"""
+Rendering microbenchmarks for the GUI thread's most expensive paths, on
+the offscreen platform. Each device pixel ratio runs in a fresh process
+(QT_SCALE_FACTOR) against a real MainWindow showing a paused track.
+
+Per artwork size (JPEG with photo-like content, --sizes):
+  decode/<n>px           QPixmap.loadFromData
+  scale_art/<n>px        scaling to the artwork label
+  rounded_pixmap/<n>px   MainWindow._rounded_pixmap
+  background/<n>px       MainWindow._set_background_pixmap
+  set_artwork/<n>px      the whole MainWindow._set_artwork path
+
+Per device pixel ratio:
+  repaint_effects        full dashboard repaint, background blur + card glow
+  repaint_no_blur        the same without the blur
+  repaint_plain          without any graphics effect
+  switch_page_start      MainWindow._switch_page up to the first frame
+  switch_page_frame      one transition frame (step + repaint)
+
+Names get an @<dpr>x suffix. Times are ms (p50/p95/p99 over --runs). With
+--compare, exit status is 1 when a p50 is more than --threshold times the
+baseline's.
+
+    python -m bench.render_bench --out render.json [--compare previous-render.json]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.stats import compare, summarize
+
+FRAMES = 16     # steps through one page transition
+
+
+def photo_jpeg(size: int, seed: int = 1) -> bytes:
+    """Gradient plus overlapping soft shapes: decodes and scales like real cover art."""
+    from PySide6.QtCore import QBuffer, QByteArray, QIODevice, QRectF, Qt
+    from PySide6.QtGui import QColor, QImage, QLinearGradient, QPainter
+
+    rng = random.Random(seed)
+    image = QImage(size, size, QImage.Format_RGB32)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    gradient = QLinearGradient(0, 0, size, size)
+    gradient.setColorAt(0.0, QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    gradient.setColorAt(1.0, QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+    painter.fillRect(0, 0, size, size, gradient)
+    painter.setPen(Qt.NoPen)
+    for _ in range(300):
+        painter.setBrush(QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256), rng.randrange(40, 200)))
+        r = rng.uniform(0.01, 0.2) * size
+        painter.drawEllipse(QRectF(rng.uniform(0, size), rng.uniform(0, size), r, r))
+    painter.end()
+
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "JPG", 90)
+    buffer.close()
+    return bytes(data)
+
+
+def time_op(fn, runs: int, warmup: int = 2) -> dict:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(runs):
+        c = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - c)
+    return summarize(samples)
+
+
+def child(sizes, runs: int):
+    """Runs inside the measured process."""
+    from PySide6.QtCore import QAbstractAnimation, Qt
+    from PySide6.QtGui import QPixmap
+    from PySide6.QtWidgets import QApplication
+
+    from core.settings import SETTINGS
+    from core.sources import SourceAggregator
+
+    app = QApplication(sys.argv[:1])
+    SETTINGS.select("balanced", save=False)     # full animations and effects
+
+    from ui.main_window import MainWindow
+
+    # Engine options keep the window from starting a daemon; no worker runs
+    win = MainWindow(worker_options={"sources": SourceAggregator([])})
+    win.show()
+    win._dashboard()
+    app.processEvents()
+    win.stack.setCurrentWidget(win.dashboard_page)
+    np = {
+        "title": "Render Bench", "artist": "Bench Artist", "album": "Bench Album", "duration": 240.0,
+        "position": 60.0, "playing": True, "source": "bench", "artwork_url": "bench://art",
+    }
+    metrics = {}
+
+    for size in sizes:
+        data = photo_jpeg(size, seed=size)
+        pix = QPixmap()
+        pix.loadFromData(data)
+        scaled = pix.scaled(win.d_art.size(), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+        metrics[f"decode/{size}px"] = time_op(lambda: QPixmap().loadFromData(data), runs)
+        metrics[f"scale_art/{size}px"] = time_op(
+            lambda: pix.scaled(win.d_art.size(), Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation), runs
+        )
+        metrics[f"rounded_pixmap/{size}px"] = time_op(lambda: win._rounded_pixmap(scaled, radius=22), runs)
+        metrics[f"background/{size}px"] = time_op(lambda: win._set_background_pixmap(pix), runs)
+        metrics[f"set_artwork/{size}px"] = time_op(lambda: win._set_artwork(np["artwork_url"], data), runs)
+
+    # Dashboard as it normally looks: 600px artwork, blurred background,
+    # glowing card (playing), looping motion stopped so frames are stable
+    win._artwork_url = np["artwork_url"]
+    win._set_artwork(np["artwork_url"], photo_jpeg(600))
+    win._on_now_playing(np)
+    app.processEvents()
+    win._pause_motion()
+    if win._glow_transition:
+        win._glow_transition.setCurrentTime(win._glow_transition.duration())
+
+    metrics["repaint_effects"] = time_op(win.repaint, runs)
+
+    def transition():
+        target = win.connect_page if win.stack.currentWidget() is win.dashboard_page else win.dashboard_page
+        c = time.perf_counter()
+        win._switch_page(target)
+        anim = win._page_anim
+        win.repaint()
+        start = time.perf_counter() - c
+        frames = []
+        if anim is not None:
+            anim.pause()
+            total = anim.duration()
+            for i in range(1, FRAMES + 1):
+                c = time.perf_counter()
+                anim.setCurrentTime(total * i // FRAMES)
+                win.repaint()
+                frames.append(time.perf_counter() - c)
+            if anim.state() != QAbstractAnimation.Stopped:
+                anim.setCurrentTime(total)
+        return start, frames
+
+    transition()
+    starts, frames = [], []
+    for _ in range(max(2, runs // 2) * 2):
+        start, steps = transition()
+        starts.append(start)
+        frames.extend(steps)
+    metrics["switch_page_start"] = summarize(starts)
+    metrics["switch_page_frame"] = summarize(frames)
+    win.stack.setCurrentWidget(win.dashboard_page)
+
+    win.bg_label.setGraphicsEffect(None)
+    metrics["repaint_no_blur"] = time_op(win.repaint, runs)
+    win._glow_anim.stop()
+    win.now_card.setGraphicsEffect(None)
+    win._glow_effect = None
+    metrics["repaint_plain"] = time_op(win.repaint, runs)
+
+    report = {"dpr": win.devicePixelRatio(), "metrics": metrics}
+    win._force_quit = True
+    win.close()
+    print(json.dumps(report), flush=True)
+
+
+def run(dprs, sizes, runs: int) -> dict:
+    home = tempfile.mkdtemp(prefix="rmp-render-")
+    metrics = {}
+    actual = {}
+    for dpr in dprs:
+        env = dict(
+            os.environ, QT_QPA_PLATFORM="offscreen", QT_SCALE_FACTOR=str(dpr),
+            HOME=home, XDG_DATA_HOME=home, APPDATA=home,
+        )
+        env.pop("RMP_IN_PROCESS", None)
+        out = subprocess.run(
+            [sys.executable, "-m", "bench.render_bench", "--child",
+             "--sizes", ",".join(map(str, sizes)), "--runs", str(runs)],
+            env=env, capture_output=True, text=True, timeout=600,
+        ).stdout
+        report = json.loads(out.strip().splitlines()[-1])
+        actual[str(dpr)] = report["dpr"]
+        for name, stats in report["metrics"].items():
+            metrics[f"{name}@{dpr:g}x"] = stats
+    return {
+        "benchmark": "render",
+        "unit": "ms",
+        "config": {"dprs": dprs, "device_pixel_ratios": actual, "sizes": sizes, "runs": runs,
+                   "python": sys.version.split()[0]},
+        "metrics": metrics,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--dprs", default="1,2", help="device pixel ratios, comma-separated")
+    parser.add_argument("--sizes", default="300,600,1200,3000", help="artwork sizes in px, comma-separated")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--out", help="write JSON results here")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    parser.add_argument("--threshold", type=float, default=1.3, help="p50 ratio counted as a regression")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    if args.child:
+        child(sizes, args.runs)
+        return
+
+    result = run([float(d) for d in args.dprs.split(",") if d], sizes, args.runs)
+    passed = True
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        ratios = compare(result["metrics"], baseline.get("metrics", {}), key="p50")
+        result["p50_vs_baseline"] = ratios
+        result["regressions"] = sorted(name for name, ratio in ratios.items() if ratio > args.threshold)
+        passed = not result["regressions"]
+    result["passed"] = passed
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
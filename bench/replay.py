@@ -0,0 +1,135 @@
+# bench/replay.py
+"""
+Replay a recorded session (main.py --record / RMP_RECORD) through the real
+PresenceEngine on a virtual clock, with counting stand-ins for the iTunes
+lookup and Discord, and report what the update logic did.
+
+    python -m bench.replay session.rmp.gz --speed 100 --lookup-latency 0.8
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from bench.stats import percentile
+from core.clock import ScaledClock
+from core.engine import PresenceEngine
+from core.recorder import read_session, sample_from_row
+from core.sources import Source, SourceAggregator
+
+
+class CountingLookup:
+    """Stands in for lookup_artwork_and_urls; answers after a virtual latency."""
+
+    def __init__(self, clock: ScaledClock, latency: float = 0.5):
+        self.clock = clock
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, title: str, artist: str, album: Optional[str] = None, track_id: Optional[str] = None):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.clock.real(self.latency))
+        key = f"{title}|{artist}|{album or ''}"
+        return f"replay://art/{key}", f"replay://track/{key}", f"replay://album/{key}"
+
+
+class CountingDiscord:
+    """Stands in for the IPC client; keeps every update with its virtual time."""
+
+    def __init__(self, clock: ScaledClock):
+        self.clock = clock
+        self.user = {"id": "0", "username": "replay", "discriminator": "0"}
+        self.updates: List[Tuple[float, dict]] = []
+        self.clears = 0
+
+    async def update(self, **payload):
+        self.updates.append((self.clock.monotonic(), payload))
+        return {}
+
+    async def clear(self):
+        self.clears += 1
+        return {}
+
+    async def close(self):
+        pass
+
+
+async def replay(path: str, speed: float = 100.0, lookup_latency: float = 0.5, tail: float = 5.0) -> dict:
+    rows = list(read_session(path))
+    header, rows = rows[0], rows[1:]
+    samples = [r for r in rows if r[1] == "s"]
+    names = sorted({r[2] for r in samples})
+
+    clock = ScaledClock(speed=speed, start=float(header.get("start", 0.0)))
+    t0 = clock.monotonic()
+    aggregator = SourceAggregator([Source(name) for name in names], clock=clock)
+    lookup = CountingLookup(clock, latency=lookup_latency)
+    discord = CountingDiscord(clock)
+
+    async def connect():
+        return discord
+
+    engine = PresenceEngine(sources=aggregator, poll_seconds=1.0, connect=connect, lookup=lookup, clock=clock)
+    run_task = asyncio.create_task(engine.run())
+
+    # Feed samples at their recorded (virtual) times
+    first_seen: Dict[str, float] = {}
+    for row in samples:
+        delay = (t0 + row[0]) - clock.monotonic()
+        if delay > 0:
+            await asyncio.sleep(clock.real(delay))
+        np = sample_from_row(row)
+        if np is not None and np.title not in first_seen:
+            first_seen[np.title] = clock.monotonic()
+        aggregator.push(row[2], np)
+
+    await asyncio.sleep(clock.real(tail))
+    engine.stop()
+    await run_task
+
+    # Time from a track's first sample to the first update carrying its artwork
+    to_artwork = []
+    for title, seen in first_seen.items():
+        for t, payload in discord.updates:
+            if payload.get("details") == title[:128] and payload.get("large_image", "").startswith("replay://"):
+                to_artwork.append(t - seen)
+                break
+
+    duration = (samples[-1][0] if samples else 0.0) + tail
+    return {
+        "session": path,
+        "speed": speed,
+        "virtual_seconds": round(duration, 1),
+        "samples": len(samples),
+        "tracks": len(first_seen),
+        "rpc_updates": len(discord.updates),
+        "rpc_clears": discord.clears,
+        "rpc_updates_per_track": round(len(discord.updates) / max(1, len(first_seen)), 2),
+        "lookups": lookup.calls,
+        "time_to_artwork": {
+            "count": len(to_artwork),
+            "mean": round(statistics.mean(to_artwork), 3) if to_artwork else None,
+            "p95": round(percentile(to_artwork, 95), 3) if to_artwork else None,
+            "max": round(max(to_artwork), 3) if to_artwork else None,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("session")
+    parser.add_argument("--speed", type=float, default=100.0)
+    parser.add_argument("--lookup-latency", type=float, default=0.5, help="virtual seconds per lookup")
+    args = parser.parse_args()
+
+    report = asyncio.run(replay(args.session, speed=args.speed, lookup_latency=args.lookup_latency))
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# bench/scrobble_drain.py
+"""
+Scrobbling: the play rules, and draining a large offline backlog through
+the real ScrobbleQueue + ListenBrainzClient into a local stand-in server
+(bench/fake_listenbrainz.py).
+
+  rules      a scripted now_playing stream through ScrobbleTracker must
+             queue exactly the listens the half-or-4-minutes rule allows
+  backlog    listens queued while "offline" (every submit fails), then the
+             queue is closed and reopened, as after a restart
+  clean      the backlog drains into a healthy server
+  faulty     the same with 503s, rate limiting, a few listens the server
+             refuses, and an outage partway through
+
+Checks: every listen arrives exactly once and in order (refused ones are
+dropped, nothing else), add() stays cheap, `pending` reports the whole
+backlog while offline and 0 once drained, and the backlog drains at
+least DRAIN_BUDGET listens/s. Exit status is 1 when a check fails.
+
+    python -m bench.scrobble_drain --listens 50000 --out scrobble.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from bench.fake_listenbrainz import FakeListenBrainz
+from bench.stats import summarize
+from core.scrobble import ListenBrainzClient, ScrobbleQueue, ScrobbleRetry, ScrobbleTracker
+
+DRAIN_BUDGET = 5000         # listens/s, clean run
+ENQUEUE_BUDGET_MS = 0.1     # add() p99
+
+
+class _Collect:
+    def __init__(self):
+        self.listens = []
+
+    def add(self, listen):
+        self.listens.append(listen)
+
+
+def check_rules() -> dict:
+    """(name, duration, [(seconds, playing)...]) -> expected listens queued."""
+    cases = [
+        ("short track never counts", 25, [(25, True)], 0),
+        ("just short of half", 300, [(149, True)], 0),
+        ("half of a 5 minute track", 300, [(151, True)], 1),
+        ("4 minutes of a long track", 900, [(245, True)], 1),
+        ("pauses don't count", 300, [(100, True), (600, False), (40, True)], 0),
+        ("pause then finish", 300, [(100, True), (600, False), (60, True)], 1),
+        ("skipped early", 300, [(30, True)], 0),
+        ("unknown length: 4 minutes", 0, [(245, True)], 1),
+        ("counted once per listen", 300, [(300, True)], 1),
+    ]
+    results = {}
+    for i, (name, duration, steps, expected) in enumerate(cases):
+        now = [1_000_000.0]
+        sink = _Collect()
+        tracker = ScrobbleTracker(sink, clock=lambda: now[0])
+        position = 0.0
+        for seconds, playing in steps:
+            # One now_playing tick per second, as the engine sends while playing
+            for _ in range(int(seconds)):
+                tracker.on_event("now_playing", {
+                    "title": f"Track {i}", "artist": "Artist", "album": "Album",
+                    "duration": duration, "position": position, "playing": playing, "source": "bench",
+                })
+                now[0] += 1.0
+                position += 1.0 if playing else 0.0
+        tracker.on_event("now_playing", {"title": "", "artist": "", "album": "", "playing": False})
+        results[f"{name} ({duration}s)"] = len(sink.listens) == expected
+
+    # The same track again from the top is a second listen
+    now = [1_000_000.0]
+    sink = _Collect()
+    tracker = ScrobbleTracker(sink, clock=lambda: now[0])
+    for _ in range(2):
+        for position in range(200):
+            tracker.on_event("now_playing", {"title": "Loop", "artist": "A", "album": "", "duration": 200,
+                                             "position": float(position), "playing": True})
+            now[0] += 1.0
+    results["repeat counts twice"] = len(sink.listens) == 2
+    return results
+
+
+def make_backlog(path: str, listens: int, bad: int, seed: int) -> tuple:
+    """
+    Queue `listens` while offline; returns (expected accepted listens,
+    enqueue samples, what `pending` said once they were all stored).
+    """
+    rng = random.Random(seed)
+    bad_at = set(rng.sample(range(listens), bad))
+
+    def offline(batch):
+        raise ScrobbleRetry("offline")
+
+    q = ScrobbleQueue(path, offline, backoff=3600, max_backoff=3600)
+    start = int(time.time()) - listens * 200
+    expected, enqueue = [], []
+    for i in range(listens):
+        artist = "" if i in bad_at else f"Artist {rng.randrange(500)}"
+        listen = (start + i * 200, f"Track {i}", artist, f"Album {rng.randrange(2000)}", rng.uniform(120, 360), "bench")
+        if i % 100 == 0:
+            c = time.perf_counter()
+            q.add(listen)
+            enqueue.append(time.perf_counter() - c)
+        else:
+            q.add(listen)
+        if artist:
+            expected.append((listen[0], listen[1]))
+    deadline = time.monotonic() + 30
+    while q.pending < listens and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pending = q.pending
+    q.close(timeout=None)
+    return expected, enqueue, pending
+
+
+def drain(path: str, expected: list, batch_size: int, fake: FakeListenBrainz, outage: float) -> dict:
+    fake.start()
+    client = ListenBrainzClient(fake.token, fake.url, timeout=5)
+    errors = []
+    if outage:
+        def go_down():
+            # Offline for a while once a third of the backlog is through
+            while fake.accepted < len(expected) // 3:
+                time.sleep(0.005)
+            fake.down = True
+            time.sleep(outage)
+            fake.down = False
+
+        threading.Thread(target=go_down, daemon=True).start()
+
+    c = time.perf_counter()
+    q = ScrobbleQueue(path, client.submit, batch_size=batch_size, backoff=0.05, max_backoff=0.5,
+                      on_error=errors.append)
+    q.wait_idle()
+    seconds = time.perf_counter() - c
+    pending = q.pending
+    q.close()
+    fake.stop()
+
+    got = [(listen["listened_at"], listen["track_metadata"]["track_name"]) for listen in fake.listens]
+    return {
+        "seconds": round(seconds, 2),
+        "listens_per_s": int(len(got) / max(1e-9, seconds)),
+        "requests": fake.requests,
+        "server_errors": {str(k): v for k, v in sorted(fake.errors.items())},
+        "retries_logged": sum(1 for e in errors if "retrying" in e),
+        "refused_logged": sum(1 for e in errors if "refused" in e),
+        "delivered": len(got),
+        "pending_after_drain": pending,
+        "exactly_once_in_order": got == expected,
+    }
+
+
+def run(listens: int, bad: int, batch_size: int, fail_rate: float, rate_limit: int, outage: float, seed: int) -> dict:
+    tmp = tempfile.mkdtemp(prefix="rmp-scrobble-")
+    rules = check_rules()
+
+    clean_path = os.path.join(tmp, "clean.sqlite3")
+    expected_clean, _, backlog_pending = make_backlog(clean_path, listens, 0, seed)
+    clean = drain(clean_path, expected_clean, batch_size, FakeListenBrainz(seed=seed), 0.0)
+
+    faulty_path = os.path.join(tmp, "faulty.sqlite3")
+    expected_faulty, enqueue, _ = make_backlog(faulty_path, listens, bad, seed)
+    faulty = drain(faulty_path, expected_faulty, batch_size,
+                   FakeListenBrainz(fail_rate=fail_rate, rate_limit=rate_limit, seed=seed), outage)
+    faulty["dropped"] = listens - faulty["delivered"]
+
+    enqueue_stats = summarize(enqueue)
+    checks = {
+        "rules": all(rules.values()),
+        "clean_exactly_once": clean["exactly_once_in_order"],
+        "faulty_exactly_once": faulty["exactly_once_in_order"] and faulty["dropped"] == bad,
+        "clean_drain_rate": clean["listens_per_s"] >= DRAIN_BUDGET,
+        "enqueue_p99": enqueue_stats["p99"] <= ENQUEUE_BUDGET_MS,
+        "pending_counts": backlog_pending == listens
+        and clean["pending_after_drain"] == 0 and faulty["pending_after_drain"] == 0,
+    }
+    for name in os.listdir(tmp):
+        os.remove(os.path.join(tmp, name))
+    os.rmdir(tmp)
+    return {
+        "benchmark": "scrobble_drain",
+        "unit": "ms",
+        "config": {
+            "listens": listens, "bad": bad, "batch_size": batch_size, "fail_rate": fail_rate,
+            "rate_limit": rate_limit, "outage": outage, "seed": seed,
+        },
+        "rules": rules,
+        "enqueue": enqueue_stats,
+        "backlog_pending": backlog_pending,
+        "clean": clean,
+        "faulty": faulty,
+        "budgets": {"drain_listens_per_s": DRAIN_BUDGET, "enqueue_p99_ms": ENQUEUE_BUDGET_MS},
+        "checks": checks,
+        "passed": all(checks.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--listens", type=int, default=50_000)
+    parser.add_argument("--bad", type=int, default=5, help="listens the server refuses (faulty run)")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="share of 503 answers (faulty run)")
+    parser.add_argument("--rate-limit", type=int, default=50, help="requests per second before 429 (faulty run)")
+    parser.add_argument("--outage", type=float, default=1.0, help="seconds offline mid-drain (faulty run)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write JSON results here")
+    args = parser.parse_args()
+
+    result = run(args.listens, args.bad, args.batch_size, args.fail_rate, args.rate_limit, args.outage, args.seed)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
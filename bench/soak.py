@@ -0,0 +1,218 @@
+# bench/soak.py
+"""
+Soak test for the tray app: runs the real MainWindow + PresenceWorker on a
+virtual clock (offscreen Qt) through a simulated day of ticks, track changes
+and pauses, and checks that long-lived state stays bounded:
+
+  qobjects    QObjects owned by the window (animations, effects, timers)
+  py_heap     Python heap in use (tracemalloc)
+  rss         process resident set size
+
+Each is sampled every simulated half hour. After a warm-up hour, the
+growth from the first sample to the largest later one must stay within
+the budget, otherwise the exit status is 1.
+
+    python -m bench.soak --hours 24 --speed 600 --out soak.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from bench.fake_itunes import FakeITunes
+from core.clock import ScaledClock
+from core.models import NowPlaying
+from core.sources import Source, SourceAggregator
+
+BUDGETS = {
+    "qobjects": 25,             # objects
+    "py_heap": 8 * 1024 ** 2,   # bytes
+    "rss": 64 * 1024 ** 2,      # bytes
+}
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        # Peak rather than current outside Linux; still catches steady growth
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+class CountingDiscord:
+    """Counts updates without keeping them, so the harness itself stays flat."""
+
+    def __init__(self):
+        self.user = {"id": "0", "username": "soak", "discriminator": "0"}
+        self.updates = 0
+        self.clears = 0
+
+    async def update(self, **payload):
+        self.updates += 1
+        return {}
+
+    async def clear(self):
+        self.clears += 1
+        return {}
+
+    async def close(self):
+        pass
+
+
+class Playlist:
+    """Synthetic listening: tracks of 2-6 minutes, the odd pause and idle gap."""
+
+    def __init__(self, itunes: FakeITunes, seed: int = 1, catalog: int = 500):
+        self.rng = random.Random(seed)
+        self.count = 0
+        self.next_at = 0.0
+        self.current = None
+        # A fixed catalog registered up front; a day of listening cycles through it
+        self.catalog = [
+            (f"Soak Track {i:05d}", "Soak Artist", f"Soak Album {i // 10:04d}") for i in range(catalog)
+        ]
+        for title, artist, album in self.catalog:
+            itunes.add_track(title, artist, album)
+
+    def step(self, now: float):
+        """Next sample to push, or ... when nothing changes."""
+        if now < self.next_at:
+            return ...
+        roll = self.rng.random()
+        if self.current is not None and roll < 0.05:
+            # Pause for a while, then carry on with the same track
+            c = self.current
+            self.current = NowPlaying(c.title, c.artist, c.album, c.duration, c.position, not c.playing)
+            self.next_at = now + self.rng.uniform(30, 600)
+            return self.current
+        if roll < 0.07:
+            self.current = None
+            self.next_at = now + self.rng.uniform(60, 1800)
+            return None
+
+        title, artist, album = self.catalog[self.count % len(self.catalog)]
+        self.count += 1
+        duration = self.rng.uniform(120, 360)
+        self.current = NowPlaying(title, artist, album, duration, 0.0, True)
+        self.next_at = now + duration
+        return self.current
+
+
+def run(hours: float, speed: float, seed: int) -> dict:
+    from PySide6.QtCore import QCoreApplication, QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+
+    from ui.main_window import MainWindow
+
+    itunes = FakeITunes()
+    itunes.start()
+
+    clock = ScaledClock(speed=speed)
+    aggregator = SourceAggregator([Source("soak")], clock=clock)
+    discord = CountingDiscord()
+    playlist = Playlist(itunes, seed)
+
+    async def connect():
+        return discord
+
+    def lookup(title, artist, album=None, track_id=None):
+        for item in itunes._search(f"{title} {artist}"):
+            return item["artworkUrl100"], item["trackViewUrl"], item["collectionViewUrl"]
+        return None, None, None
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    win = MainWindow(worker_options={"sources": aggregator, "connect": connect, "lookup": lookup, "clock": clock})
+    win.show()
+    win._start_worker()
+    win.stack.setCurrentWidget(win._dashboard())
+
+    tracemalloc.start()
+    start = clock.monotonic()
+    end = start + hours * 3600
+    samples = []
+    sample_every = 1800.0
+    next_sample = [start]
+
+    def drive():
+        now = clock.monotonic()
+        np = playlist.step(now - start)
+        if np is not ...:
+            aggregator.push("soak", np)
+        if now >= next_sample[0]:
+            next_sample[0] += sample_every
+            # Let Qt run deferred deletes before counting
+            QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+            samples.append({
+                "hour": round((now - start) / 3600, 2),
+                "qobjects": len(win.findChildren(QObject)),
+                "py_heap": tracemalloc.get_traced_memory()[0],
+                "rss": rss_bytes(),
+            })
+        if now >= end:
+            app.quit()
+
+    driver = QTimer()
+    driver.timeout.connect(drive)
+    driver.start(5)
+    t0 = time.monotonic()
+    app.exec()
+    real_seconds = time.monotonic() - t0
+
+    driver.stop()
+    win._stop_worker()
+    itunes.stop()
+    tracemalloc.stop()
+
+    warm = [s for s in samples if s["hour"] >= 1.0] or samples
+    growth, passed = {}, True
+    for key, budget in BUDGETS.items():
+        first = warm[0][key]
+        delta = max(s[key] for s in warm) - first
+        growth[key] = {"first": first, "growth": delta, "budget": budget, "ok": delta <= budget}
+        passed = passed and delta <= budget
+
+    return {
+        "benchmark": "soak",
+        "config": {"hours": hours, "speed": speed, "seed": seed},
+        "real_seconds": round(real_seconds, 1),
+        "tracks": playlist.count,
+        "rpc_updates": discord.updates,
+        "artwork_requests": itunes.art_requests,
+        "growth": growth,
+        "passed": passed,
+        "samples": samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, default=24.0, help="simulated hours")
+    parser.add_argument("--speed", type=float, default=600.0, help="virtual seconds per real second")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write JSON results here")
+    args = parser.parse_args()
+
+    result = run(args.hours, args.speed, args.seed)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(json.dumps({k: v for k, v in result.items() if k != "samples"}, indent=2))
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+# bench/source_faults.py
+"""
+Source fault injection: the real PresenceEngine + SourceAggregator with
+fake sources that hang or crash, Discord and the iTunes lookup replaced by
+the counting stand-ins from bench/replay.py. Real time, short deadlines.
+
+  failover   the active source hangs mid-track; the engine must move to
+             the other playing source within the read deadline plus a tick
+             (measured from the start of the hung read), the hung read's
+             late answer must never reach the engine or Discord, and the
+             source takes over again once it answers
+  hung_idle  the only source hangs; status must say it isn't responding
+  crash      a source that raises on every read is read less and less
+             often (backoff) and reported as failing
+
+Throughout, engine ticks must stay fast: a hung read never blocks the loop.
+The scheduler is capped at a few polls so reads aren't stretched to 10 s.
+Exit status is 1 when a check fails.
+
+    python -m bench.source_faults --out faults.json
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+
+from bench.replay import CountingDiscord, CountingLookup
+from core.clock import SYSTEM_CLOCK
+from core.engine import PresenceEngine
+from core.metrics import REGISTRY
+from core.models import NowPlaying
+from core.sources import Source, SourceAggregator
+
+TIMEOUT = 0.5       # read deadline of the fake sources, seconds
+POLL = 0.1
+TICK_BUDGET_MS = 20.0
+
+
+class FakePlayer:
+    """read() returns `np`; after hang() a read blocks until release()."""
+
+    def __init__(self, np=None, answer_after_hang=None):
+        self.np = np
+        self.answer_after_hang = answer_after_hang
+        self.crash = False
+        self.reads = 0
+        self.blocked_at = None
+        self._hang = False
+        self._release = threading.Event()
+
+    def hang(self):
+        self._release.clear()
+        self._hang = True
+
+    def release(self):
+        self._hang = False
+        self._release.set()
+
+    def read(self):
+        self.reads += 1
+        if self._hang:
+            self.blocked_at = time.monotonic()
+            self._release.wait()
+            return self.answer_after_hang
+        if self.crash:
+            raise RuntimeError("player crashed")
+        return self.np
+
+
+def track(title: str, playing: bool = True) -> NowPlaying:
+    return NowPlaying(title, "Fault Artist", "Fault Album", 600.0, 10.0, playing)
+
+
+class Harness:
+    def __init__(self, players: dict):
+        self.sources = [
+            Source(name, player.read, priority=priority, poll_seconds=POLL, timeout=TIMEOUT)
+            for name, (player, priority) in players.items()
+        ]
+        self.aggregator = SourceAggregator(self.sources, cadence=POLL)
+        self.discord = CountingDiscord(SYSTEM_CLOCK)
+        self.engine = PresenceEngine(
+            sources=self.aggregator, poll_seconds=POLL, connect=self._connect,
+            lookup=CountingLookup(SYSTEM_CLOCK, latency=0.0),
+        )
+        scheduler = self.engine._scheduler
+        scheduler.max_playing = scheduler.max_paused = scheduler.max_idle = 4 * POLL
+        self.statuses = []
+        self.titles = []
+        self.engine.add_listener(self._on_event)
+        self._task = None
+
+    async def _connect(self):
+        return self.discord
+
+    def _on_event(self, event, data):
+        if event == "status":
+            self.statuses.append((time.monotonic(), data))
+        elif event == "now_playing":
+            self.titles.append((time.monotonic(), data.get("title")))
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self.engine.run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self.engine.stop()
+        await self._task
+
+    def details(self) -> list:
+        return [(t, payload.get("details")) for t, payload in self.discord.updates]
+
+    def shown_since(self, title: str, since: float) -> bool:
+        return any(t >= since and shown == title for t, shown in self.titles)
+
+    async def until(self, predicate, timeout: float) -> float:
+        """Seconds until predicate() holds, or None."""
+        start = time.monotonic()
+        while time.monotonic() - start < timeout:
+            if predicate():
+                return time.monotonic() - start
+            await asyncio.sleep(0.01)
+        return None
+
+
+async def failover() -> dict:
+    music = FakePlayer(track("Main Track"), answer_after_hang=track("Stale Answer"))
+    other = FakePlayer(track("Other Track"))
+    async with Harness({"apple-music": (music, 10), "gsmtc": (other, 0)}) as h:
+        started = await h.until(lambda: any(d == "Main Track" for _, d in h.details()), 5.0)
+        music.hang()
+        await h.until(lambda: music.blocked_at is not None, 5.0)
+        hung_at = music.blocked_at or time.monotonic()
+        moved = None
+        if await h.until(lambda: h.shown_since("Other Track", hung_at), 5.0) is not None:
+            moved = min(t for t, shown in h.titles if t >= hung_at and shown == "Other Track") - hung_at
+        health = h.sources[0].health
+        music.release()
+        released_at = time.monotonic()
+        back = await h.until(lambda: h.shown_since("Main Track", released_at), 5.0)
+        await asyncio.sleep(0.3)
+    timeouts = REGISTRY.counter("source_timeouts_total", {"source": "apple-music"}).value
+    return {
+        "started": started is not None,
+        "failover_s": round(moved, 3) if moved is not None else None,
+        "health_while_hung": health,
+        "recovered_s": round(back, 3) if back is not None else None,
+        "stale_published": any(shown == "Stale Answer" for _, shown in h.titles + h.details()),
+        "timeouts": timeouts,
+    }
+
+
+async def hung_idle() -> dict:
+    music = FakePlayer(track("Only Track", playing=False))
+    async with Harness({"apple-music": (music, 10)}) as h:
+        await h.until(lambda: any("Paused" in s for _, s in h.statuses), 5.0)
+        music.hang()
+        await h.until(lambda: music.blocked_at is not None, 5.0)
+        hung_at = music.blocked_at or time.monotonic()
+        reported = None
+        if await h.until(lambda: any(t >= hung_at and "isn't responding" in s for t, s in h.statuses), 5.0):
+            reported = min(t for t, s in h.statuses if t >= hung_at and "isn't responding" in s) - hung_at
+        music.release()
+        await asyncio.sleep(0.2)
+    return {
+        "reported_s": round(reported, 3) if reported is not None else None,
+        "statuses": [s for _, s in h.statuses],
+    }
+
+
+async def crash(seconds: float) -> dict:
+    broken = FakePlayer()
+    broken.crash = True
+    async with Harness({"broken": (broken, 0)}) as h:
+        await asyncio.sleep(seconds)
+    return {
+        "reads": broken.reads,
+        "reads_without_backoff": int(seconds / POLL),
+        "failures": h.sources[0].failures,
+        "health": h.sources[0].health,
+        "reported": any("is failing" in s for _, s in h.statuses),
+    }
+
+
+async def run(crash_seconds: float) -> dict:
+    ticks = REGISTRY.histogram("stage_seconds", {"stage": "engine_tick"})
+    before = ticks.count
+    results = {
+        "failover": await failover(),
+        "hung_idle": await hung_idle(),
+        "crash": await crash(crash_seconds),
+    }
+    tick_p99 = ticks.quantile(0.99) * 1000
+    f, i, c = results["failover"], results["hung_idle"], results["crash"]
+    deadline = TIMEOUT + 4 * POLL + 0.2
+    checks = {
+        "failover_within_deadline": f["failover_s"] is not None and f["failover_s"] <= deadline,
+        "hung_reported": f["health_while_hung"] == "hung" and f["timeouts"] >= 1,
+        "late_answer_dropped": not f["stale_published"],
+        "recovers": f["recovered_s"] is not None,
+        "idle_status": i["reported_s"] is not None and i["reported_s"] <= deadline,
+        "crash_backoff": c["reads"] <= c["reads_without_backoff"] // 4,
+        "crash_reported": c["reported"] and c["health"] == "failing",
+        "tick_p99": tick_p99 <= TICK_BUDGET_MS,
+    }
+    return {
+        "benchmark": "source_faults",
+        "unit": "s",
+        "config": {"timeout": TIMEOUT, "poll": POLL, "crash_seconds": crash_seconds},
+        "results": results,
+        "engine_tick_ms": {"count": ticks.count - before, "p99": round(tick_p99, 3)},
+        "budgets": {"failover_s": deadline, "tick_p99_ms": TICK_BUDGET_MS},
+        "checks": checks,
+        "passed": all(checks.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crash-seconds", type=float, default=5.0, help="how long the crashing source runs")
+    parser.add_argument("--out", help="write JSON results here")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.crash_seconds))
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
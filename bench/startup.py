@@ -0,0 +1,139 @@
+# bench/startup.py
+"""
+Cold start of the window, each run in a fresh interpreter on the offscreen
+platform (no daemon running, empty app data folder):
+
+  interpreter_ms   process spawn -> first line of Python
+  import_ms        PySide6 widgets + ui.main_window
+  construct_ms     MainWindow()
+  first_frame_ms   process spawn -> first paint of the window
+  heavy_modules    networking/RPC modules already imported at the first
+                   frame (must be empty; they load on Connect)
+
+Times are summarized over --runs (ms). Exit status is 1 when a p50 is over
+budget or a heavy module was imported.
+
+    python -m bench.startup --out startup.json [--compare previous-startup.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench.stats import compare, summarize
+
+BUDGETS = {
+    "import_ms": 400.0,
+    "construct_ms": 150.0,
+    "first_frame_ms": 900.0,
+}
+
+# None of these are needed to show the connect page
+HEAVY_MODULES = (
+    "requests", "pypresence", "asyncio", "http.server",
+    "core.engine", "core.discord_rpc", "core.itunes_lookup", "core.control", "ui.worker",
+)
+
+
+def child():
+    """Runs inside the measured process; mirrors app.main() up to the first frame."""
+    entered = time.time()
+    t0 = time.perf_counter()
+    from PySide6.QtCore import QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+    from ui.main_window import MainWindow
+    t1 = time.perf_counter()
+
+    app = QApplication(sys.argv[:1])
+    app.setQuitOnLastWindowClosed(False)
+    t2 = time.perf_counter()
+    win = MainWindow()
+    t3 = time.perf_counter()
+    report = {}
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and "first_frame" not in report:
+                report["first_frame"] = time.time()
+                report["heavy_modules"] = [m for m in HEAVY_MODULES if m in sys.modules]
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    spy = FirstPaint()
+    win.installEventFilter(spy)
+    win.show()
+    QTimer.singleShot(10_000, app.quit)
+    app.exec()
+
+    report.update({"entered": entered, "import_s": t1 - t0, "construct_s": t3 - t2})
+    print(json.dumps(report), flush=True)
+
+
+def run_once(env: dict) -> dict:
+    spawned = time.time()
+    out = subprocess.run(
+        [sys.executable, "-m", "bench.startup", "--child"],
+        env=env, capture_output=True, text=True, timeout=60,
+    ).stdout
+    report = json.loads(out.strip().splitlines()[-1])
+    report["interpreter_s"] = report["entered"] - spawned
+    report["first_frame_s"] = report.get("first_frame", float("nan")) - spawned
+    return report
+
+
+def run(runs: int) -> dict:
+    home = tempfile.mkdtemp(prefix="rmp-startup-")
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", HOME=home, XDG_DATA_HOME=home, APPDATA=home)
+    env.pop("RMP_IN_PROCESS", None)
+
+    run_once(env)  # warm the OS file cache; a release is judged on warm starts
+    reports = [run_once(env) for _ in range(runs)]
+
+    metrics = {
+        name + "_ms": summarize([r[name + "_s"] for r in reports])
+        for name in ("interpreter", "import", "construct", "first_frame")
+    }
+    heavy = sorted({m for r in reports for m in r.get("heavy_modules", ["no frame"])})
+    checks = {key: metrics[key]["p50"] <= budget for key, budget in BUDGETS.items()}
+    checks["no_heavy_modules"] = not heavy
+    return {
+        "benchmark": "startup",
+        "unit": "ms",
+        "config": {"runs": runs, "python": sys.version.split()[0]},
+        "metrics": metrics,
+        "budgets": BUDGETS,
+        "heavy_modules": heavy,
+        "checks": checks,
+        "passed": all(checks.values()),
+    }
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child()
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--out", help="write JSON results here")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        result["p50_vs_baseline"] = compare(result["metrics"], baseline.get("metrics", {}), key="p50")
+    text = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    print(text)
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
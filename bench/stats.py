@@ -0,0 +1,32 @@
+# bench/stats.py
+from typing import Dict, List
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    idx = min(len(values) - 1, max(0, int(round(q / 100 * (len(values) - 1)))))
+    return values[idx]
+
+
+def summarize(values: List[float], scale: float = 1000.0, digits: int = 3) -> Dict[str, float]:
+    """n / p50 / p95 / p99 / max, scaled (seconds -> ms by default)."""
+    return {
+        "n": len(values),
+        "p50": round(percentile(values, 50) * scale, digits),
+        "p95": round(percentile(values, 95) * scale, digits),
+        "p99": round(percentile(values, 99) * scale, digits),
+        "max": round(max(values) * scale, digits) if values else 0.0,
+    }
+
+
+def compare(current: Dict, baseline: Dict, key: str = "p95") -> Dict[str, float]:
+    """Ratio current/baseline of `key` for every metric present in both."""
+    out = {}
+    for name, stats in current.items():
+        base = baseline.get(name)
+        if isinstance(stats, dict) and isinstance(base, dict) and base.get(key):
+            out[name] = round(stats.get(key, 0.0) / base[key], 3)
+    return out
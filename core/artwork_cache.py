@@ -0,0 +1,74 @@
+# core/artwork_cache.py
+import hashlib
+from typing import NamedTuple, Optional
+
+import requests
+
+from .lru import LRUCache
+from .metrics import REGISTRY
+from .settings import SETTINGS
+
+
+class Artwork(NamedTuple):
+    data: bytes
+    content_type: str
+    etag: str
+
+
+class ArtworkCache:
+    """
+    Downloaded artwork bytes by URL, least recently used first out once
+    `max_bytes` is exceeded. Thread-safe; a miss downloads on the caller's
+    thread, so keep it off event loops.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, timeout: float = 4.0):
+        self.timeout = timeout
+        self._entries = LRUCache(max_bytes, weigh=lambda art: len(art.data))
+        self._http = requests.Session()
+        self._hits = REGISTRY.counter("artwork_cache_hits_total", help="Artwork served from memory")
+        self._misses = REGISTRY.counter("artwork_cache_misses_total", help="Artwork downloaded")
+        REGISTRY.gauge("artwork_cache_bytes", help="Artwork cache size", fn=lambda: self._entries.weight)
+
+    @property
+    def max_bytes(self) -> int:
+        return self._entries.maxsize
+
+    def peek(self, url: str) -> Optional[Artwork]:
+        return self._entries.get(url)
+
+    def get_cached(self, url: str) -> Optional[Artwork]:
+        """get() without the download: None on a miss."""
+        art = self.peek(url)
+        if art is not None:
+            self._hits.inc()
+        return art
+
+    def get(self, url: str, timeout: Optional[float] = None) -> Optional[Artwork]:
+        art = self.peek(url)
+        if art is not None:
+            self._hits.inc()
+            return art
+        self._misses.inc()
+        try:
+            r = self._http.get(url, timeout=timeout or self.timeout)
+            r.raise_for_status()
+        except requests.RequestException:
+            return None
+        art = Artwork(
+            data=r.content,
+            content_type=r.headers.get("Content-Type", "image/jpeg").split(";")[0],
+            etag='"%s"' % hashlib.sha1(r.content).hexdigest()[:16],
+        )
+        self.put(url, art)
+        return art
+
+    def put(self, url: str, art: Artwork):
+        self._entries.put(url, art)
+
+    def resize(self, max_bytes: int):
+        self._entries.resize(max_bytes)
+
+
+ARTWORK_CACHE = ArtworkCache(max_bytes=SETTINGS.profile.artwork_cache_mb * 1024 * 1024)
+SETTINGS.subscribe(lambda profile: ARTWORK_CACHE.resize(profile.artwork_cache_mb * 1024 * 1024))
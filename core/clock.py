@@ -0,0 +1,36 @@
+# core/clock.py
+import time
+
+
+class Clock:
+    """Wall/monotonic time plus the real duration of a timeout."""
+
+    speed = 1.0
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def time(self) -> float:
+        return time.time()
+
+    def real(self, seconds: float) -> float:
+        """Real seconds to wait for `seconds` of clock time."""
+        return seconds / self.speed
+
+
+class ScaledClock(Clock):
+    """Virtual clock running `speed` times faster than real time."""
+
+    def __init__(self, speed: float = 100.0, start: float = 0.0):
+        self.speed = speed
+        self._start = start
+        self._real_start = time.monotonic()
+
+    def monotonic(self) -> float:
+        return self._start + (time.monotonic() - self._real_start) * self.speed
+
+    def time(self) -> float:
+        return self.monotonic()
+
+
+SYSTEM_CLOCK = Clock()
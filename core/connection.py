@@ -0,0 +1,161 @@
+# core/connection.py
+import asyncio
+import time
+from typing import Callable, Optional
+
+from .discord_rpc import account_from_user, connect_to_discord, ready_user
+
+
+def is_link_error(exc: BaseException) -> bool:
+    """True if the IPC pipe is gone (as opposed to Discord rejecting a command)."""
+    return isinstance(exc, (ConnectionError, EOFError, OSError, asyncio.IncompleteReadError))
+
+
+class NotConnected(ConnectionError):
+    pass
+
+
+class DiscordSupervisor:
+    """
+    Keeps a Discord IPC link up. Connects, reports the READY user as soon as
+    the handshake returns, notices a lost pipe (the client's reader sees EOF,
+    or a call fails) and reconnects with backoff. Retries stay tight
+    (max_backoff) for a while so presence comes back about a second after
+    Discord does, then relax to idle_backoff.
+    """
+
+    def __init__(
+        self,
+        connect: Callable = connect_to_discord,
+        on_event: Optional[Callable[[str, object], None]] = None,
+        min_backoff: float = 0.25,
+        max_backoff: float = 1.0,
+        idle_backoff: float = 5.0,
+        idle_after: float = 60.0,
+    ):
+        self._connect_fn = connect
+        self._on_event = on_event or (lambda event, data: None)
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.idle_backoff = idle_backoff
+        self.idle_after = idle_after
+
+        self.client = None
+        self.connects = 0
+        self._running = True
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connected: Optional[asyncio.Event] = None
+        self._lost: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connected is not None and self._connected.is_set()
+
+    async def wait_connected(self):
+        await self._connected.wait()
+
+    def mark_lost(self):
+        """Thread-safe: the link is known to be gone."""
+        loop, lost = self._loop, self._lost
+        if loop is None or lost is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(lost.set)
+        except RuntimeError:
+            pass
+
+    async def call(self, fn, *args, **kwargs):
+        """Await a client call; link errors trigger a reconnect."""
+        if not self.connected:
+            raise NotConnected("Discord not connected")
+        try:
+            return await fn(*args, **kwargs)
+        except Exception as e:
+            if is_link_error(e):
+                self._lost.set()
+            raise
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._connected = asyncio.Event()
+        self._lost = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+        delay = self.min_backoff
+        down_since = time.monotonic()
+        try:
+            self._on_event("status", "Connecting to Discord…")
+            while self._running:
+                try:
+                    client = await self._connect_fn()
+                except Exception as e:
+                    down_for = time.monotonic() - down_since
+                    if self.connects == 0 and delay == self.min_backoff:
+                        self._on_event("status", f"Discord connect failed: {e} — retrying")
+                    cap = self.max_backoff if down_for < self.idle_after else self.idle_backoff
+                    try:
+                        await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    delay = min(delay * 2, cap)
+                    continue
+
+                self.client = client
+                if not self._running:
+                    await self._close_client()
+                    break
+                self.connects += 1
+                delay = self.min_backoff
+                self._lost.clear()
+                if hasattr(client, "set_close_callback"):
+                    client.set_close_callback(self.mark_lost)
+                self._connected.set()
+                self._on_event("status", "Discord connected ✅")
+                self._on_event("account", self._account(client))
+                self._on_event("connected", client)
+
+                await self._lost.wait()
+
+                self._connected.clear()
+                down_since = time.monotonic()
+                if self._running:
+                    self._on_event("status", "Discord connection lost — reconnecting…")
+                    self._on_event("disconnected", None)
+                await self._close_client()
+        finally:
+            self._connected.clear()
+            await self._close_client()
+
+    async def stop(self, clear: bool = False):
+        """
+        Stop supervising; optionally clear presence first. run() closes the
+        link and returns shortly after.
+        """
+        self._running = False
+        if self._lost is None:
+            return
+        if self.connected and clear:
+            try:
+                await asyncio.wait_for(self.call(self.client.clear), timeout=2)
+            except Exception:
+                pass
+        self._connected.clear()
+        self._stopping.set()
+        self._lost.set()
+
+    async def _close_client(self):
+        client, self.client = self.client, None
+        if client is None:
+            return
+        try:
+            await asyncio.wait_for(client.close(), timeout=2)
+        except Exception:
+            pass
+
+    def _account(self, client) -> dict:
+        try:
+            info = account_from_user(ready_user(client) or {})
+        except Exception:
+            info = None
+        return info or {"name": "Connected", "avatar_url": ""}
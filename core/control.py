@@ -0,0 +1,271 @@
+# core/control.py
+import asyncio
+import json
+import math
+import os
+import secrets
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Set
+
+from .metrics import REGISTRY
+from .models import EMPTY_NOW_PLAYING
+from .paths import app_data_dir
+from .settings import SETTINGS, Profile
+from .trace import TRACER, new_trace_path
+
+if TYPE_CHECKING:
+    # The window imports this module for read_control_info; keep the engine out of it
+    from .engine import PresenceEngine
+
+PROTOCOL_VERSION = 1
+
+# A standby daemon (warmed up for a window that hasn't connected yet) exits
+# this long after its last client leaves
+STANDBY_GRACE_SECONDS = 10.0
+
+# Newline-delimited JSON over 127.0.0.1. The daemon writes its port and a
+# random token to daemon.json (user-only permissions); a client must send
+# the token in its hello before anything else.
+#
+#   client -> daemon   {"cmd": "hello", "v": 1, "token": "..."}
+#                      {"cmd": "poll_seconds", "seconds": 1}
+#                      {"cmd": "activate"}        start showing presence (standby daemon)
+#                      {"cmd": "reload_settings"} settings.json changed (profile picked in the tray)
+#                      {"cmd": "shutdown"}        stop presence and exit
+#                      {"cmd": "metrics"}         the daemon's metrics registry (debug panel)
+#                      {"cmd": "trace", "on": true | false}
+#                                                 start tracing / stop and save the trace
+#                      {"cmd": "ping"}
+#   daemon -> client   {"type": "snapshot", "state": {"status", "account", "now_playing", "active"}}
+#                      {"type": "delta", "event": "status" | "account" | "active", "data": ...}
+#                      {"type": "delta", "event": "now_playing", "data": {changed fields}}
+#                      {"type": "metrics", "metrics": Registry.snapshot()}
+#                      {"type": "trace", "on": bool, "path": str, "spans": int} ("error": str if not saved)
+#                      {"type": "pong"}
+
+
+def control_file() -> Path:
+    return app_data_dir() / "daemon.json"
+
+
+def read_control_info(path=None) -> Optional[dict]:
+    try:
+        with open(path or control_file(), "r", encoding="utf-8") as fh:
+            info = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if info.get("v") != PROTOCOL_VERSION or not info.get("port"):
+        return None
+    return info
+
+
+async def daemon_running(path=None) -> bool:
+    """True if the daemon named in the control file answers on its port."""
+    info = read_control_info(path)
+    if not info:
+        return False
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", info["port"]), timeout=1.0)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+class _Client:
+    def __init__(self, server: "ControlServer", writer: asyncio.StreamWriter, queue_size: int):
+        self.server = server
+        self.writer = writer
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def send(self, message: dict):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Slow reader: drop the backlog and resync from a fresh snapshot
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(self.server.snapshot_message())
+
+    async def write_loop(self):
+        while True:
+            message = await self.queue.get()
+            self.writer.write(json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n")
+            await self.writer.drain()
+
+
+class ControlServer:
+    """
+    Exposes a running PresenceEngine to local clients: the current state on
+    attach, then deltas, plus a few commands. Runs on the engine's loop, so
+    listener callbacks need no locking.
+    """
+
+    def __init__(
+        self,
+        engine: "PresenceEngine",
+        info_path=None,
+        queue_size: int = 256,
+        standby_grace: float = STANDBY_GRACE_SECONDS,
+    ):
+        self.engine = engine
+        self.info_path = Path(info_path) if info_path else control_file()
+        self._queue_size = queue_size
+        self._clients: Set[_Client] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._standby_grace = standby_grace
+        self._standby_timer: Optional[asyncio.TimerHandle] = None
+        self._token = secrets.token_hex(16)
+        self._state = {
+            "status": "", "account": None, "now_playing": dict(EMPTY_NOW_PLAYING), "active": engine.active,
+        }
+        engine.add_listener(self._on_event)
+        SETTINGS.subscribe(self._on_profile)
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1] if self._server else 0
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        info = {"v": PROTOCOL_VERSION, "port": self.port, "pid": os.getpid(), "token": self._token}
+        self.info_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.info_path.with_suffix(".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(info, fh)
+        os.replace(tmp, self.info_path)
+        self._arm_standby_timer()
+
+    async def close(self):
+        SETTINGS.unsubscribe(self._on_profile)
+        if self._standby_timer:
+            self._standby_timer.cancel()
+        if self._server:
+            self._server.close()
+            self._server = None
+        for client in list(self._clients):
+            client.writer.close()
+        self._clients.clear()
+        info = read_control_info(self.info_path)
+        if info and info.get("pid") == os.getpid():
+            try:
+                self.info_path.unlink()
+            except OSError:
+                pass
+
+    def snapshot_message(self) -> dict:
+        return {
+            "type": "snapshot",
+            "state": {
+                "status": self._state["status"],
+                "account": self._state["account"],
+                "now_playing": dict(self._state["now_playing"]),
+                "active": self._state["active"],
+            },
+        }
+
+    # ----------------------------------------------------------------
+
+    def _on_event(self, event: str, data):
+        if event == "now_playing":
+            current = self._state["now_playing"]
+            changes = {k: v for k, v in data.items() if current.get(k) != v}
+            if not changes:
+                return
+            current.update(changes)
+            data = changes
+        elif event in ("status", "account", "active"):
+            if self._state[event] == data:
+                return
+            self._state[event] = data
+        else:
+            return
+        message = {"type": "delta", "event": event, "data": data}
+        for client in list(self._clients):
+            client.send(message)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            hello = json.loads(await asyncio.wait_for(reader.readline(), timeout=5.0) or b"{}")
+        except (asyncio.TimeoutError, ValueError, ConnectionError):
+            writer.close()
+            return
+        if (
+            not isinstance(hello, dict)
+            or hello.get("cmd") != "hello"
+            or hello.get("v") != PROTOCOL_VERSION
+            or not secrets.compare_digest(str(hello.get("token", "")), self._token)
+        ):
+            writer.close()
+            return
+
+        if self._standby_timer:
+            self._standby_timer.cancel()
+            self._standby_timer = None
+        client = _Client(self, writer, self._queue_size)
+        client.send(self.snapshot_message())
+        self._clients.add(client)
+        write_task = asyncio.create_task(client.write_loop())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    self._command(client, json.loads(line))
+                except (ValueError, TypeError, AttributeError, KeyError):
+                    continue
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(client)
+            write_task.cancel()
+            writer.close()
+            if not self._clients:
+                # Window gone: back to the daemon's own cadence
+                self.engine.set_poll_seconds(SETTINGS.profile.poll_background)
+                self._arm_standby_timer()
+
+    def _on_profile(self, profile: Profile):
+        # With a window attached, it sets the cadence itself
+        if not self._clients:
+            self.engine.set_poll_seconds(profile.poll_background)
+
+    def _arm_standby_timer(self):
+        # A standby daemon nobody is attached to (window closed before
+        # connecting, or crashed) stops instead of lingering
+        if not self.engine.active and not self._clients:
+            self._standby_timer = asyncio.get_running_loop().call_later(self._standby_grace, self.engine.stop)
+
+    def _command(self, client: _Client, message: dict):
+        cmd = message.get("cmd")
+        if cmd == "poll_seconds":
+            seconds = float(message.get("seconds"))
+            if math.isfinite(seconds):
+                self.engine.set_poll_seconds(max(0.5, seconds))
+        elif cmd == "reload_settings":
+            SETTINGS.load()
+        elif cmd == "activate":
+            self.engine.activate()
+        elif cmd == "shutdown":
+            self.engine.stop()
+        elif cmd == "metrics":
+            client.send({"type": "metrics", "metrics": REGISTRY.snapshot()})
+        elif cmd == "trace":
+            client.send(self._trace(bool(message.get("on"))))
+        elif cmd == "ping":
+            client.send({"type": "pong"})
+
+    def _trace(self, on: bool) -> dict:
+        if on:
+            TRACER.start()
+            return {"type": "trace", "on": True}
+        TRACER.stop()
+        path = new_trace_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            spans = TRACER.dump(path)
+        except OSError as e:
+            return {"type": "trace", "on": False, "error": str(e)}
+        return {"type": "trace", "on": False, "path": str(path), "spans": spans}
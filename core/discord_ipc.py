@@ -0,0 +1,248 @@
+# core/discord_ipc.py
+import asyncio
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+# Frame opcodes
+OP_HANDSHAKE = 0
+OP_FRAME = 1
+OP_CLOSE = 2
+OP_PING = 3
+OP_PONG = 4
+
+FRAME_HEADER = struct.Struct("<II")
+
+
+class IPCError(Exception):
+    """Discord answered a command with an ERROR event."""
+
+    def __init__(self, code, message: str):
+        super().__init__(f"{message} ({code})")
+        self.code = code
+
+
+def ipc_paths() -> List[str]:
+    """Candidate IPC endpoints, in the order the Discord client tries them."""
+    if sys.platform == "win32":
+        return [rf"\\?\pipe\discord-ipc-{i}" for i in range(10)]
+
+    bases = []
+    for var in ("XDG_RUNTIME_DIR", "TMPDIR", "TMP", "TEMP"):
+        value = os.environ.get(var)
+        if value and value not in bases:
+            bases.append(value)
+    for value in (tempfile.gettempdir(), "/tmp"):
+        if value not in bases:
+            bases.append(value)
+
+    paths = []
+    for base in bases:
+        # Plain, Flatpak and Snap installs
+        for sub in ("", "app/com.discordapp.Discord", "snap.discord"):
+            d = os.path.join(base, sub) if sub else base
+            paths.extend(os.path.join(d, f"discord-ipc-{i}") for i in range(10))
+    return paths
+
+
+async def _open(path: str):
+    if sys.platform == "win32":
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        protocol = asyncio.StreamReaderProtocol(reader)
+        transport, _ = await loop.create_pipe_connection(lambda: protocol, path)
+        writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+        return reader, writer
+    return await asyncio.open_unix_connection(path)
+
+
+def activity_from_payload(payload: dict) -> dict:
+    """Flat presence payload (see build_presence_payload) -> SET_ACTIVITY activity."""
+    activity = {"type": payload.get("activity_type", 2)}
+    for key in ("details", "state"):
+        if payload.get(key):
+            activity[key] = payload[key]
+
+    assets = {
+        key: payload[key]
+        for key in ("large_image", "large_text", "small_image", "small_text")
+        if payload.get(key)
+    }
+    if assets:
+        activity["assets"] = assets
+
+    timestamps = {key: payload[key] for key in ("start", "end") if payload.get(key) is not None}
+    if timestamps:
+        activity["timestamps"] = timestamps
+
+    if payload.get("buttons"):
+        activity["buttons"] = payload["buttons"]
+    return activity
+
+
+class DiscordIPC:
+    """
+    Asyncio Discord RPC client: opcode/length framing, handshake, and
+    SET_ACTIVITY commands correlated to their responses by nonce. Commands
+    are pipelined (several can be in flight); a reader task resolves them
+    and notices the pipe closing.
+    """
+
+    def __init__(self, client_id: str, path: Optional[str] = None):
+        self.client_id = client_id
+        self.path = path
+        self.user: Optional[dict] = None
+        self.last_ack_latency = 0.0
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._sent_at: Dict[str, float] = {}
+        self._on_close: Optional[Callable[[], None]] = None
+        self._closed = True
+
+    @property
+    def connected(self) -> bool:
+        return not self._closed
+
+    def set_close_callback(self, callback: Callable[[], None]):
+        self._on_close = callback
+
+    async def connect(self, timeout: float = 5.0) -> dict:
+        """Open the pipe, handshake and wait for READY. Returns the READY data."""
+        last_error: Optional[Exception] = None
+        for path in [self.path] if self.path else ipc_paths():
+            try:
+                self._reader, self._writer = await _open(path)
+                break
+            except (OSError, ValueError) as e:
+                last_error = e
+        else:
+            raise ConnectionError(f"Discord IPC not found ({last_error})")
+
+        self._closed = False
+        self._write(OP_HANDSHAKE, {"v": 1, "client_id": self.client_id})
+        try:
+            op, data = await asyncio.wait_for(self._read_frame(), timeout=timeout)
+        except Exception:
+            await self.close()
+            raise
+
+        if op == OP_CLOSE or data.get("evt") != "READY":
+            await self.close()
+            raise ConnectionError(f"Discord handshake rejected: {data.get('message') or data}")
+
+        ready = data.get("data") or {}
+        self.user = ready.get("user")
+        self._reader_task = asyncio.create_task(self._read_loop())
+        return ready
+
+    def send_command(self, cmd: str, args: dict) -> asyncio.Future:
+        """Write a command without waiting; the future resolves with its response."""
+        if self._closed:
+            raise ConnectionError("Discord IPC closed")
+        nonce = uuid.uuid4().hex
+        fut = asyncio.get_running_loop().create_future()
+        # Fire-and-forget callers may never await it; don't warn about that.
+        # A caller that gave up (cancelled) leaves nothing pending behind.
+        fut.add_done_callback(lambda f: self._forget(nonce) if f.cancelled() else f.exception())
+        self._pending[nonce] = fut
+        self._sent_at[nonce] = time.monotonic()
+        self._write(OP_FRAME, {"cmd": cmd, "args": args, "nonce": nonce})
+        return fut
+
+    def send_activity(self, activity: Optional[dict]) -> asyncio.Future:
+        return self.send_command("SET_ACTIVITY", {"pid": os.getpid(), "activity": activity})
+
+    # pypresence-style surface used by the engine
+
+    async def update(self, **payload) -> dict:
+        return await self.send_activity(activity_from_payload(payload))
+
+    async def clear(self) -> dict:
+        return await self.send_activity(None)
+
+    async def close(self):
+        if self._closed and self._writer is None:
+            return
+        self._closed = True
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            try:
+                self._write_to(writer, OP_CLOSE, {})
+                writer.close()
+                await asyncio.wait_for(writer.wait_closed(), timeout=1)
+            except Exception:
+                pass
+        task = self._reader_task
+        if task and task is not asyncio.current_task():
+            task.cancel()
+        self._fail_pending(ConnectionError("Discord IPC closed"))
+
+    # ----------------------------------------------------------------
+
+    def _write(self, op: int, payload: dict):
+        self._write_to(self._writer, op, payload)
+
+    @staticmethod
+    def _write_to(writer: asyncio.StreamWriter, op: int, payload: dict):
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        writer.write(FRAME_HEADER.pack(op, len(body)) + body)
+
+    async def _read_frame(self):
+        header = await self._reader.readexactly(FRAME_HEADER.size)
+        op, length = FRAME_HEADER.unpack(header)
+        body = await self._reader.readexactly(length) if length else b"{}"
+        return op, json.loads(body.decode("utf-8"))
+
+    async def _read_loop(self):
+        try:
+            while True:
+                op, data = await self._read_frame()
+                if op == OP_PING:
+                    self._write(OP_PONG, data)
+                elif op == OP_CLOSE:
+                    break
+                elif op == OP_FRAME:
+                    self._resolve(data)
+        except asyncio.CancelledError:
+            return
+        except Exception:
+            pass
+
+        # Pipe gone (EOF, reset or CLOSE frame)
+        was_open = not self._closed
+        await self.close()
+        if was_open and self._on_close:
+            self._on_close()
+
+    def _resolve(self, data: dict):
+        nonce = data.get("nonce")
+        fut = self._pending.pop(nonce, None) if nonce else None
+        sent = self._sent_at.pop(nonce, None) if nonce else None
+        if sent is not None:
+            self.last_ack_latency = time.monotonic() - sent
+        if fut is None or fut.done():
+            return
+        if data.get("evt") == "ERROR":
+            err = data.get("data") or {}
+            fut.set_exception(IPCError(err.get("code"), err.get("message", "Discord error")))
+        else:
+            fut.set_result(data.get("data") or {})
+
+    def _forget(self, nonce: str):
+        self._pending.pop(nonce, None)
+        self._sent_at.pop(nonce, None)
+
+    def _fail_pending(self, exc: Exception):
+        pending, self._pending = self._pending, {}
+        self._sent_at.clear()
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
@@ -1,10 +1,8 @@
 #core/discord_rpc.py
 import time
 from typing import Optional
-from pypresence import Presence
-from pypresence.types import ActivityType
+from .discord_ipc import DiscordIPC
 from .models import NowPlaying
-from .itunes_lookup import lookup_artwork_and_urls
 import urllib.parse
 
 
@@ -12,41 +10,64 @@ import urllib.parse
 # APP ID
 APP_CLIENT_ID = "1465803809761792193"
 
+# Discord activity types
+ACTIVITY_LISTENING = 2
+
 def apple_music_search_url(title: str, artist: str) -> str:
     q = urllib.parse.quote(f"{title} {artist}".strip())
     return f"https://music.apple.com/us/search?term={q}"
 
-def connect_to_discord() -> Presence:
-    rpc = Presence(APP_CLIENT_ID)
-    rpc.connect()
+async def connect_to_discord(path: Optional[str] = None) -> DiscordIPC:
+    rpc = DiscordIPC(APP_CLIENT_ID, path=path)
+    # connect() returns once the handshake's READY payload has been read
+    await rpc.connect()
+    return rpc
 
-    # Give Discord time to send READY payload
-    time.sleep(0.3)
 
-    try:
-        user = rpc.user or {}
-        name = user.get("username", "Unknown")
-        disc = user.get("discriminator", "")
-        display = f"{name}#{disc}" if disc and disc != "0" else name
+def ready_user(rpc) -> Optional[dict]:
+    """User object from the READY payload, if the client kept it."""
+    user = getattr(rpc, "user", None)
+    return user if isinstance(user, dict) else None
 
-        print(f"[RPC] Connected as {display}")
-    except Exception:
-        print("[RPC] Connected")
 
-    return rpc
+def account_from_user(user: dict) -> Optional[dict]:
+    """Discord READY user -> {"name", "avatar_url"}, or None if not there yet."""
+    username = user.get("username")
+    if not username:
+        return None
+
+    disc = user.get("discriminator", "")
+    display = f"{username}#{disc}" if disc and disc != "0" else username
+
+    user_id = user.get("id", "")
+    avatar = user.get("avatar")  # can be None
+    avatar_url = ""
 
+    # Custom avatar
+    if user_id and avatar:
+        ext = "gif" if str(avatar).startswith("a_") else "png"
+        avatar_url = f"https://cdn.discordapp.com/avatars/{user_id}/{avatar}.{ext}?size=128"
 
-def update_presence(
-    rpc: Presence,
+    # Default avatar fallback
+    elif user_id:
+        # discriminator can be "0" for newer usernames; fall back to 0 in that case
+        try:
+            disc_num = int(disc) if disc and disc.isdigit() else 0
+        except Exception:
+            disc_num = 0
+        default_index = disc_num % 5
+        avatar_url = f"https://cdn.discordapp.com/embed/avatars/{default_index}.png"
+
+    return {"name": display, "avatar_url": avatar_url}
+
+
+def build_presence_payload(
     np: NowPlaying,
     artwork_url: Optional[str] = None,
     track_url: Optional[str] = None,
     album_url: Optional[str] = None,
-    allow_lookup: bool = True,
-):
-    if allow_lookup and (artwork_url is None and track_url is None and album_url is None):
-        artwork_url, track_url, album_url = lookup_artwork_and_urls(np.title, np.artist, np.album)
-
+    now: Optional[float] = None,
+) -> dict:
     payload = {
         "details": np.title[:128],
         "state": (f"{np.artist} • {np.album}" if np.album else np.artist)[:128],
@@ -57,7 +78,7 @@ def update_presence(
         "small_image": "play" if np.playing else "pause",
         "small_text": (np.album)[:128],
 
-        "activity_type": ActivityType.LISTENING,
+        "activity_type": ACTIVITY_LISTENING,
     }
 
     buttons = []
@@ -74,8 +95,8 @@ def update_presence(
 
     # Progress bar only while playing
     if np.playing and np.duration > 0:
-        start = int(time.time() - np.position)
+        start = int((time.time() if now is None else now) - np.position)
         payload["start"] = start
         payload["end"] = start + int(np.duration)
 
-    rpc.update(**payload)
+    return payload
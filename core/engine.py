@@ -0,0 +1,394 @@
+# core/engine.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Callable, List, Optional
+
+from .clock import SYSTEM_CLOCK, Clock
+from .connection import DiscordSupervisor, NotConnected, is_link_error
+from .discord_rpc import build_presence_payload, connect_to_discord
+from .itunes_lookup import lookup_artwork_and_urls
+from .metrics import REGISTRY
+from .models import EMPTY_NOW_PLAYING, NowPlaying
+from .publisher import PresencePublisher
+from .scheduler import PollScheduler
+from .settings import Profile
+from .sources import SourceAggregator, default_aggregator
+from .trace import TRACER
+
+# Listener signature: callback(event, data)
+#   "status"      -> str
+#   "account"     -> {"name": str, "avatar_url": str}
+#   "now_playing" -> NowPlaying dict + {"artwork_url": str}
+#   "active"      -> True, once a standby engine is activated
+Listener = Callable[[str, object], None]
+
+# Real seconds a presence call waits for Discord's answer
+RPC_TIMEOUT = 5.0
+
+
+class PresenceEngine:
+    """
+    Qt-free presence pipeline. Source reading, the iTunes lookup and Discord
+    updates run as separate asyncio tasks; the blocking lookup goes to an
+    executor so the loop itself never stalls. Front ends subscribe with add_listener().
+    """
+
+    def __init__(
+        self,
+        sources: Optional[SourceAggregator] = None,
+        poll_seconds: float = 5.0,
+        connect: Callable = connect_to_discord,
+        lookup: Callable = lookup_artwork_and_urls,
+        clock: Clock = SYSTEM_CLOCK,
+        standby: bool = False,
+    ):
+        self.poll_seconds = poll_seconds
+        self._clock = clock
+        self._sources = sources or default_aggregator(cadence=poll_seconds, clock=clock)
+        self._scheduler = PollScheduler(base=poll_seconds)
+        self._discord = DiscordSupervisor(connect, on_event=self._on_discord_event)
+        self._lookup_fn = lookup
+        self._listeners: List[Listener] = []
+        self._running = True
+        # Standby: connect, read sources and resolve artwork as usual, but
+        # don't publish anything to Discord until activate()
+        self._activated = not standby
+        self._active: Optional[asyncio.Event] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._lookup_executor: Optional[ThreadPoolExecutor] = None
+        self._lookup_workers = 1
+        self._executor_workers = 0
+        self._discord_task: Optional[asyncio.Task] = None
+
+        self._np: Optional[NowPlaying] = None
+        # (track_key, playing) while something plays, the status text when idle
+        self._status_sig = ()
+        self._publisher = PresencePublisher(clock=clock.monotonic)
+        self._publish_event: Optional[asyncio.Event] = None
+        self._publish_task: Optional[asyncio.Task] = None
+
+        # Artwork state machine, per track:
+        #   pending (lookup task running) -> resolved; the publisher holds the
+        #   first update of a track briefly so the artwork can join it
+        self._track_key = None
+        self._lookup_task: Optional[asyncio.Task] = None
+        self._resolved = False
+        self._artwork_url = ""
+        self._track_url = None
+        self._album_url = None
+
+        self._m_lookup_queue = REGISTRY.gauge("lookup_queue_depth", help="Lookups waiting or running")
+        self._m_updates = REGISTRY.counter("rpc_updates_total", help="SET_ACTIVITY calls sent")
+        self._m_clears = REGISTRY.counter("rpc_clears_total", help="Presence clears sent")
+        self._m_rpc_errors = REGISTRY.counter("rpc_errors_total", help="Failed presence calls")
+
+    # ----------------------------------------------------------------
+    # Front-end API (thread-safe)
+    # ----------------------------------------------------------------
+
+    def add_listener(self, callback: Listener):
+        self._listeners.append(callback)
+
+    def stop(self):
+        self._running = False
+        self._wakeup()
+
+    @property
+    def active(self) -> bool:
+        return self._activated
+
+    def activate(self):
+        if self._activated:
+            return
+        self._activated = True
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._on_activated)
+        except RuntimeError:
+            pass
+
+    def _on_activated(self):
+        self._active.set()
+        self._emit("active", True)
+
+    def apply_profile(self, profile: Profile):
+        """Scheduler caps and lookup concurrency from a settings profile (thread-safe)."""
+        self._scheduler.max_playing = profile.max_playing
+        self._scheduler.max_paused = profile.max_paused
+        self._scheduler.max_idle = profile.max_idle
+        self._lookup_workers = max(1, profile.lookup_workers)
+        self._wakeup()
+
+    def set_poll_seconds(self, seconds: float):
+        self.poll_seconds = seconds
+        self._wakeup()
+
+    def record(self, path: str):
+        """Log raw source samples and events to `path` (see core.recorder)."""
+        from .recorder import SessionRecorder
+
+        self._sources.recorder = SessionRecorder(path)
+
+    # ----------------------------------------------------------------
+
+    def _emit(self, event: str, data):
+        for cb in list(self._listeners):
+            try:
+                cb(event, data)
+            except Exception:
+                pass
+
+    def _wakeup(self):
+        loop, wake = self._loop, self._wake
+        if loop is None or wake is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(wake.set)
+        except RuntimeError:
+            pass
+
+    def _on_source_event(self, kind: str):
+        # Called from source threads
+        self._scheduler.note_event(kind, self._clock.monotonic())
+        self._wakeup()
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=self._clock.real(seconds))
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    def _on_discord_event(self, event: str, data):
+        if event == "connected":
+            # Fresh link: whatever we showed before is gone, replay the latest state
+            self._publisher.reset()
+            if self._publish_event is not None:
+                self._publish_event.set()
+        elif event in ("status", "account"):
+            self._emit(event, data)
+
+    # ----------------------------------------------------------------
+    # Main entry point
+    # ----------------------------------------------------------------
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._publish_event = asyncio.Event()
+        self._active = asyncio.Event()
+        if self._activated:
+            self._active.set()
+        self._lookup_executor = self._new_lookup_executor()
+
+        try:
+            if not self._sources.available:
+                self._emit("status", "Music source unavailable on this OS")
+                return
+
+            # Discord (re)connects on its own; sources and the UI don't wait for it
+            self._discord_task = asyncio.create_task(self._discord.run())
+            self._sources.subscribe(self._on_source_event)
+            self._sources.start()
+            self._publish_task = asyncio.create_task(self._publish_loop())
+            while self._running:
+                await self._sleep(await self._tick())
+        finally:
+            await self._shutdown()
+
+    async def _shutdown(self):
+        self._running = False
+        self._sources.stop()
+        if self._sources.recorder:
+            self._sources.recorder.close()
+        for task in (self._lookup_task, self._publish_task):
+            if task:
+                task.cancel()
+        await self._discord.stop(clear=self._publisher.has_presence)
+        if self._discord_task:
+            try:
+                await asyncio.wait_for(self._discord_task, timeout=2)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+        self._lookup_executor.shutdown(wait=False, cancel_futures=True)
+
+    # ----------------------------------------------------------------
+    # Source tick
+    # ----------------------------------------------------------------
+
+    async def _tick(self) -> float:
+        """One pass over the active sample; returns how long to sleep."""
+        with REGISTRY.timed("engine_tick"):
+            return self._tick_once()
+
+    def _tick_once(self) -> float:
+        np = self._sources.current()
+        self._np = np
+
+        # Next wake from track time, play state and idle streaks. Sources
+        # poll at that cadence; UI ticks stay at poll_seconds while playing.
+        self._scheduler.base = self.poll_seconds
+        delay = self._scheduler.next_delay(np, self._clock.monotonic())
+        self._sources.set_cadence(delay)
+        tick = min(delay, self.poll_seconds) if np and np.playing else delay
+
+        if np is None:
+            self._on_nothing_playing()
+        else:
+            self._on_sample(np)
+        return tick
+
+    def _on_nothing_playing(self):
+        self._offer(None)
+        # A hung or failing source says so instead of "Nothing playing"
+        status = self._sources.trouble() or "Nothing playing"
+        if status != self._status_sig:
+            blank = not isinstance(self._status_sig, str)
+            self._status_sig = status
+            self._emit("status", status)
+            # Also update UI to blanks so you see it change; once is enough,
+            # repeating them every idle tick only wakes the listeners
+            if blank:
+                self._emit("now_playing", dict(EMPTY_NOW_PLAYING))
+
+    def _on_sample(self, np: NowPlaying):
+        # Artwork lookup only when the track changes (by identity, so a
+        # source re-spelling the same track doesn't count)
+        track_key = np.track_id
+        if track_key != self._track_key:
+            self._track_key = track_key
+            self._artwork_url = ""
+            self._track_url = None
+            self._album_url = None
+            self._resolved = False
+            if self._lookup_task:
+                self._lookup_task.cancel()
+            self._lookup_task = asyncio.create_task(self._resolve(np, track_key))
+
+        # Emit now playing for UI every tick
+        self._emit("now_playing", self._now_playing_dict(np))
+
+        # The publisher diffs and rate-limits, so offering every tick is cheap
+        self._offer(np)
+
+        status_sig = (track_key, np.playing)
+        if status_sig != self._status_sig:
+            self._status_sig = status_sig
+            self._emit("status", f"{'Playing' if np.playing else 'Paused'}: {np.title} — {np.artist}")
+
+    def _now_playing_dict(self, np: NowPlaying) -> dict:
+        d = asdict(np)
+        d["artwork_url"] = self._artwork_url or ""
+        return d
+
+    def _offer(self, np: Optional[NowPlaying]):
+        if np is None:
+            self._publisher.offer(None)
+        else:
+            payload = build_presence_payload(
+                np,
+                artwork_url=self._artwork_url or "",
+                track_url=self._track_url,
+                album_url=self._album_url,
+                now=self._clock.time(),
+            )
+            self._publisher.offer(payload, complete=self._resolved, track_id=np.track_id)
+        self._publish_event.set()
+
+    async def _resolve(self, np: NowPlaying, track_key):
+        if self._executor_workers != self._lookup_workers:
+            # Profile changed; lookups already running finish on the old pool
+            self._lookup_executor.shutdown(wait=False)
+            self._lookup_executor = self._new_lookup_executor()
+        self._m_lookup_queue.inc()
+        try:
+            with REGISTRY.timed("lookup", spans_awaits=True):
+                artwork_url, track_url, album_url = await self._loop.run_in_executor(
+                    self._lookup_executor, self._lookup_in_executor, np
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            artwork_url, track_url, album_url = None, None, None
+        finally:
+            self._m_lookup_queue.dec()
+
+        if track_key != self._track_key:
+            return
+        self._artwork_url = artwork_url or ""
+        self._track_url = track_url
+        self._album_url = album_url
+        self._resolved = True
+
+        # Let the UI and the publisher pick it up without waiting for the next tick
+        current = self._sources.current()
+        if current is None or current.track_id != track_key:
+            return
+        self._emit("now_playing", self._now_playing_dict(current))
+        self._offer(current)
+
+    def _new_lookup_executor(self) -> ThreadPoolExecutor:
+        self._executor_workers = self._lookup_workers
+        return ThreadPoolExecutor(max_workers=self._executor_workers, thread_name_prefix="lookup")
+
+    def _lookup_in_executor(self, np: NowPlaying):
+        with TRACER.span("lookup_call", "lookup", {"title": np.title}):
+            return self._lookup_fn(np.title, np.artist, np.album, track_id=np.track_id)
+
+    # ----------------------------------------------------------------
+    # Discord publishing
+    # ----------------------------------------------------------------
+
+    async def _publish_loop(self):
+        await self._active.wait()
+        while self._running:
+            action, wait = self._publisher.next_action()
+            if action is None:
+                try:
+                    timeout = None if wait is None else self._clock.real(wait)
+                    await asyncio.wait_for(self._publish_event.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._publish_event.clear()
+                continue
+
+            if not self._discord.connected:
+                # Replayed from the "connected" event once the link is back
+                await self._discord.wait_connected()
+                continue
+
+            payload, track_id = self._publisher.payload(), self._publisher.track_id
+            client = self._discord.client
+            try:
+                with REGISTRY.timed("rpc_update", spans_awaits=True):
+                    if action == "clear":
+                        call = self._discord.call(client.clear)
+                    else:
+                        call = self._discord.call(client.update, **payload)
+                    await asyncio.wait_for(call, timeout=RPC_TIMEOUT)
+                (self._m_clears if action == "clear" else self._m_updates).inc()
+                self._publisher.mark_sent(payload, track_id)
+            except asyncio.CancelledError:
+                raise
+            except NotConnected:
+                continue
+            except Exception as e:
+                self._m_rpc_errors.inc()
+                # Spends a token, so retries (after a rate-limit error too)
+                # stay inside the bucket instead of hammering Discord
+                self._publisher.mark_failed()
+                if isinstance(e, asyncio.TimeoutError):
+                    # A link that stops answering is treated as lost; the
+                    # reconnect replays the latest state
+                    self._emit("status", "Discord didn't answer — reconnecting…")
+                    self._discord.mark_lost()
+                    continue
+                if is_link_error(e):
+                    continue
+                self._emit("status", f"Presence update failed: {e}")
+                await asyncio.sleep(self._clock.real(2))
@@ -0,0 +1,235 @@
+# core/history.py
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from .metrics import REGISTRY
+from .paths import app_data_dir
+
+# One row per continuous listen of a track: when it started, how long it
+# actually played and how long it sat paused. Rows are only ever appended.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plays (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    day INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    album TEXT NOT NULL,
+    source TEXT NOT NULL,
+    duration REAL NOT NULL,
+    played REAL NOT NULL,
+    paused REAL NOT NULL
+);
+-- Covering indexes: "top this week" and per-day totals never touch the table
+CREATE INDEX IF NOT EXISTS plays_artist ON plays (started_at, artist, played);
+CREATE INDEX IF NOT EXISTS plays_album ON plays (started_at, album, artist, played);
+CREATE INDEX IF NOT EXISTS plays_day ON plays (day, played);
+"""
+
+Row = Tuple[float, int, str, str, str, str, float, float, float]
+
+
+def history_path() -> str:
+    return str(app_data_dir() / "history.sqlite3")
+
+
+def day_number(ts: float) -> int:
+    """Local calendar day as YYYYMMDD."""
+    d = datetime.fromtimestamp(ts)
+    return d.year * 10000 + d.month * 100 + d.day
+
+
+def connect(path: str, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        # A URI, so the path must be one: "#", "?" or "%" in the data folder
+        # (or Windows backslashes) would otherwise name another file
+        conn = sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True, timeout=5)
+    else:
+        conn = sqlite3.connect(path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+    return conn
+
+
+class HistoryWriter:
+    """
+    Appends rows from a background thread in batches: one transaction per
+    `batch_size` rows or `flush_seconds`, whichever comes first. add() only
+    enqueues, so callers never wait on the disk.
+    """
+
+    def __init__(self, path: str, batch_size: int = 500, flush_seconds: float = 2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: "queue.Queue[Optional[Row]]" = queue.Queue()
+        self._written = REGISTRY.counter("history_rows_total", help="Listening history rows written")
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def add(self, row: Row):
+        self._queue.put(row)
+
+    def close(self, timeout: float = 5.0):
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        conn = connect(self.path)
+        done = False
+        while not done:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if row is None:
+                    done = True
+                    break
+                batch.append(row)
+            with REGISTRY.timed("history_write"):
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO plays (started_at, day, title, artist, album, source, duration, played, paused)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        batch,
+                    )
+            self._written.inc(len(batch))
+        conn.close()
+
+
+class PlayTracker:
+    """
+    Engine listener that turns the per-tick now_playing stream into play
+    rows: time is credited to the current track as played or paused, and
+    the row is written when the track changes or playback stops.
+    """
+
+    def __init__(self, writer: HistoryWriter, min_played: float = 5.0,
+                 clock: Callable[[], float] = time.time):
+        self.writer = writer
+        self.min_played = min_played
+        self._clock = clock
+        self._key = None
+        self._current = None    # dict: started_at, title, artist, album, source, duration
+        self._played = 0.0
+        self._paused = 0.0
+        self._last_at = 0.0
+        self._playing = False
+
+    def on_event(self, event: str, data):
+        if event != "now_playing":
+            return
+        now = self._clock()
+        self._credit(now)
+        title = (data.get("title") or "").strip()
+        key = (data.get("track_id") or (title, data.get("artist") or "", data.get("album") or "")) if title else None
+        if key != self._key:
+            self.finish()
+            if key is not None:
+                self._key = key
+                self._current = {
+                    "started_at": now,
+                    "title": title,
+                    "artist": data.get("artist") or "",
+                    "album": data.get("album") or "",
+                    "source": data.get("source") or "",
+                    "duration": float(data.get("duration") or 0.0),
+                }
+        self._playing = bool(data.get("playing")) and key is not None
+        self._last_at = now
+
+    def _credit(self, now: float):
+        if self._current is None or not self._last_at:
+            return
+        # Cap a single gap so a suspended machine doesn't count as listening
+        dt = min(max(0.0, now - self._last_at), 60.0)
+        if self._playing:
+            self._played += dt
+        else:
+            self._paused += dt
+        self._last_at = now
+
+    def finish(self):
+        """Write out the current track, if it played long enough."""
+        if self._current is not None:
+            self._credit(self._clock())
+            c = self._current
+            if self._played >= self.min_played:
+                self.writer.add((
+                    c["started_at"], day_number(c["started_at"]), c["title"], c["artist"], c["album"],
+                    c["source"], c["duration"], round(self._played, 1), round(self._paused, 1),
+                ))
+        self._key = None
+        self._current = None
+        self._played = 0.0
+        self._paused = 0.0
+        self._last_at = 0.0
+
+
+class ListeningHistory:
+    """Writer + tracker; attach to an engine with engine.add_listener(history.on_event)."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or history_path()
+        self.writer = HistoryWriter(self.path)
+        self.tracker = PlayTracker(self.writer)
+        self.on_event = self.tracker.on_event
+
+    def close(self):
+        self.tracker.finish()
+        self.writer.close()
+
+
+class HistoryStats:
+    """Read-side queries; safe to use from another process while the daemon writes."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or history_path()
+
+    def _query(self, sql: str, args=()) -> List[tuple]:
+        try:
+            conn = connect(self.path, readonly=True)
+        except sqlite3.OperationalError:
+            return []   # no history yet
+        try:
+            return conn.execute(sql, args).fetchall()
+        except sqlite3.OperationalError:
+            return []
+        finally:
+            conn.close()
+
+    def top_artists(self, since: float, limit: int = 5) -> List[tuple]:
+        """[(artist, plays, seconds played)] since `since`, most listened first."""
+        return self._query(
+            "SELECT artist, COUNT(*), SUM(played) FROM plays INDEXED BY plays_artist"
+            " WHERE started_at >= ? GROUP BY artist ORDER BY SUM(played) DESC LIMIT ?",
+            (since, limit),
+        )
+
+    def top_albums(self, since: float, limit: int = 5) -> List[tuple]:
+        """[(album, artist, plays, seconds played)]"""
+        return self._query(
+            "SELECT album, artist, COUNT(*), SUM(played) FROM plays INDEXED BY plays_album"
+            " WHERE started_at >= ? AND album != '' GROUP BY album, artist ORDER BY SUM(played) DESC LIMIT ?",
+            (since, limit),
+        )
+
+    def daily_totals(self, first_day: int, last_day: int) -> List[tuple]:
+        """[(YYYYMMDD, plays, seconds played)] for days in range that have plays."""
+        return self._query(
+            "SELECT day, COUNT(*), SUM(played) FROM plays INDEXED BY plays_day"
+            " WHERE day BETWEEN ? AND ? GROUP BY day ORDER BY day",
+            (first_day, last_day),
+        )
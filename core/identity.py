@@ -0,0 +1,33 @@
+# core/identity.py
+import hashlib
+import re
+import unicodedata
+
+# One identity per track, whatever the source calls it: the player's own
+# library ID when it reports one, otherwise a hash of the normalized title,
+# artist and album. Caches and "did the track change" checks key on this,
+# so "Song (feat. X)", "Song feat. X" and "song " are the same track.
+
+_BRACKETED_FEAT = re.compile(r"\s*[(\[]\s*(?:feat\.?|ft\.?|featuring|with)\s[^)\]]*[)\]]", re.IGNORECASE)
+_TRAILING_FEAT = re.compile(r"\s+(?:feat\.|ft\.|featuring)\s.*$", re.IGNORECASE)
+_PUNCTUATION = re.compile(r"[’'\"“”()\[\]{}.,:;!?]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(s: str) -> str:
+    """Casefolded, NFKC, no "feat." credits, punctuation or repeated spaces."""
+    s = unicodedata.normalize("NFKC", s or "")
+    s = _BRACKETED_FEAT.sub("", s)
+    s = _TRAILING_FEAT.sub("", s)
+    s = _PUNCTUATION.sub("", s.casefold())
+    return _SPACES.sub(" ", s).strip()
+
+
+def track_identity(title: str, artist: str, album: str, persistent_id: str = "") -> str:
+    """"p:<library id>" or "t:<16 hex digits>"; "" when there's no title."""
+    if persistent_id:
+        return "p:" + persistent_id
+    if not (title or "").strip():
+        return ""
+    text = "\x1f".join(normalize_text(part) for part in (title, artist, album))
+    return "t:" + hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
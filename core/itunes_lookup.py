@@ -1,11 +1,130 @@
+import json
+import os
 import re
 import requests
 import urllib.parse
-from functools import lru_cache
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from .identity import track_identity
+from .lru import LRUCache
+from .metrics import REGISTRY
+from .paths import app_data_dir
+from .resolution_pack import PackError, ResolutionPack, merge_packs
+from .settings import SETTINGS
 
 _HTTP = requests.Session()
 
+# Overridable so benchmarks can point lookups at a local stand-in
+ITUNES_API = "https://itunes.apple.com"
+
+# track identity (core.identity) -> (artwork_url, track_url, album_url), or
+# all None for "no match". Sized by the settings profile; matches are kept
+# across restarts (load/save_resolution_cache) so a track played yesterday
+# has its artwork without a search.
+RESOLUTIONS = LRUCache(SETTINGS.profile.lookup_cache_entries)
+SETTINGS.subscribe(lambda profile: RESOLUTIONS.resize(profile.lookup_cache_entries))
+
+# Albums are usually played through: once a track resolves, one collection
+# lookup in the background resolves the rest of its album (_prime_album).
+# Collection IDs already primed or in flight:
+_PRIMED = LRUCache(256)
+_PRIMER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="itunes-album")
+
+# Installed resolution pack (core.resolution_pack), read-only: consulted
+# after RESOLUTIONS and before the network. See load/import/export below.
+PACK: Optional[ResolutionPack] = None
+
+
+def resolution_cache_path() -> str:
+    return str(app_data_dir() / "resolution_cache.json")
+
+
+def load_resolution_cache(path: Optional[str] = None) -> int:
+    """Returns the number of entries loaded; a missing or bad file loads nothing."""
+    try:
+        with open(path or resolution_cache_path(), "r", encoding="utf-8") as fh:
+            entries = json.load(fh)
+    except (OSError, ValueError):
+        return 0
+    for entry in entries if isinstance(entries, list) else ():
+        try:
+            key, value = entry[0], tuple(entry[1])
+            if isinstance(key, list):
+                # Files written before track identities: [title, artist, album]
+                key = track_identity(*key[:3])
+        except (TypeError, IndexError):
+            continue
+        if isinstance(key, str) and key and len(value) == 3:
+            RESOLUTIONS.put(key, value)
+    return len(RESOLUTIONS)
+
+
+def save_resolution_cache(path: Optional[str] = None):
+    path = path or resolution_cache_path()
+    entries = [[k, list(v)] for k, v in RESOLUTIONS.items() if any(v)]
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(entries, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def resolution_pack_path() -> str:
+    return str(app_data_dir() / "resolutions.rmppack")
+
+
+def load_resolution_pack(path: Optional[str] = None) -> int:
+    """Opens the installed pack; returns its entry count, 0 if there's none or it's unreadable."""
+    global PACK
+    try:
+        pack = ResolutionPack(path or resolution_pack_path())
+    except (OSError, PackError):
+        return 0
+    old, PACK = PACK, pack
+    if old is not None:
+        old.close()
+    return len(pack)
+
+
+def import_resolution_packs(paths: List[str], path: Optional[str] = None) -> int:
+    """
+    Merge packs from other machines into the installed one (theirs win
+    where both have a track); returns the installed pack's entry count.
+    Raises OSError/PackError for a pack that can't be read.
+    """
+    path = path or resolution_pack_path()
+    # The installed pack is one of the sources and stays mapped while the
+    # merge runs; Windows won't replace a mapped file, so merge next to it
+    # and swap once every source is closed
+    merged = path + ".new"
+    sources = []
+    try:
+        if os.path.exists(path):
+            sources.append(ResolutionPack(path))
+        sources.extend(ResolutionPack(p) for p in paths)
+        entries = merge_packs(merged, *sources)
+    finally:
+        for pack in sources:
+            pack.close()
+    os.replace(merged, path)
+    return entries
+
+
+def export_resolution_pack(out: str) -> int:
+    """
+    Write what this machine knows, the installed pack plus the resolution
+    cache (newer, so it wins), as a pack for others to import. Only text
+    identities ("t:") go in: library IDs ("p:") mean nothing on another
+    machine.
+    """
+    cache = [(k, v) for k, v in RESOLUTIONS.items() if k.startswith("t:") and any(v)]
+    return merge_packs(
+        out, *([PACK] if PACK is not None else []), cache, keep=lambda key: key.startswith("t:")
+    )
+
 
 def _norm(s: str) -> str:
     s = (s or "").strip().lower()
@@ -53,7 +172,7 @@ def _score_result(item: dict, title: str, artist: str, album: Optional[str]) ->
 
     return score
 
-def _upgrade_artwork(url: Optional[str], size: int = 512) -> Optional[str]:
+def upgrade_artwork(url: Optional[str], size: int = 512) -> Optional[str]:
     if not url:
         return None
     # common iTunes pattern: .../100x100bb.jpg or 600x600bb.jpg
@@ -63,10 +182,11 @@ def _upgrade_artwork(url: Optional[str], size: int = 512) -> Optional[str]:
     url = url.replace("600x600", f"{size}x{size}")
     return url
 
-# returns (artwork_url, track_url, album_url)
-@lru_cache(maxsize=512)
+# returns (artwork_url, track_url, album_url); artwork at the profile's size.
+# Cached by track_id (NowPlaying.track_id) and by the text identity, which
+# is what resolution packs carry.
 def lookup_artwork_and_urls(
-    title: str, artist: str, album: Optional[str] = None
+    title: str, artist: str, album: Optional[str] = None, track_id: Optional[str] = None
 ) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     title = (title or "").strip()
     artist = (artist or "").strip()
@@ -75,18 +195,59 @@ def lookup_artwork_and_urls(
     if not title:
         return None, None, None
 
+    text_key = track_identity(title, artist, album or "")
+    key = track_id or text_key
+    # A library ID misses what album priming stored under the text identity
+    known = RESOLUTIONS.get_first((key, text_key))
+    if known is None and PACK is not None:
+        # Packs are keyed by text identity (export_resolution_pack); older
+        # ones may still carry this machine's library IDs
+        known = PACK.get(text_key) or (PACK.get(key) if key != text_key else None)
+        if known is not None:
+            REGISTRY.counter("resolution_pack_hits_total", help="Lookups answered by the resolution pack").inc()
+    collection_id = None
+    if known is None:
+        found = _search(title, artist, album)
+        if found is None:
+            # Network trouble: not an answer, so don't cache it
+            return None, None, None
+        known, collection_id = found
+    # Under both: the library ID for this machine, the text identity for
+    # packs and for other players of the same track
+    for k in (key, text_key):
+        if k not in RESOLUTIONS:
+            RESOLUTIONS.put(k, known)
+    # Check and mark in one step: with several lookup workers two tracks
+    # of the album can resolve at once
+    if collection_id and _PRIMED.put_new(collection_id, True):
+        _PRIMER.submit(_prime_album, collection_id)
+    artwork, track_url, album_url = known
+    return upgrade_artwork(artwork, SETTINGS.profile.artwork_size), track_url, album_url
+
+
+def _search(
+    title: str, artist: str, album: Optional[str]
+) -> Optional[Tuple[Tuple[Optional[str], Optional[str], Optional[str]], Optional[int]]]:
+    """
+    (best iTunes match, its collectionId); the match is (None, None, None)
+    when nothing fits. None if the request failed.
+    """
     # Use album in the term if available (helps ranking)
     term = " ".join(x for x in [title, artist, album] if x).strip()
     q = urllib.parse.quote(term)
-    url = f"https://itunes.apple.com/search?term={q}&entity=song&limit=25"
+    url = f"{ITUNES_API}/search?term={q}&entity=song&limit=25"
 
     try:
-        r = _HTTP.get(url, timeout=4)
-        r.raise_for_status()
-        data = r.json()
+        with REGISTRY.timed("itunes_http"):
+            r = _HTTP.get(url, timeout=SETTINGS.profile.lookup_timeout)
+            r.raise_for_status()
+            data = r.json()
+    except Exception:
+        return None
+    try:
         results = data.get("results", [])
         if not results:
-            return None, None, None
+            return (None, None, None), None
 
         best = None
         best_score = -10**9
@@ -110,18 +271,46 @@ def lookup_artwork_and_urls(
 
         if not best or best_score < 40:
             # Score too low = search was probably garbage; fail gracefully
-            return None, None, None
+            return (None, None, None), None
+
+        # Singles have nothing else to prime
+        collection_id = best.get("collectionId") if best.get("trackCount", 2) > 1 else None
+        return _resolution(best), collection_id
+    except Exception:
+        return (None, None, None), None
+
 
-        artwork = (
-            best.get("artworkUrl600")
-            or best.get("artworkUrl100")
-            or best.get("artworkUrl60")
-        )
-        artwork = _upgrade_artwork(artwork, 512)
+def _resolution(item: dict) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    artwork = (
+        item.get("artworkUrl600")
+        or item.get("artworkUrl100")
+        or item.get("artworkUrl60")
+    )
+    return artwork, item.get("trackViewUrl"), item.get("collectionViewUrl")
 
-        track_url = best.get("trackViewUrl")
-        album_url = best.get("collectionViewUrl")
 
-        return artwork, track_url, album_url
+def _prime_album(collection_id: int):
+    """Cache every track of the album from one lookup request (runs on _PRIMER)."""
+    url = f"{ITUNES_API}/lookup?id={collection_id}&entity=song"
+    try:
+        with REGISTRY.timed("itunes_http"):
+            r = _HTTP.get(url, timeout=SETTINGS.profile.lookup_timeout)
+            r.raise_for_status()
+            data = r.json()
     except Exception:
-        return None, None, None
+        # Let a later track of the album try again
+        _PRIMED.pop(collection_id)
+        return
+    primed = 0
+    for item in data.get("results", []) if isinstance(data, dict) else ():
+        if item.get("wrapperType") != "track" or not item.get("trackName"):
+            continue
+        key = track_identity(item["trackName"], item.get("artistName", ""), item.get("collectionName", ""))
+        if key not in RESOLUTIONS:
+            RESOLUTIONS.put(key, _resolution(item))
+            primed += 1
+    REGISTRY.counter("itunes_album_tracks_primed_total", help="Tracks resolved by album lookups").inc(primed)
+
+
+REGISTRY.gauge("lookup_cache_hits", help="Resolution cache hits", fn=lambda: RESOLUTIONS.hits)
+REGISTRY.gauge("lookup_cache_misses", help="Resolution cache misses", fn=lambda: RESOLUTIONS.misses)
@@ -0,0 +1,99 @@
+# core/lru.py
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterator, Optional, Tuple
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used map whose size can change at runtime
+    (unlike functools.lru_cache). With `weigh`, maxsize bounds the total
+    weight of the values (bytes, say) instead of their count; the newest
+    entry is kept even when it alone is over.
+    """
+
+    def __init__(self, maxsize: int, weigh: Optional[Callable[[object], int]] = None):
+        self.maxsize = max(1, maxsize)
+        self.hits = 0
+        self.misses = 0
+        # Total weight of the values (their count without `weigh`)
+        self.weight = 0
+        self._weigh = weigh or (lambda value: 1)
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # No recency bump and no hit/miss count
+        return key in self._entries
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_first(self, keys, default=None):
+        """The value of the first of `keys` present; counts one hit or one miss however many are tried."""
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            if key in self._entries:
+                self.weight -= self._weigh(self._entries[key])
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self.weight += self._weigh(value)
+            self._evict()
+
+    def put_new(self, key: Hashable, value) -> bool:
+        """put() unless the key is already there; True if it was added."""
+        with self._lock:
+            if key in self._entries:
+                return False
+            self._entries[key] = value
+            self.weight += self._weigh(value)
+            self._evict()
+            return True
+
+    def resize(self, maxsize: int):
+        with self._lock:
+            self.maxsize = max(1, maxsize)
+            self._evict()
+
+    def pop(self, key: Hashable, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries.pop(key)
+            self.weight -= self._weigh(value)
+            return value
+
+    def items(self) -> Iterator[Tuple[Hashable, object]]:
+        """Oldest first; a copy, so safe to iterate while others write."""
+        with self._lock:
+            return iter(list(self._entries.items()))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+
+    def _evict(self):
+        while self.weight > self.maxsize and len(self._entries) > 1:
+            _, dropped = self._entries.popitem(last=False)
+            self.weight -= self._weigh(dropped)
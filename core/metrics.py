@@ -0,0 +1,286 @@
+# core/metrics.py
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .trace import TRACER
+
+# Seconds; covers a fast cache hit up to a stuck network call
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _label_text(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n: int = 1):
+        with self._lock:
+            self._value += n
+
+    @property
+    def value(self):
+        return self._value
+
+
+class Gauge:
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self._value = 0.0
+        self._fn = fn
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self._value = value
+
+    def inc(self, n: float = 1):
+        with self._lock:
+            self._value += n
+
+    def dec(self, n: float = 1):
+        with self._lock:
+            self._value -= n
+
+    @property
+    def value(self):
+        if self._fn is not None:
+            try:
+                return self._fn()
+            except Exception:
+                return 0
+        return self._value
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def quantile(self, q: float) -> float:
+        """Estimate from bucket boundaries (linear within a bucket)."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            if seen + c >= rank and c:
+                lo = self.buckets[i - 1] if i > 0 else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * ((rank - seen) / c)
+            seen += c
+        return self.buckets[-1]
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        with self._lock:
+            counts = list(self._counts)
+        out, running = [], 0
+        for bound, c in zip(self.buckets, counts):
+            running += c
+            out.append((repr(bound), running))
+        out.append(("+Inf", running + counts[-1]))
+        return out
+
+
+class Registry:
+    """
+    Process-wide counters, gauges and histograms, keyed by name + labels.
+    Recording is a lock and a couple of additions; reading is for the debug
+    panel and the local export endpoint.
+    """
+
+    def __init__(self, prefix: str = "rmp_"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._metrics: Dict[Tuple[str, LabelKey], object] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+
+    def _get(self, kind: str, name: str, labels, factory, help_text: str):
+        key = (name, _label_key(labels))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = factory()
+                    self._metrics[key] = metric
+                    self._help.setdefault(name, (kind, help_text))
+        return metric
+
+    def counter(self, name: str, labels: Optional[Dict[str, str]] = None, help: str = "") -> Counter:
+        return self._get("counter", name, labels, Counter, help)
+
+    def gauge(
+        self,
+        name: str,
+        labels: Optional[Dict[str, str]] = None,
+        help: str = "",
+        fn: Optional[Callable[[], float]] = None,
+    ) -> Gauge:
+        return self._get("gauge", name, labels, lambda: Gauge(fn), help)
+
+    def histogram(self, name: str, labels: Optional[Dict[str, str]] = None, help: str = "") -> Histogram:
+        return self._get("histogram", name, labels, Histogram, help)
+
+    @contextmanager
+    def timed(self, stage: str, spans_awaits: bool = False):
+        """
+        Observe the block's duration in stage_seconds{stage=...}, and record
+        it as a trace span while tracing is on. Pass spans_awaits=True for
+        blocks that await, so the span doesn't claim the loop thread.
+        """
+        hist = self.histogram("stage_seconds", {"stage": stage}, help="Per-stage latency")
+        start = time.perf_counter()
+        try:
+            with TRACER.span(stage, "stage", spans_awaits=spans_awaits):
+                yield
+        finally:
+            hist.observe(time.perf_counter() - start)
+
+    # ----------------------------------------------------------------
+    # Export
+    # ----------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        out: Dict[str, list] = {}
+        for (name, labels), metric in self._items():
+            entry = {"labels": dict(labels)}
+            if isinstance(metric, Histogram):
+                entry.update({
+                    "count": metric.count,
+                    "sum": round(metric.sum, 6),
+                    "p50": round(metric.quantile(0.5), 6),
+                    "p95": round(metric.quantile(0.95), 6),
+                    "p99": round(metric.quantile(0.99), 6),
+                })
+            else:
+                entry["value"] = metric.value
+            out.setdefault(name, []).append(entry)
+        return out
+
+    def _items(self):
+        with self._lock:
+            items = list(self._metrics.items())
+        return sorted(items, key=lambda kv: kv[0])
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        by_name: Dict[str, list] = {}
+        for (name, labels), metric in self._items():
+            by_name.setdefault(name, []).append((labels, metric))
+
+        for name, series in by_name.items():
+            kind, help_text = self._help.get(name, ("untyped", ""))
+            full = self.prefix + name
+            if help_text:
+                lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} {kind}")
+            for labels, metric in series:
+                if isinstance(metric, Histogram):
+                    for bound, count in metric.cumulative():
+                        le = 'le="%s"' % bound
+                        lines.append(f"{full}_bucket{_label_text(labels, le)} {count}")
+                    lines.append(f"{full}_sum{_label_text(labels)} {metric.sum}")
+                    lines.append(f"{full}_count{_label_text(labels)} {metric.count}")
+                else:
+                    lines.append(f"{full}{_label_text(labels)} {metric.value}")
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self) -> List[str]:
+        """Short human-readable table for the debug panel."""
+        return summary_lines(self.snapshot())
+
+
+def summary_lines(snapshot: dict) -> List[str]:
+    """Registry.snapshot() (this process's or the daemon's) as debug panel lines."""
+    lines = []
+    for name, series in snapshot.items():
+        for entry in series:
+            label = ",".join(f"{v}" for v in entry["labels"].values())
+            title = f"{name}[{label}]" if label else name
+            if "count" in entry:
+                lines.append(
+                    f"{title:<34} n={entry['count']:<6} "
+                    f"p50={entry['p50'] * 1000:8.1f}ms p95={entry['p95'] * 1000:8.1f}ms"
+                )
+            else:
+                value = entry["value"]
+                lines.append(f"{title:<34} {value:g}" if isinstance(value, (int, float)) else f"{title:<34} {value}")
+    return lines
+
+
+REGISTRY = Registry()
+
+
+def serve_metrics(port: int = 0, registry: Registry = REGISTRY):
+    """
+    Serve /metrics (Prometheus text) and /metrics.json on 127.0.0.1 from a
+    daemon thread. port=0 picks a free port (see server.server_address).
+    """
+    # Only imported when serving, to keep it out of the window's startup
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, ctype = registry.to_json().encode("utf-8"), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, ctype = registry.to_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
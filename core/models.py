@@ -1,6 +1,48 @@
 # core/models.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 
+from .identity import track_identity
+
+# now_playing event payload when nothing is playing (NowPlaying fields + artwork_url).
+# Lives here rather than in engine.py so the window can use it without
+# importing the engine.
+EMPTY_NOW_PLAYING = {
+    "title": "",
+    "artist": "",
+    "album": "",
+    "duration": 0.0,
+    "position": 0.0,
+    "playing": False,
+    "source": "",
+    "persistent_id": "",
+    "track_id": "",
+    "artwork_url": "",
+}
+
+def _slotted(cls):
+    """
+    dataclass(slots=True) for Python 3.9 too (the macOS system Python):
+    the class rebuilt with __slots__ for its fields, so each sample (one
+    per source read) carries no __dict__. Pickling gets the same state
+    methods dataclass adds: a frozen class can't be restored by setattr.
+    """
+    names = tuple(f.name for f in fields(cls))
+    body = {k: v for k, v in cls.__dict__.items() if k not in names + ("__dict__", "__weakref__")}
+    body["__slots__"] = names
+
+    def __getstate__(self):
+        return [getattr(self, name) for name in names]
+
+    def __setstate__(self, state):
+        for name, value in zip(names, state):
+            object.__setattr__(self, name, value)
+
+    body["__getstate__"] = __getstate__
+    body["__setstate__"] = __setstate__
+    return type(cls)(cls.__name__, cls.__bases__, body)
+
+
+@_slotted
 @dataclass(frozen=True)
 class NowPlaying:
     title: str
@@ -9,3 +51,14 @@ class NowPlaying:
     duration: float
     position: float
     playing: bool
+    source: str = ""
+    # The player's library ID for the track, when it reports one
+    persistent_id: str = ""
+    # See core.identity. Always derived, also by replace(), so it follows
+    # title/artist/album/persistent_id and can't be passed in stale.
+    track_id: str = field(default="", init=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(
+            self, "track_id", track_identity(self.title, self.artist, self.album, self.persistent_id)
+        )
@@ -2,6 +2,10 @@
 import subprocess
 from typing import Optional
 from .models import NowPlaying
+from .sources import READ_TIMEOUT, SourceTimeout
+
+# osascript is killed past this, inside the aggregator's read deadline
+OSASCRIPT_TIMEOUT = READ_TIMEOUT - 1.0
 
 
 def get_now_playing() -> Optional[NowPlaying]:
@@ -22,15 +26,20 @@ def get_now_playing() -> Optional[NowPlaying]:
         set tDur to (duration of current track)
         set tPos to (player position)
         set isPlaying to (ps is "playing")
+        set tPid to ""
+        try
+            set tPid to (persistent ID of current track as string)
+        end try
 
-        return "OK=1|" & tName & "|" & tArtist & "|" & tAlbum & "|" & (tDur as string) & "|" & (tPos as string) & "|" & (isPlaying as string)
+        return "OK=1|" & tName & "|" & tArtist & "|" & tAlbum & "|" & (tDur as string) & "|" & (tPos as string) & "|" & (isPlaying as string) & "|" & tPid
     end tell
     '''
 
     try:
         out = subprocess.check_output(
             ["osascript", "-e", script],
-            text=True
+            text=True,
+            timeout=OSASCRIPT_TIMEOUT,
         ).strip()
 
         if not out.startswith("OK=1|"):
@@ -51,6 +60,10 @@ def get_now_playing() -> Optional[NowPlaying]:
             duration=to_float(parts[4]),
             position=to_float(parts[5]),
             playing=parts[6].lower() == "true",
+            persistent_id=parts[7] if len(parts) > 7 else "",
         )
+    except subprocess.TimeoutExpired:
+        # Music.app busy or a dialog blocking the script
+        raise SourceTimeout(f"osascript took over {OSASCRIPT_TIMEOUT:g}s")
     except Exception:
         return None
@@ -3,6 +3,10 @@ import asyncio
 from typing import Optional
 
 from .models import NowPlaying
+from .sources import READ_TIMEOUT, SourceTimeout
+
+# WinRT calls are cancelled past this, inside the aggregator's read deadline
+GSMTC_TIMEOUT = READ_TIMEOUT - 1.0
 
 try:
     from winsdk.windows.media.control import (
@@ -46,18 +50,7 @@ def _is_apple_music_session(session) -> bool:
     return "applemusic" in name.lower() or "apple music" in name.lower()
 
 
-async def _get_now_playing_async() -> Optional[NowPlaying]:
-    if MediaManager is None:
-        return None
-
-    manager = await MediaManager.request_async()
-    session = manager.get_current_session()
-    if not session:
-        return None
-
-    if not _is_apple_music_session(session):
-        return None
-
+async def _read_session(session) -> Optional[NowPlaying]:
     try:
         info = await session.try_get_media_properties_async()
     except Exception:
@@ -92,16 +85,72 @@ async def _get_now_playing_async() -> Optional[NowPlaying]:
     )
 
 
-def get_now_playing() -> Optional[NowPlaying]:
+async def _get_now_playing_async() -> Optional[NowPlaying]:
+    if MediaManager is None:
+        return None
+
+    manager = await MediaManager.request_async()
+    session = manager.get_current_session()
+    if not session:
+        return None
+
+    if not _is_apple_music_session(session):
+        return None
+
+    return await _read_session(session)
+
+
+async def _get_any_now_playing_async() -> Optional[NowPlaying]:
     if MediaManager is None:
         return None
 
+    manager = await MediaManager.request_async()
     try:
-        return asyncio.run(_get_now_playing_async())
+        sessions = list(manager.get_sessions())
+    except Exception:
+        sessions = []
+
+    # Apple Music is covered by its own source; prefer a playing session.
+    best = None
+    for session in sessions:
+        if _is_apple_music_session(session):
+            continue
+        np = await _read_session(session)
+        if np is None or not np.title:
+            continue
+        if np.playing:
+            return np
+        if best is None:
+            best = np
+    return best
+
+
+async def _with_deadline(coro_fn) -> Optional[NowPlaying]:
+    try:
+        return await asyncio.wait_for(coro_fn(), GSMTC_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise SourceTimeout(f"GSMTC took over {GSMTC_TIMEOUT:g}s")
+
+
+def _run(coro_fn) -> Optional[NowPlaying]:
+    if MediaManager is None:
+        return None
+
+    try:
+        return asyncio.run(_with_deadline(coro_fn))
     except RuntimeError:
         # If an event loop is already running (unlikely here), fall back.
         loop = asyncio.new_event_loop()
         try:
-            return loop.run_until_complete(_get_now_playing_async())
+            return loop.run_until_complete(_with_deadline(coro_fn))
         finally:
             loop.close()
+
+
+def get_now_playing() -> Optional[NowPlaying]:
+    return _run(_get_now_playing_async)
+
+
+def get_any_now_playing() -> Optional[NowPlaying]:
+    """Any non-Apple-Music GSMTC session (Spotify, browsers, ...)."""
+    return _run(_get_any_now_playing_async)
@@ -0,0 +1,19 @@
+# core/paths.py
+import os
+import sys
+from pathlib import Path
+
+APP_NAME = "Rich Music Presence"
+
+
+def app_data_dir() -> Path:
+    """Per-user data directory (created on first use)."""
+    if sys.platform == "darwin":
+        base = Path.home() / "Library" / "Application Support"
+    elif sys.platform == "win32":
+        base = Path(os.environ.get("APPDATA") or Path.home() / "AppData" / "Roaming")
+    else:
+        base = Path(os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share")
+    path = base / APP_NAME
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,155 @@
+# core/publisher.py
+import time
+from typing import Callable, Optional, Tuple
+
+# Discord accepts roughly 5 activity updates per 20 seconds per client
+RATE_LIMIT_UPDATES = 5
+RATE_LIMIT_WINDOW = 20.0
+
+_TIMESTAMP_KEYS = ("start", "end")
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        capacity: int = RATE_LIMIT_UPDATES,
+        window: float = RATE_LIMIT_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._stamp = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self._tokens -= 1
+
+
+class PresencePublisher:
+    """
+    Decides what actually goes to Discord. The engine offers the desired
+    payload as often as it likes; the publisher
+
+    - drops offers that match what was last sent, re-sending timestamps only
+      when they drift by more than `drift_tolerance` seconds (seeks)
+    - holds the first update of a new track for up to `hold_seconds` so the
+      artwork can ride along instead of needing a second update
+    - rate-limits with a token bucket, so bursts coalesce to the latest state
+    """
+
+    def __init__(
+        self,
+        hold_seconds: float = 1.5,
+        drift_tolerance: float = 2.0,
+        bucket: Optional[TokenBucket] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.hold_seconds = hold_seconds
+        self.drift_tolerance = drift_tolerance
+        self._clock = clock
+        self._bucket = bucket or TokenBucket(clock=clock)
+
+        self._desired: Optional[dict] = None
+        self._desired_track = ""
+        self._desired_complete = True
+        self._hold_until = 0.0
+        self._sent: Optional[dict] = None
+        self._sent_track = ""
+
+    @property
+    def has_presence(self) -> bool:
+        return self._sent is not None
+
+    def offer(self, payload: Optional[dict], complete: bool = True, track_id: str = ""):
+        """
+        payload None means "clear". `complete` is False while the track's
+        artwork lookup is still running. `track_id` (NowPlaying.track_id)
+        tells tracks apart; the payload's display strings can't, since two
+        tracks may share a title and artist and Discord truncates them.
+        """
+        now = self._clock()
+        if payload is not None and not _same_track(track_id, self._desired_track):
+            # New track: give the artwork a moment to arrive
+            self._hold_until = now + self.hold_seconds if not complete else 0.0
+        self._desired = payload
+        self._desired_track = track_id if payload is not None else ""
+        self._desired_complete = complete
+
+    def reset(self):
+        """Forget what was sent (e.g. the connection was re-established)."""
+        self._sent = None
+        self._sent_track = ""
+
+    def next_action(self) -> Tuple[Optional[str], Optional[float]]:
+        """
+        -> (action, wait). action is "update", "clear" or None. When None,
+        `wait` is how long until something may become due (None = nothing
+        pending until the next offer).
+        """
+        desired, sent = self._desired, self._sent
+        if desired is None:
+            if sent is None:
+                return None, None
+        elif not self._differs(desired, sent):
+            return None, None
+        elif not self._desired_complete and not _same_track(self._desired_track, self._sent_track):
+            hold = self._hold_until - self._clock()
+            if hold > 0:
+                return None, hold
+
+        wait = self._bucket.wait_time()
+        if wait > 0:
+            return None, wait
+        return ("clear" if desired is None else "update"), None
+
+    def payload(self) -> Optional[dict]:
+        return self._desired
+
+    @property
+    def track_id(self) -> str:
+        """The track of payload(); hand it back to mark_sent() with it."""
+        return self._desired_track
+
+    def mark_sent(self, payload: Optional[dict], track_id: str = ""):
+        self._bucket.take()
+        self._sent = dict(payload) if payload is not None else None
+        self._sent_track = track_id if payload is not None else ""
+
+    def mark_failed(self):
+        """A call that failed or went unanswered still costs a token."""
+        self._bucket.take()
+
+    def _differs(self, desired: dict, sent: Optional[dict]) -> bool:
+        if sent is None:
+            return True
+        for key in set(desired) | set(sent):
+            if key in _TIMESTAMP_KEYS:
+                continue
+            if desired.get(key) != sent.get(key):
+                return True
+        for key in _TIMESTAMP_KEYS:
+            a, b = desired.get(key), sent.get(key)
+            if (a is None) != (b is None):
+                return True
+            if a is not None and abs(a - b) > self.drift_tolerance:
+                return True
+        return False
+
+
+def _same_track(a: str, b: str) -> bool:
+    # "" is no track (nothing offered or sent), never the same as another
+    return bool(a) and a == b
@@ -0,0 +1,330 @@
+# core/push_api.py
+import asyncio
+import base64
+import hashlib
+import json
+import struct
+import threading
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Set
+
+from .artwork_cache import ARTWORK_CACHE, ArtworkCache
+from .engine import PresenceEngine
+from .itunes_lookup import upgrade_artwork
+from .metrics import REGISTRY
+from .models import EMPTY_NOW_PLAYING
+
+# Opt-in, localhost-only state feed for overlays (OBS browser sources etc.):
+#
+#   GET /now-playing          current state as JSON
+#   GET /events               Server-Sent Events: "snapshot", then "delta"
+#   GET /ws                   WebSocket: the same messages as text frames
+#   GET /artwork/<id>?size=N  current/recent artwork from the artwork cache
+#
+# Messages: {"type": "snapshot", "status": str, "now_playing": {...}}
+#           {"type": "delta", "status": str}  or  {"type": "delta", "now_playing": {changed fields}}
+# now_playing["artwork"] is the /artwork path for the track, "" if none.
+#
+# Browsers may only read the feed from the origins given as `origins`
+# (--push-origin; "null" for an overlay opened from a local file): those get
+# Access-Control-Allow-Origin, and a WebSocket from any other page is
+# refused. Without it, web pages can't read what you're playing.
+#
+# Runs on its own thread and loop: the engine only hands events over with
+# call_soon_threadsafe, so slow or numerous subscribers never touch its loop.
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+KEEPALIVE_SECONDS = 15.0
+ARTWORK_SIZES = (64, 1024)
+
+
+def artwork_id(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16]
+
+
+def ws_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    n = len(payload)
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return header + payload
+
+
+class _Subscriber:
+    def __init__(self, server: "PushServer", queue_size: int):
+        self.server = server
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def send(self, message: dict):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Slow reader: drop the backlog and resync from a fresh snapshot
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(self.server.snapshot())
+
+
+class PushServer:
+    def __init__(
+        self,
+        engine: PresenceEngine,
+        port: int = 0,
+        queue_size: int = 64,
+        artwork_cache: ArtworkCache = ARTWORK_CACHE,
+        origins: Iterable[str] = (),
+    ):
+        self.port = port
+        self._origins = frozenset(o.rstrip("/") for o in origins)
+        self._queue_size = queue_size
+        self._cache = artwork_cache
+        self._status = ""
+        self._now_playing = {k: v for k, v in EMPTY_NOW_PLAYING.items() if k != "artwork_url"}
+        self._now_playing["artwork"] = ""
+        # Only URLs the engine produced can be fetched; this is not a proxy
+        self._artwork_urls: Dict[str, str] = {}
+        self._subscribers: Set[_Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="push-artwork")
+        REGISTRY.gauge("push_subscribers", help="Connected SSE/WebSocket subscribers",
+                       fn=lambda: len(self._subscribers))
+        engine.add_listener(self._on_engine_event)
+
+    def start(self):
+        ready = threading.Event()
+
+        def _run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, "127.0.0.1", self.port)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=_run, name="push-api", daemon=True)
+        self._thread.start()
+        ready.wait(5)
+
+    def stop(self):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+
+        async def _close():
+            self._server.close()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            loop.stop()
+
+        loop.call_soon_threadsafe(lambda: loop.create_task(_close()))
+        self._thread.join(2)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> dict:
+        return {"type": "snapshot", "status": self._status, "now_playing": dict(self._now_playing)}
+
+    # ----------------------------------------------------------------
+    # Engine side (called on the engine's loop)
+    # ----------------------------------------------------------------
+
+    def _on_engine_event(self, event: str, data):
+        loop = self._loop
+        if event not in ("status", "now_playing") or loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._apply, event, dict(data) if isinstance(data, dict) else data)
+        except RuntimeError:
+            pass
+
+    def _apply(self, event: str, data):
+        if event == "status":
+            if data == self._status:
+                return
+            self._status = data
+            message = {"type": "delta", "status": data}
+        else:
+            url = data.pop("artwork_url", "") or ""
+            if url:
+                self._artwork_urls[artwork_id(url)] = url
+                if len(self._artwork_urls) > 64:
+                    self._artwork_urls.pop(next(iter(self._artwork_urls)))
+            data["artwork"] = f"/artwork/{artwork_id(url)}" if url else ""
+            changes = {k: v for k, v in data.items() if self._now_playing.get(k) != v}
+            if not changes:
+                return
+            self._now_playing.update(changes)
+            message = {"type": "delta", "now_playing": changes}
+        for sub in list(self._subscribers):
+            sub.send(message)
+
+    # ----------------------------------------------------------------
+    # HTTP
+    # ----------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, _ = lines[0].split(" ", 2)
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers[k.strip().lower()] = v.strip()
+            parsed = urllib.parse.urlsplit(target)
+            # Refuse other Host names (DNS rebinding from a web page)
+            host = headers.get("host", "").rsplit(":", 1)[0]
+            if host not in ("127.0.0.1", "localhost"):
+                await self._respond(writer, 403, b"forbidden")
+            elif method != "GET":
+                await self._respond(writer, 405, b"method not allowed")
+            elif parsed.path == "/now-playing":
+                body = json.dumps(self.snapshot()).encode("utf-8")
+                await self._respond(writer, 200, body, self._cors(headers, {
+                    "Content-Type": "application/json", "Cache-Control": "no-store",
+                }))
+            elif parsed.path == "/events":
+                await self._serve_sse(writer, headers)
+            elif parsed.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                # Browsers don't apply CORS to WebSockets; check the page's origin here
+                if "origin" in headers and not self._cors(headers):
+                    await self._respond(writer, 403, b"forbidden")
+                else:
+                    await self._serve_ws(reader, writer, headers)
+            elif parsed.path.startswith("/artwork/"):
+                await self._serve_artwork(writer, parsed, headers)
+            else:
+                await self._respond(writer, 404, b"not found")
+        except (ValueError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, code: int, body: bytes, headers: Optional[dict] = None):
+        reason = {200: "OK", 304: "Not Modified", 403: "Forbidden", 404: "Not Found",
+                  405: "Method Not Allowed", 502: "Bad Gateway"}.get(code, "")
+        out = [f"HTTP/1.1 {code} {reason}", f"Content-Length: {len(body)}", "Connection: close"]
+        for k, v in (headers or {}).items():
+            out.append(f"{k}: {v}")
+        writer.write(("\r\n".join(out) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    def _cors(self, request: dict, headers: Optional[dict] = None) -> dict:
+        """`headers` plus Access-Control-Allow-Origin if the request's Origin is allowed."""
+        headers = dict(headers or {})
+        origin = request.get("origin", "")
+        if origin and origin.rstrip("/") in self._origins:
+            headers["Access-Control-Allow-Origin"] = origin
+            headers["Vary"] = "Origin"
+        return headers
+
+    def _subscribe(self) -> _Subscriber:
+        sub = _Subscriber(self, self._queue_size)
+        sub.send(self.snapshot())
+        self._subscribers.add(sub)
+        return sub
+
+    async def _next(self, sub: _Subscriber) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(sub.queue.get(), timeout=KEEPALIVE_SECONDS)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _serve_sse(self, writer: asyncio.StreamWriter, request: dict):
+        head = ["HTTP/1.1 200 OK", "Content-Type: text/event-stream", "Cache-Control: no-store"]
+        head += [f"{k}: {v}" for k, v in self._cors(request).items()]
+        writer.write(("\r\n".join(head) + "\r\nConnection: keep-alive\r\n\r\n").encode("latin-1"))
+        sub = self._subscribe()
+        try:
+            while True:
+                message = await self._next(sub)
+                if message is None:
+                    writer.write(b": keepalive\n\n")
+                else:
+                    data = json.dumps(message, separators=(",", ":"))
+                    writer.write(f"event: {message['type']}\ndata: {data}\n\n".encode("utf-8"))
+                await writer.drain()
+        finally:
+            self._subscribers.discard(sub)
+
+    async def _serve_ws(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: dict):
+        key = headers.get("sec-websocket-key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(
+            b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            + f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode("ascii")
+        )
+        sub = self._subscribe()
+        read_task = asyncio.create_task(self._ws_read(reader, writer))
+        try:
+            while not read_task.done():
+                message = await self._next(sub)
+                if message is None:
+                    writer.write(ws_frame(b"", opcode=0x9))
+                else:
+                    writer.write(ws_frame(json.dumps(message, separators=(",", ":")).encode("utf-8")))
+                await writer.drain()
+        finally:
+            self._subscribers.discard(sub)
+            read_task.cancel()
+
+    async def _ws_read(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answers pings and close; subscribers have nothing else to say."""
+        try:
+            while True:
+                b0, b1 = await reader.readexactly(2)
+                opcode, n = b0 & 0x0F, b1 & 0x7F
+                if n == 126:
+                    (n,) = struct.unpack("!H", await reader.readexactly(2))
+                elif n == 127:
+                    (n,) = struct.unpack("!Q", await reader.readexactly(8))
+                if n > 65536:
+                    return
+                mask = await reader.readexactly(4) if b1 & 0x80 else b"\0\0\0\0"
+                payload = bytes(c ^ mask[i % 4] for i, c in enumerate(await reader.readexactly(n)))
+                if opcode == 0x8:
+                    writer.write(ws_frame(payload[:2], opcode=0x8))
+                    return
+                if opcode == 0x9:
+                    writer.write(ws_frame(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return
+
+    async def _serve_artwork(self, writer, parsed, headers: dict):
+        url = self._artwork_urls.get(parsed.path.rsplit("/", 1)[-1])
+        if not url:
+            await self._respond(writer, 404, b"not found")
+            return
+        query = urllib.parse.parse_qs(parsed.query)
+        try:
+            size = int(query.get("size", ["0"])[0])
+        except ValueError:
+            size = 0
+        if size:
+            url = upgrade_artwork(url, max(ARTWORK_SIZES[0], min(ARTWORK_SIZES[1], size)))
+
+        art = self._cache.peek(url)
+        if art is None:
+            art = await asyncio.get_running_loop().run_in_executor(self._executor, self._cache.get, url)
+        if art is None:
+            await self._respond(writer, 502, b"artwork unavailable")
+            return
+        cache_headers = self._cors(headers, {"ETag": art.etag, "Cache-Control": "public, max-age=86400, immutable"})
+        if headers.get("if-none-match") == art.etag:
+            await self._respond(writer, 304, b"", cache_headers)
+            return
+        await self._respond(writer, 200, art.data, dict(cache_headers, **{"Content-Type": art.content_type}))
@@ -0,0 +1,89 @@
+# core/recorder.py
+import gzip
+import json
+import threading
+import time
+from typing import Iterator, List, Optional
+
+from .models import NowPlaying
+
+FORMAT_VERSION = 1
+
+# One JSON array per line, gzip-compressed:
+#   header: {"v": 1, "start": <wall clock>}
+#   sample: [t, "s", source, title, artist, album, duration, position, playing(, persistent_id)]
+#   empty:  [t, "s", source]
+#   event:  [t, "e", kind]
+# t is seconds since the recording started.
+
+
+class SessionRecorder:
+    """
+    Logs every raw source sample and source event of a session to a compact
+    file, for replay with bench/replay.py. Attach with
+    SourceAggregator.recorder = SessionRecorder(path).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._last = {}
+        self._fh = gzip.open(path, "wt", encoding="utf-8")
+        self._write({"v": FORMAT_VERSION, "start": time.time()})
+
+    def sample(self, source: str, np: Optional[NowPlaying]):
+        if np is None:
+            row = [source]
+        else:
+            row = [
+                source, np.title, np.artist, np.album,
+                round(np.duration, 3), round(np.position, 3), np.playing,
+            ]
+            if np.persistent_id:
+                row.append(np.persistent_id)
+        # Idle polls repeat the same empty sample; one is enough
+        if row == self._last.get(source) and np is None:
+            return
+        self._last[source] = row
+        self._write([self._t(), "s"] + row)
+
+    def event(self, kind: str):
+        self._write([self._t(), "e", kind])
+
+    def close(self):
+        with self._lock:
+            if self._fh:
+                self._fh.close()
+                self._fh = None
+
+    def _t(self) -> float:
+        return round(time.monotonic() - self._start, 3)
+
+    def _write(self, row):
+        with self._lock:
+            if self._fh:
+                self._fh.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+
+def read_session(path: str) -> Iterator[list]:
+    """Yields the header dict, then sample/event rows."""
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def sample_from_row(row: List) -> Optional[NowPlaying]:
+    if len(row) < 9:
+        return None
+    return NowPlaying(
+        title=row[3],
+        artist=row[4],
+        album=row[5],
+        duration=float(row[6]),
+        position=float(row[7]),
+        playing=bool(row[8]),
+        persistent_id=row[9] if len(row) > 9 else "",
+    )
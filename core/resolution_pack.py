@@ -0,0 +1,245 @@
+# core/resolution_pack.py
+import bisect
+import hashlib
+import heapq
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from .lru import LRUCache
+
+# Precomputed iTunes resolutions (track identity -> artwork, track and album
+# URLs) in one read-only file, so machines with overlapping libraries can
+# share what one of them already looked up. Layout, little-endian:
+#
+#   header   MAGIC, version, flags, entries per block, entry count,
+#            offset of the hash index, offset of the block table
+#   blocks   zlib (with ZDICT) of "\n"-joined "key\x1fartwork\x1ftrack\x1falbum"
+#   hashes   entry count x u64, sorted: pack_hash() of each key
+#   table    (blocks + 1) x u64 file offsets of the blocks
+#
+# Entry i lives in block i // block_entries. A lookup is a binary search of
+# the memory-mapped hash index, then one block to decompress; a miss never
+# touches the blocks.
+
+MAGIC = b"RMPPACK\x00"
+VERSION = 1
+BLOCK_ENTRIES = 64
+_HEADER = struct.Struct("<8sHHIQQQ")
+_HEADER_SIZE = 64
+
+# Shared by every block: the URL prefixes that make up most of the bytes
+ZDICT = (
+    b"https://music.apple.com/us/album/https://music.apple.com/us/song/"
+    b"https://is1-ssl.mzstatic.com/image/thumb/Music/v4/"
+    b"https://is2-ssl.mzstatic.com/image/thumb/Music1/v4/"
+    b"https://is3-ssl.mzstatic.com/image/thumb/Music12/v4/"
+    b"https://is4-ssl.mzstatic.com/image/thumb/Music11/v4/"
+    b"https://is5-ssl.mzstatic.com/image/thumb/Music112/v4/"
+    b"/100x100bb.jpg/600x600bb.jpg?uo=4?i=\x1fhttps://\nt:p:"
+)
+
+Resolution = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+class PackError(ValueError):
+    """Not a resolution pack, a newer version, or a damaged one."""
+
+
+def pack_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class ResolutionPack:
+    """Read-only view of a pack file; thread-safe, pages in only what lookups touch."""
+
+    def __init__(self, path: str, cached_blocks: int = 32):
+        self.path = path
+        with open(path, "rb") as fh:
+            size = os.fstat(fh.fileno()).st_size
+            if size < _HEADER_SIZE:
+                raise PackError(f"{path}: too short for a resolution pack")
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._mm, "madvise") and hasattr(mmap, "MADV_RANDOM"):
+            # Lookups jump around; readahead would page in neighbours for nothing
+            self._mm.madvise(mmap.MADV_RANDOM)
+        try:
+            magic, version, _flags, block_entries, count, hashes_at, table_at = _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise PackError(f"{path}: not a resolution pack")
+            if version != VERSION:
+                raise PackError(f"{path}: pack version {version}, this build reads {VERSION}")
+            blocks = -(-count // block_entries) if block_entries else 0
+            if not block_entries or hashes_at + 8 * count > size or table_at + 8 * (blocks + 1) > size:
+                raise PackError(f"{path}: damaged resolution pack")
+        except (PackError, struct.error):
+            self._mm.close()
+            raise
+        self.version = version
+        self.block_entries = block_entries
+        self._count = count
+        self._hashes = self._u64(hashes_at, count)
+        self._table = self._u64(table_at, blocks + 1)
+        self._blocks = LRUCache(cached_blocks)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._mm)
+
+    def get(self, key: str) -> Optional[Resolution]:
+        h = pack_hash(key)
+        i = bisect.bisect_left(self._hashes, h)
+        # 64-bit hashes can collide; the block has the full key
+        while i < self._count and self._hashes[i] == h:
+            fields = _fields(self._block(i // self.block_entries)[i % self.block_entries])
+            if fields[0] == key:
+                return fields[1:]
+            i += 1
+        return None
+
+    def items(self) -> Iterator[Tuple[int, str, Resolution]]:
+        """(hash, key, resolution) in pack order."""
+        for b in range(len(self._table) - 1):
+            start = b * self.block_entries
+            for j, line in enumerate(self._read_block(b)):
+                fields = _fields(line)
+                yield self._hashes[start + j], fields[0], fields[1:]
+
+    def close(self):
+        # The index views pin the map; drop them first
+        for view in (self._hashes, self._table):
+            if isinstance(view, memoryview):
+                view.release()
+        self._blocks.clear()
+        self._mm.close()
+
+    def _u64(self, offset: int, count: int):
+        if sys.byteorder == "little":
+            return memoryview(self._mm)[offset:offset + 8 * count].cast("Q")
+        values = array("Q", self._mm[offset:offset + 8 * count])
+        values.byteswap()
+        return values
+
+    def _block(self, b: int) -> list:
+        records = self._blocks.get(b)
+        if records is None:
+            records = self._read_block(b)
+            self._blocks.put(b, records)
+        return records
+
+    def _read_block(self, b: int) -> list:
+        start, end = self._table[b], self._table[b + 1]
+        try:
+            d = zlib.decompressobj(zdict=ZDICT)
+            text = (d.decompress(self._mm[start:end]) + d.flush()).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError):
+            raise PackError(f"{self.path}: damaged block {b}")
+        # Lines stay unparsed: a lookup needs only one of them
+        return text.split("\n")
+
+
+def _fields(line: str) -> tuple:
+    key, artwork, track_url, album_url = line.split("\x1f")
+    return key, artwork or None, track_url or None, album_url or None
+
+
+def write_pack(path: str, entries: Iterable[Tuple[str, Resolution]], presorted: bool = False) -> int:
+    """
+    Write entries (key, (artwork, track_url, album_url)) as a pack; returns
+    the entry count. Sorts them unless `presorted` (already in pack_hash
+    order, as merge_packs produces). Entries without any URL are skipped.
+    The file is replaced atomically.
+    """
+    rows = ((pack_hash(key), key, value) for key, value in entries)
+    if not presorted:
+        rows = iter(sorted(rows))
+    return _write_sorted(path, rows)
+
+
+def merge_packs(path: str, *sources, keep: Optional[Callable[[str], bool]] = None) -> int:
+    """
+    Merge packs and/or iterables of (key, resolution) into one pack at
+    `path`; where keys repeat, the later source wins. Packs are streamed,
+    so merging large ones doesn't load them into memory. With `keep`, only
+    the keys it accepts are written.
+    """
+    def ranked(rank: int, source):
+        if isinstance(source, ResolutionPack):
+            rows = source.items()
+        else:
+            rows = sorted((pack_hash(key), key, value) for key, value in source)
+        # Ties on (hash, key) sort the later source first
+        for h, key, value in rows:
+            yield h, key, -rank, value
+
+    streams = [ranked(rank, source) for rank, source in enumerate(sources)]
+
+    def merged():
+        last = None
+        for h, key, _rank, value in heapq.merge(*streams, key=lambda row: row[:3]):
+            if (h, key) != last:
+                last = (h, key)
+                if keep is None or keep(key):
+                    yield h, key, value
+
+    return _write_sorted(path, merged())
+
+
+def _clean(value: Optional[str]) -> str:
+    value = value or ""
+    return "" if "\n" in value or "\x1f" in value else value
+
+
+def _write_sorted(path: str, rows: Iterator[Tuple[int, str, Resolution]]) -> int:
+    hashes = array("Q")
+    table = array("Q")
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(b"\x00" * _HEADER_SIZE)
+            block = []
+
+            def flush():
+                table.append(fh.tell())
+                c = zlib.compressobj(9, zdict=ZDICT)
+                fh.write(c.compress("\n".join(block).encode("utf-8")) + c.flush())
+                block.clear()
+
+            for h, key, value in rows:
+                value = tuple(_clean(v) for v in value)
+                if not key or "\n" in key or "\x1f" in key or not any(value):
+                    continue
+                hashes.append(h)
+                block.append("\x1f".join((key,) + value))
+                if len(block) == BLOCK_ENTRIES:
+                    flush()
+            if block:
+                flush()
+            table.append(fh.tell())
+
+            if sys.byteorder != "little":
+                hashes.byteswap()
+                table.byteswap()
+            # Keep the index 8-byte aligned for the memoryview cast
+            fh.write(b"\x00" * (-fh.tell() % 8))
+            hashes_at = fh.tell()
+            fh.write(hashes.tobytes())
+            table_at = fh.tell()
+            fh.write(table.tobytes())
+            fh.seek(0)
+            fh.write(_HEADER.pack(MAGIC, VERSION, 0, BLOCK_ENTRIES, len(hashes), hashes_at, table_at))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return len(hashes)
@@ -0,0 +1,72 @@
+# core/scheduler.py
+from typing import Optional
+
+from .models import NowPlaying
+
+
+class PollScheduler:
+    """
+    Decides how long to wait before the next source read.
+
+    - playing: poll at `base` near the start, stretch towards `max_playing`
+      in the middle of long tracks, and wake just after the predicted end
+    - recent seek: stay at `base` for a while so scrubbing is picked up
+    - paused / idle: back off exponentially up to their caps
+    """
+
+    def __init__(
+        self,
+        base: float = 1.0,
+        max_playing: float = 10.0,
+        max_paused: float = 30.0,
+        max_idle: float = 60.0,
+        end_margin: float = 0.4,
+        seek_window: float = 15.0,
+    ):
+        self.base = base
+        self.max_playing = max_playing
+        self.max_paused = max_paused
+        self.max_idle = max_idle
+        self.end_margin = end_margin
+        self.seek_window = seek_window
+
+        self._idle_streak = 0
+        self._paused_streak = 0
+        self._last_seek = None
+
+    def note_event(self, kind: str, now: float):
+        """Source events reset backoff; seeks keep polling tight for a while."""
+        if kind == "seek":
+            self._last_seek = now
+        self._idle_streak = 0
+        self._paused_streak = 0
+
+    def next_delay(self, np: Optional[NowPlaying], now: float) -> float:
+        if np is None or not np.title:
+            self._paused_streak = 0
+            self._idle_streak += 1
+            return self._backoff(self._idle_streak, self.max_idle)
+
+        self._idle_streak = 0
+        if not np.playing:
+            self._paused_streak += 1
+            return self._backoff(self._paused_streak, self.max_paused)
+
+        self._paused_streak = 0
+        if self._last_seek is not None and now - self._last_seek < self.seek_window:
+            delay = self.base
+        else:
+            # A slow profile's base can be above the cap; never poll faster than base
+            delay = max(self.max_playing, self.base)
+
+        if np.duration > 0:
+            remaining = max(0.0, np.duration - np.position)
+            # Stretch in the middle of the track, tighten towards the end
+            delay = min(delay, max(self.base, remaining / 4))
+            if remaining <= delay:
+                delay = remaining + self.end_margin
+
+        return max(delay, 0.1)
+
+    def _backoff(self, streak: int, cap: float) -> float:
+        return min(self.base * (2 ** min(streak - 1, 16)), max(cap, self.base))
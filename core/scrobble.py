@@ -0,0 +1,336 @@
+# core/scrobble.py
+import queue
+import random
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+import requests
+
+from .metrics import REGISTRY
+from .paths import app_data_dir
+
+LISTENBRAINZ_API = "https://api.listenbrainz.org"
+CLIENT_NAME = "Rich Music Presence"
+
+# Standard scrobble rules (Last.fm, ListenBrainz): a track counts once it
+# has actually played for half its length or 4 minutes, whichever comes
+# first; tracks shorter than 30 seconds never count.
+MIN_TRACK_SECONDS = 30.0
+SCROBBLE_AFTER_SECONDS = 240.0
+
+# ListenBrainz accepts up to 1000 listens per import request
+MAX_BATCH = 1000
+
+# Listens waiting for the server. Rows are deleted once accepted, so the
+# table is only ever as large as the offline backlog.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending (
+    id INTEGER PRIMARY KEY,
+    listened_at INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    album TEXT NOT NULL,
+    duration REAL NOT NULL,
+    source TEXT NOT NULL
+);
+"""
+
+# listened_at, title, artist, album, duration, source
+Listen = Tuple[int, str, str, str, float, str]
+
+
+def scrobble_queue_path() -> str:
+    return str(app_data_dir() / "scrobbles.sqlite3")
+
+
+def scrobble_threshold(duration: float) -> Optional[float]:
+    """Seconds of playback after which a track counts; None if it never does."""
+    if duration <= 0:
+        return SCROBBLE_AFTER_SECONDS     # length unknown (streams): 4 minutes
+    if duration < MIN_TRACK_SECONDS:
+        return None
+    return min(duration / 2, SCROBBLE_AFTER_SECONDS)
+
+
+class ScrobbleRetry(Exception):
+    """Temporary failure (offline, 5xx, rate limited); retry the same batch later."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ScrobbleRejected(Exception):
+    """The server refused the batch itself; resending it won't help."""
+
+
+class ScrobbleAuthError(Exception):
+    """Bad or revoked token; nothing is sent until the daemon restarts."""
+
+
+class ListenBrainzClient:
+    """
+    POST /1/submit-listens of a ListenBrainz-compatible API (ListenBrainz
+    itself, or self-hosted scrobblers that speak its protocol).
+    """
+
+    def __init__(self, token: str, api_url: str = LISTENBRAINZ_API, timeout: float = 10.0):
+        self.url = api_url.rstrip("/") + "/1/submit-listens"
+        self.timeout = timeout
+        self._http = requests.Session()
+        self._http.headers["Authorization"] = f"Token {token}"
+
+    def submit(self, listens: List[Listen]):
+        body = {
+            "listen_type": "single" if len(listens) == 1 else "import",
+            "payload": [_listen_payload(listen) for listen in listens],
+        }
+        try:
+            r = self._http.post(self.url, json=body, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise ScrobbleRetry(str(e))
+        if r.status_code == 200:
+            return
+        if r.status_code == 401:
+            raise ScrobbleAuthError("token rejected")
+        if r.status_code == 429 or r.status_code >= 500:
+            retry_after = r.headers.get("X-RateLimit-Reset-In") or r.headers.get("Retry-After")
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            raise ScrobbleRetry(f"HTTP {r.status_code}", retry_after)
+        raise ScrobbleRejected(f"HTTP {r.status_code}: {r.text[:200]}")
+
+
+def _listen_payload(listen: Listen) -> dict:
+    listened_at, title, artist, album, duration, source = listen
+    metadata = {"artist_name": artist, "track_name": title}
+    if album:
+        metadata["release_name"] = album
+    info = {"submission_client": CLIENT_NAME}
+    if duration > 0:
+        info["duration_ms"] = int(duration * 1000)
+    if source:
+        info["media_player"] = source
+    metadata["additional_info"] = info
+    return {"listened_at": listened_at, "track_metadata": metadata}
+
+
+class ScrobbleQueue:
+    """
+    Durable outbox. add() only hands the listen to a background thread,
+    which commits it to SQLite before anything is sent, then submits the
+    oldest pending listens in batches of up to `batch_size`. Failures back
+    off exponentially (with jitter, or as long as the server asks); pending
+    listens survive restarts and are sent once the server is reachable.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        submit: Callable[[List[Listen]], None],
+        batch_size: int = 100,
+        backoff: float = 5.0,
+        max_backoff: float = 900.0,
+        on_error: Optional[Callable[[str], None]] = None,
+    ):
+        self.path = path
+        self.batch_size = max(1, min(batch_size, MAX_BATCH))
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._submit = submit
+        self._on_error = on_error
+        self._inbox: "queue.Queue[Optional[Listen]]" = queue.Queue()
+        self._failures = 0
+        self._next_attempt = 0.0
+        self._paused = False
+        self._singles = 0       # after a rejected batch: send one at a time to find the bad listen
+        self._pending = REGISTRY.gauge("scrobble_backlog", help="Listens waiting to be submitted")
+        self._submitted = REGISTRY.counter("scrobbles_submitted_total", help="Listens accepted by the server")
+        self._dropped = REGISTRY.counter("scrobbles_dropped_total", help="Listens the server refused")
+        self._retries = REGISTRY.counter("scrobble_retries_total", help="Failed submissions retried later")
+        self._idle = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="scrobbler", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        return int(self._pending.value)
+
+    def add(self, listen: Listen):
+        self._idle.clear()
+        self._inbox.put(listen)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until the backlog is empty (benchmarks, tests)."""
+        return self._idle.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        """Stops without waiting for the network; what's left is sent next start."""
+        self._inbox.put(None)
+        self._thread.join(timeout)
+
+    # ----------------------------------------------------------------
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.executescript(SCHEMA)
+        pending = conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        self._pending.set(pending)
+        stopping = False
+        while not stopping:
+            if pending and not self._paused:
+                timeout = max(0.0, self._next_attempt - time.monotonic())
+            else:
+                if not pending and self._inbox.empty():
+                    self._idle.set()
+                timeout = None
+            incoming, stopping = self._collect(timeout)
+            if incoming:
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO pending (listened_at, title, artist, album, duration, source)"
+                        " VALUES (?, ?, ?, ?, ?, ?)",
+                        incoming,
+                    )
+                pending += len(incoming)
+            if not stopping and pending and not self._paused and time.monotonic() >= self._next_attempt:
+                pending -= self._send_batch(conn)
+            self._pending.set(pending)
+        conn.close()
+
+    def _collect(self, timeout: Optional[float]) -> Tuple[List[Listen], bool]:
+        """Everything in the inbox, waiting up to `timeout` for the first item."""
+        items: List[Listen] = []
+        try:
+            item = self._inbox.get(timeout=timeout)
+            while True:
+                if item is None:
+                    return items, True
+                items.append(item)
+                item = self._inbox.get_nowait()
+        except queue.Empty:
+            return items, False
+
+    def _send_batch(self, conn: sqlite3.Connection) -> int:
+        """Submit the oldest pending listens; returns how many left the queue."""
+        limit = 1 if self._singles else self.batch_size
+        rows = conn.execute(
+            "SELECT id, listened_at, title, artist, album, duration, source FROM pending ORDER BY id LIMIT ?",
+            (limit,),
+        ).fetchall()
+        if not rows:
+            return 0
+        try:
+            with REGISTRY.timed("scrobble_submit"):
+                self._submit([row[1:] for row in rows])
+        except ScrobbleRetry as e:
+            self._retries.inc()
+            self._failures += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** (self._failures - 1)) * random.uniform(0.5, 1.0)
+            if e.retry_after is not None:
+                delay = max(delay, e.retry_after)
+            self._next_attempt = time.monotonic() + delay
+            self._report(f"Scrobbling failed ({e}); retrying in {delay:.0f}s")
+            return 0
+        except ScrobbleAuthError as e:
+            self._paused = True
+            self._report(f"Scrobbling stopped: {e}")
+            return 0
+        except ScrobbleRejected as e:
+            if len(rows) > 1:
+                self._singles = len(rows)
+                return 0
+            self._dropped.inc()
+            self._report(f"Scrobble of {rows[0][2]!r} refused: {e}")
+        else:
+            self._submitted.inc(len(rows))
+            self._failures = 0
+        if self._singles:
+            self._singles -= 1
+        # Rows are read oldest first and new ones only get larger ids
+        with conn:
+            conn.execute("DELETE FROM pending WHERE id <= ?", (rows[-1][0],))
+        return len(rows)
+
+    def _report(self, message: str):
+        if self._on_error:
+            try:
+                self._on_error(message)
+            except Exception:
+                pass
+
+
+class ScrobbleTracker:
+    """
+    Engine listener that applies the scrobble rules to the now_playing
+    stream: only time spent actually playing counts, and a listen is queued
+    the moment it crosses the threshold (stamped with when it started).
+    Playing the same track again from the top counts as a new listen.
+    """
+
+    def __init__(self, queue_: ScrobbleQueue, clock: Callable[[], float] = time.time):
+        self.queue = queue_
+        self._clock = clock
+        self._key = None
+        self._started_at = 0.0
+        self._duration = 0.0
+        self._source = ""
+        self._listen = ("", "", "")   # title, artist, album as first seen
+        self._played = 0.0
+        self._position = 0.0
+        self._last_at = 0.0
+        self._playing = False
+        self._done = False
+
+    def on_event(self, event: str, data):
+        if event != "now_playing":
+            return
+        now = self._clock()
+        title = (data.get("title") or "").strip()
+        artist = (data.get("artist") or "").strip()
+        album = (data.get("album") or "").strip()
+        key = (data.get("track_id") or (title, artist, album)) if title else None
+        position = float(data.get("position") or 0.0)
+
+        if key is not None and key == self._key and self._playing and self._last_at:
+            # Cap a single gap so a suspended machine doesn't count as listening
+            self._played += min(max(0.0, now - self._last_at), 60.0)
+        replay = key == self._key and self._done and position < 10.0 and position + 30.0 < self._position
+        if key != self._key or replay:
+            self._key = key
+            self._started_at = now
+            self._duration = float(data.get("duration") or 0.0)
+            self._source = data.get("source") or ""
+            self._listen = (title, artist, album)
+            self._played = 0.0
+            self._done = False
+
+        self._playing = bool(data.get("playing")) and key is not None
+        self._position = position
+        self._last_at = now
+        if key is not None and not self._done:
+            threshold = scrobble_threshold(self._duration)
+            if threshold is not None and self._played >= threshold:
+                self._done = True
+                title, artist, album = self._listen
+                self.queue.add((int(self._started_at), title, artist, album, self._duration, self._source))
+
+
+class Scrobbler:
+    """Queue + tracker; attach to an engine with engine.add_listener(scrobbler.on_event)."""
+
+    def __init__(self, token: str, api_url: str = LISTENBRAINZ_API, path: Optional[str] = None,
+                 on_error: Optional[Callable[[str], None]] = None):
+        self.client = ListenBrainzClient(token, api_url)
+        self.queue = ScrobbleQueue(path or scrobble_queue_path(), self.client.submit, on_error=on_error)
+        self.tracker = ScrobbleTracker(self.queue)
+        self.on_event = self.tracker.on_event
+
+    def close(self):
+        self.queue.close()
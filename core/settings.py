@@ -0,0 +1,163 @@
+# core/settings.py
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Callable, Dict, List, Optional
+
+from .paths import app_data_dir
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Every tunable cost in one place; the tray picks one of PROFILES."""
+
+    name: str
+    # Source polling, seconds: window in front / in the background (or no
+    # window at all), and the scheduler's caps while playing, paused and idle
+    poll_active: float
+    poll_background: float
+    max_playing: float
+    max_paused: float
+    max_idle: float
+    # Network
+    lookup_timeout: float
+    artwork_timeout: float
+    lookup_workers: int
+    # Caches
+    lookup_cache_entries: int
+    artwork_cache_mb: int
+    # Images and UI
+    artwork_size: int
+    animations: str     # "full", "reduced" (no looping motion) or "off"
+
+
+PROFILES: Dict[str, Profile] = {
+    "battery": Profile(
+        "battery", poll_active=3.0, poll_background=10.0, max_playing=20.0, max_paused=60.0, max_idle=120.0,
+        lookup_timeout=6.0, artwork_timeout=4.0, lookup_workers=1,
+        lookup_cache_entries=256, artwork_cache_mb=8, artwork_size=300, animations="reduced",
+    ),
+    "balanced": Profile(
+        "balanced", poll_active=1.0, poll_background=5.0, max_playing=10.0, max_paused=30.0, max_idle=60.0,
+        lookup_timeout=4.0, artwork_timeout=2.0, lookup_workers=1,
+        lookup_cache_entries=512, artwork_cache_mb=16, artwork_size=512, animations="full",
+    ),
+    "responsive": Profile(
+        "responsive", poll_active=0.5, poll_background=2.0, max_playing=5.0, max_paused=10.0, max_idle=30.0,
+        lookup_timeout=3.0, artwork_timeout=2.0, lookup_workers=2,
+        lookup_cache_entries=2048, artwork_cache_mb=64, artwork_size=1024, animations="full",
+    ),
+}
+DEFAULT_PROFILE = "balanced"
+ANIMATION_LEVELS = ("off", "reduced", "full")
+
+
+def settings_path() -> str:
+    return str(app_data_dir() / "settings.json")
+
+
+class Settings:
+    """
+    The selected profile plus per-field overrides, from settings.json:
+
+        {"profile": "battery", "overrides": {"animations": "off"}}
+
+    Thread-safe. Subscribers get the new Profile after every change, on the
+    thread that made it.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Profile], None]] = []
+        self._name = DEFAULT_PROFILE
+        self._overrides: dict = {}
+        self.profile = PROFILES[DEFAULT_PROFILE]
+
+    @property
+    def path(self) -> str:
+        return self._path or settings_path()
+
+    @property
+    def profile_name(self) -> str:
+        return self._name
+
+    def subscribe(self, callback: Callable[[Profile], None]):
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Profile], None]):
+        """Drop a subscriber (a stopped engine or a closed window); unknown ones are ignored."""
+        try:
+            self._listeners.remove(callback)
+        except ValueError:
+            pass
+
+    def load(self) -> Profile:
+        """(Re)read the file; a missing or broken one means the default profile."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        overrides = data.get("overrides")
+        self._set(str(data.get("profile") or DEFAULT_PROFILE), overrides if isinstance(overrides, dict) else {})
+        return self.profile
+
+    def select(self, name: str, save: bool = True) -> Profile:
+        if name not in PROFILES:
+            raise ValueError(f"unknown profile {name!r}; choose from {', '.join(PROFILES)}")
+        self._set(name, self._overrides)
+        if save:
+            self.save()
+        return self.profile
+
+    def save(self):
+        with self._lock:
+            data = {"profile": self._name, "overrides": dict(self._overrides)}
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, indent=2)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def _set(self, name: str, overrides: dict):
+        base = PROFILES.get(name) or PROFILES[DEFAULT_PROFILE]
+        profile = replace(base, **_coerce(base, overrides))
+        with self._lock:
+            changed = profile != self.profile
+            self._name, self._overrides, self.profile = base.name, dict(overrides), profile
+        if changed:
+            for cb in list(self._listeners):
+                try:
+                    cb(profile)
+                except Exception:
+                    pass
+
+
+def _coerce(base: Profile, overrides: dict) -> dict:
+    """Overrides of known fields, converted to the field's type; the rest is ignored."""
+    out = {}
+    current = asdict(base)
+    for f in fields(Profile):
+        if f.name == "name" or f.name not in overrides:
+            continue
+        kind = type(current[f.name])
+        try:
+            value = kind(overrides[f.name])
+        except (TypeError, ValueError):
+            continue
+        if f.name == "animations" and value not in ANIMATION_LEVELS:
+            continue
+        if kind in (int, float) and value <= 0:
+            continue
+        out[f.name] = value
+    return out
+
+
+SETTINGS = Settings()
+SETTINGS.load()
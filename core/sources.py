@@ -0,0 +1,347 @@
+# core/sources.py
+import sys
+import threading
+import time
+from dataclasses import replace
+from typing import Callable, Dict, List, Optional
+
+from .clock import SYSTEM_CLOCK, Clock
+from .metrics import REGISTRY
+from .models import NowPlaying
+
+# Deadline for one read (real seconds), and the longest a failing source
+# is left alone between reads
+READ_TIMEOUT = 5.0
+MAX_BACKOFF = 60.0
+
+
+class SourceTimeout(Exception):
+    """A read gave up on a player that didn't answer in time."""
+
+
+class Source:
+    """
+    One now-playing provider. Polled sources have a `read` callable that
+    runs on the source's own thread; push sources leave `read` as None and
+    feed samples with SourceAggregator.push().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        read: Optional[Callable[[], Optional[NowPlaying]]] = None,
+        priority: int = 0,
+        poll_seconds: float = 1.0,
+        timeout: float = READ_TIMEOUT,
+    ):
+        self.name = name
+        self.read = read
+        self.priority = priority
+        self.poll_seconds = poll_seconds
+        self.timeout = timeout
+
+        # Latest sample and when it was taken (monotonic)
+        self.sample: Optional[NowPlaying] = None
+        self.sampled_at = 0.0
+        # Last time the track or play state changed, used to break ties
+        self.changed_at = 0.0
+        self.errors = 0
+        self.timeouts = 0
+        # Failed reads in a row (raised or timed out); reads back off
+        self.failures = 0
+        self.last_read_seconds = 0.0
+
+        # time.monotonic() when the read in flight started, 0 when idle.
+        # Real time: a hung player doesn't run on the virtual clock.
+        self._read_started = 0.0
+        self._wake = threading.Event()
+        self._refresh = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pushed(self) -> bool:
+        return self.read is None
+
+    @property
+    def health(self) -> str:
+        """"ok", "hung" (a read is past its deadline) or "failing" (backing off)."""
+        if self._overdue():
+            return "hung"
+        return "failing" if self.failures else "ok"
+
+    def _overdue(self) -> bool:
+        started = self._read_started
+        return bool(started) and time.monotonic() - started > self.timeout
+
+
+class SourceAggregator:
+    """
+    Runs several sources concurrently and arbitrates which one is active:
+    playing beats paused, then higher priority, then the most recent change.
+    Every source polls on its own thread, so a slow or hung one only delays
+    its own samples. A read past its deadline is abandoned: the source
+    drops out of arbitration until it answers again, and the late answer
+    is discarded. Failing sources are read less often (exponential backoff
+    up to MAX_BACKOFF).
+    """
+
+    def __init__(
+        self,
+        sources: List[Source],
+        cadence: float = 1.0,
+        stale_after: float = 15.0,
+        clock: Clock = SYSTEM_CLOCK,
+    ):
+        self._clock = clock
+        self._sources: Dict[str, Source] = {s.name: s for s in sources}
+        self._lock = threading.Lock()
+        self._running = False
+        self._cadence = cadence
+        # A polled sample this long past its next due read is ignored
+        # (source stopped answering)
+        self._stale_after = stale_after
+        self._active: Optional[str] = None
+        self._listeners: List[Callable[[str], None]] = []
+        # Optional core.recorder.SessionRecorder
+        self.recorder = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self._sources)
+
+    @property
+    def active_source(self) -> Optional[str]:
+        return self._active
+
+    def sources(self) -> List[Source]:
+        return list(self._sources.values())
+
+    def trouble(self) -> Optional[str]:
+        """Status line for a polled source that is hung or failing, if any."""
+        for source in self._sources.values():
+            if not source.pushed and source.health != "ok":
+                verb = "isn't responding" if source.health == "hung" else "is failing"
+                return f"{source.name} {verb}"
+        return None
+
+    def subscribe(self, callback: Callable[[str], None]):
+        """
+        callback(kind) is called from source threads when the active sample
+        changes: "track", "state", "seek" or "source".
+        """
+        self._listeners.append(callback)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        for source in self._sources.values():
+            if source.pushed:
+                continue
+            REGISTRY.gauge(
+                "source_healthy", {"source": source.name}, help="1 while the source answers in time",
+                fn=lambda source=source: float(source.health == "ok"),
+            )
+            t = threading.Thread(
+                target=self._poll_loop, args=(source,),
+                name=f"source-{source.name}", daemon=True,
+            )
+            source._thread = t
+            t.start()
+
+    def stop(self):
+        self._running = False
+        for source in self._sources.values():
+            source._wake.set()
+
+    def set_cadence(self, seconds: float):
+        """Polling interval floor for every polled source."""
+        if seconds == self._cadence:
+            return
+        self._cadence = seconds
+        # Let the poll threads re-plan their next read against the new value
+        for source in self._sources.values():
+            source._wake.set()
+
+    def refresh(self):
+        """Ask every polled source to read right away."""
+        for source in self._sources.values():
+            source._refresh = True
+            source._wake.set()
+
+    def push(self, name: str, np: Optional[NowPlaying]):
+        source = self._sources.get(name)
+        if source is None:
+            return
+        self._store(source, np)
+
+    def current(self) -> Optional[NowPlaying]:
+        """Active sample with its position extrapolated to now."""
+        now = self._clock.monotonic()
+        with self._lock:
+            source = self._sources.get(self._active) if self._active else None
+            if source and self._stale(source, now):
+                # Active source stopped answering; fall back to the next best
+                self._active = self._arbitrate(now)
+                source = self._sources.get(self._active) if self._active else None
+            if source is None or source.sample is None:
+                return None
+            np = source.sample
+            age = now - source.sampled_at
+
+        if np.playing and age > 0:
+            position = np.position + age
+            if np.duration > 0:
+                position = min(position, np.duration)
+            np = replace(np, position=position)
+        return np
+
+    # ----------------------------------------------------------------
+
+    def _poll_loop(self, source: Source):
+        labels = {"source": source.name}
+        errors = REGISTRY.counter("source_errors_total", labels, help="Source reads that raised")
+        timeouts = REGISTRY.counter("source_timeouts_total", labels, help="Source reads past their deadline")
+        latency = REGISTRY.histogram("source_read_seconds", labels, help="Source read latency")
+        while self._running:
+            source._read_started = started = time.monotonic()
+            failed = timed_out = False
+            try:
+                with REGISTRY.timed("source_read"):
+                    np = source.read()
+            except SourceTimeout:
+                np, timed_out = None, True
+            except Exception:
+                source.errors += 1
+                errors.inc()
+                np, failed = None, True
+            source.last_read_seconds = elapsed = time.monotonic() - started
+            latency.observe(elapsed)
+            if timed_out or elapsed >= source.timeout:
+                # Abandoned: whatever it returned is as old as the hang
+                source.timeouts += 1
+                timeouts.inc()
+                source.failures += 1
+                np = None
+            elif failed:
+                source.failures += 1
+            else:
+                source.failures = 0
+            source._read_started = 0.0
+            if not self._running:
+                break
+            self._store(source, np)
+
+            # A failing source isn't read again early on refresh()
+            source._refresh = False
+            while self._running and not (source._refresh and not source.failures):
+                wait = source.sampled_at + self._interval(source) - self._clock.monotonic()
+                if wait <= 0:
+                    break
+                source._wake.wait(self._clock.real(wait))
+                source._wake.clear()
+
+    def _interval(self, source: Source) -> float:
+        interval = max(source.poll_seconds, self._cadence)
+        if source.failures:
+            interval = max(interval, min(source.poll_seconds * 2 ** min(source.failures, 8), MAX_BACKOFF))
+        return interval
+
+    def _store(self, source: Source, np: Optional[NowPlaying]):
+        now = self._clock.monotonic()
+        if self.recorder:
+            self.recorder.sample(source.name, np)
+        if np is not None:
+            np = replace(np, source=source.name)
+
+        with self._lock:
+            prev = source.sample
+            prev_at = source.sampled_at
+            if _track_key(prev) != _track_key(np) or _playing(prev) != _playing(np):
+                source.changed_at = now
+            source.sample = np
+            source.sampled_at = now
+
+            prev_active = self._active
+            self._active = self._arbitrate(now)
+
+        kind = None
+        if self._active != prev_active:
+            kind = "source"
+        elif self._active == source.name:
+            if _track_key(prev) != _track_key(np):
+                kind = "track"
+            elif _playing(prev) != _playing(np):
+                kind = "state"
+            elif _seeked(prev, np, now - prev_at):
+                kind = "seek"
+
+        if kind:
+            if self.recorder:
+                self.recorder.event(kind)
+            for cb in list(self._listeners):
+                try:
+                    cb(kind)
+                except Exception:
+                    pass
+
+    def _stale(self, source: Source, now: float) -> bool:
+        # Measured from when the next read was due: a paused source polled
+        # every 30 s isn't stale 15 s after its last read. A read past its
+        # deadline makes the source stale right away.
+        if source.pushed:
+            return False
+        if source._overdue():
+            return True
+        return now - source.sampled_at > self._interval(source) + self._stale_after
+
+    def _arbitrate(self, now: float) -> Optional[str]:
+        best = None
+        best_rank = None
+        for source in self._sources.values():
+            np = source.sample
+            if np is None or not np.title:
+                continue
+            if self._stale(source, now):
+                continue
+            rank = (np.playing, source.priority, source.changed_at)
+            if best_rank is None or rank > best_rank:
+                best, best_rank = source.name, rank
+        return best
+
+
+def _track_key(np: Optional[NowPlaying]):
+    if np is None:
+        return None
+    return np.track_id
+
+
+def _playing(np: Optional[NowPlaying]) -> bool:
+    return bool(np and np.playing)
+
+
+def _seeked(prev: Optional[NowPlaying], np: Optional[NowPlaying], elapsed: float) -> bool:
+    if prev is None or np is None:
+        return False
+    expected = prev.position + (elapsed if prev.playing else 0.0)
+    return abs(np.position - expected) > 3.0
+
+
+def default_sources() -> List[Source]:
+    sources: List[Source] = []
+    if sys.platform == "darwin":
+        from .music_macos import get_now_playing
+        sources.append(Source("apple-music", get_now_playing, priority=10))
+    elif sys.platform == "win32":
+        try:
+            from . import music_windows
+        except Exception:
+            music_windows = None
+        if music_windows and music_windows.MediaManager is not None:
+            sources.append(Source("apple-music", music_windows.get_now_playing, priority=10))
+            sources.append(Source("gsmtc", music_windows.get_any_now_playing, priority=0, poll_seconds=2.0))
+    return sources
+
+
+def default_aggregator(cadence: float = 1.0, clock: Clock = SYSTEM_CLOCK) -> SourceAggregator:
+    return SourceAggregator(default_sources(), cadence=cadence, clock=clock)
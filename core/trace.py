@@ -0,0 +1,131 @@
+# core/trace.py
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Chrome trace-event format (chrome://tracing, ui.perfetto.dev):
+#   "X" complete events for spans that stay on one thread
+#   "b"/"e" async pairs for spans that cross awaits on the event loop
+#   "M" thread_name metadata, written at dump time
+
+
+class Tracer:
+    """
+    Opt-in span recorder. Off by default, where span() costs one attribute
+    check. While on, events go to a bounded ring buffer, so leaving it on
+    only ever keeps the most recent `capacity` spans.
+    """
+
+    def __init__(self, capacity: int = 200_000):
+        self.enabled = False
+        self._events = deque(maxlen=capacity)
+        self._threads: Dict[int, str] = {}
+        self._ids = itertools.count(1)
+        self._pid = os.getpid()
+
+    def start(self):
+        self._events.clear()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def __len__(self):
+        return len(self._events)
+
+    @staticmethod
+    def _now_us() -> float:
+        return time.perf_counter_ns() / 1000.0
+
+    def _tid(self) -> int:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        return tid
+
+    @contextmanager
+    def span(self, name: str, cat: str = "app", args: Optional[dict] = None, spans_awaits: bool = False):
+        if not self.enabled:
+            yield
+            return
+        tid = self._tid()
+        start = self._now_us()
+        if spans_awaits:
+            span_id = next(self._ids)
+            self._events.append({"name": name, "cat": cat, "ph": "b", "id": span_id,
+                                 "ts": start, "pid": self._pid, "tid": tid, "args": args or {}})
+            try:
+                yield
+            finally:
+                self._events.append({"name": name, "cat": cat, "ph": "e", "id": span_id,
+                                     "ts": self._now_us(), "pid": self._pid, "tid": tid})
+            return
+        try:
+            yield
+        finally:
+            event = {"name": name, "cat": cat, "ph": "X", "ts": start,
+                     "dur": self._now_us() - start, "pid": self._pid, "tid": tid}
+            if args:
+                event["args"] = args
+            self._events.append(event)
+
+    def events(self) -> list:
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._threads.items())
+        ]
+        return meta + list(self._events)
+
+    def dump(self, path) -> int:
+        """Write the buffer as trace-event JSON; returns the number of spans written."""
+        return self._write(path, self.events())
+
+    def merge_into(self, path) -> int:
+        """
+        Add the buffer to a trace file another process (the daemon) wrote;
+        returns the number of spans added. perf_counter is a system-wide
+        monotonic clock, so both processes share one timeline.
+        """
+        with open(path, "r", encoding="utf-8") as fh:
+            existing = json.load(fh).get("traceEvents", [])
+        events = self.events()
+        self._write(path, existing + events)
+        return sum(1 for e in events if e["ph"] != "M")
+
+    @staticmethod
+    def _write(path, events: list) -> int:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh, separators=(",", ":"))
+        return sum(1 for e in events if e["ph"] != "M")
+
+
+TRACER = Tracer()
+
+
+def new_trace_path():
+    """traces/trace-<time>.json under the app data folder."""
+    from .paths import app_data_dir
+
+    return app_data_dir() / "traces" / time.strftime("trace-%Y%m%d-%H%M%S.json")
+
+
+def traced(name: str, cat: str = "app"):
+    """Decorator form of TRACER.span() for plain (non-async) functions and Qt slots."""
+
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not TRACER.enabled:
+                return fn(*args, **kwargs)
+            with TRACER.span(name, cat):
+                return fn(*args, **kwargs)
+
+        return inner
+
+    return wrap
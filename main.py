@@ -1,44 +1,247 @@
 #main.py
-import time
+"""
+Headless presence daemon: the same engine as the GUI (every available
+source, async artwork lookups, Discord reconnects) without loading Qt.
+The window attaches to it over the local control socket (core/control.py).
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+from logging.handlers import RotatingFileHandler
 
-from core.music_macos import get_now_playing
-from core.discord_rpc import connect_to_discord, update_presence
+from core.control import ControlServer, daemon_running
+from core.engine import PresenceEngine
+from core.history import ListeningHistory
+from core.itunes_lookup import (
+    export_resolution_pack,
+    import_resolution_packs,
+    load_resolution_cache,
+    load_resolution_pack,
+    save_resolution_cache,
+)
+from core.paths import app_data_dir
+from core.scrobble import LISTENBRAINZ_API
+from core.settings import PROFILES, SETTINGS
+from core.trace import TRACER
 
+log = logging.getLogger("rmp")
 
-POLL_SECONDS = 5
 
+def configure_logging(path: str = "", quiet: bool = False):
+    fmt = logging.Formatter("%(asctime)s %(message)s", "%Y-%m-%d %H:%M:%S")
+    log.setLevel(logging.INFO)
+    if path:
+        handler = RotatingFileHandler(path, maxBytes=512 * 1024, backupCount=2, encoding="utf-8")
+        handler.setFormatter(fmt)
+        log.addHandler(handler)
+    if not quiet:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter("%(message)s"))
+        log.addHandler(console)
 
-def signature(np):
-    return (np.title, np.artist, np.album, np.playing, int(np.position))
 
+def log_events(engine: PresenceEngine):
+    last_status = None
 
-def main():
-    rpc = connect_to_discord()
+    def on_event(event, data):
+        nonlocal last_status
+        if event == "status" and data != last_status:
+            last_status = data
+            log.info(f"[RPC] {data}")
+        elif event == "account":
+            log.info(f"[RPC] Connected as {data['name']}")
+        elif event == "active":
+            log.info("[Music] Presence on")
 
-    last_sig = None
-    has_presence = False
+    engine.add_listener(on_event)
 
-    print("[Music] Watching Apple Music… (Ctrl+C to stop)")
 
-    while True:
-        np = get_now_playing()
+async def serve(engine: PresenceEngine, control: bool = True, control_path=None):
+    """
+    Run until SIGINT/SIGTERM or a client's shutdown command; the engine
+    clears the presence on the way out.
+    """
+    loop = asyncio.get_running_loop()
 
-        if np is None:
-            if has_presence:
-                rpc.clear()
-                has_presence = False
-                last_sig = None
-            time.sleep(POLL_SECONDS)
-            continue
+    def on_signal(*_):
+        log.info("[Music] Stopping…")
+        engine.stop()
 
-        sig = signature(np)
-        if sig != last_sig:
-            update_presence(rpc, np)
-            has_presence = True
-            print(f"[RPC] Updated: {np.title} — {np.artist}")
-            last_sig = sig
+    # Signals can only be handled on the main thread (harnesses run us elsewhere)
+    for sig in (signal.SIGINT, signal.SIGTERM) if threading.current_thread() is threading.main_thread() else ():
+        try:
+            loop.add_signal_handler(sig, on_signal)
+        except (NotImplementedError, RuntimeError):
+            # Windows: no loop signal handlers; engine.stop() is thread-safe
+            signal.signal(sig, on_signal)
 
-        time.sleep(POLL_SECONDS)
+    server = None
+    if control:
+        server = ControlServer(engine, info_path=control_path)
+        await server.start()
+        log.info(f"[Control] Listening on 127.0.0.1:{server.port}")
+    try:
+        await engine.run()
+    finally:
+        if server:
+            await server.close()
+
+
+def pack_command(args):
+    """--import-pack / --export-pack: one-shot, no engine."""
+    from core.resolution_pack import PackError
+
+    if args.import_pack:
+        # A running daemon has the installed pack mapped (and on Windows, locked)
+        if asyncio.run(daemon_running()):
+            log.info("[Lookup] Quit the app before importing a resolution pack")
+            sys.exit(1)
+        try:
+            entries = import_resolution_packs(args.import_pack)
+        except (OSError, PackError) as e:
+            log.info(f"[Lookup] Import failed: {e}")
+            sys.exit(1)
+        log.info(f"[Lookup] Installed resolution pack: {entries} tracks")
+    if args.export_pack:
+        load_resolution_cache()
+        load_resolution_pack()
+        entries = export_resolution_pack(args.export_pack)
+        log.info(f"[Lookup] Exported {entries} tracks → {args.export_pack}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rich Music Presence (headless)")
+    parser.add_argument("--record", metavar="PATH", help="record source samples for bench/replay.py")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT", help="serve metrics on 127.0.0.1:PORT")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace-event JSON here on exit")
+    parser.add_argument("--log-file", metavar="PATH", help="log file (default: presence.log in the app data folder)")
+    parser.add_argument("--quiet", action="store_true", help="log to the file only")
+    parser.add_argument("--no-control", action="store_true", help="don't accept window/client connections")
+    parser.add_argument("--no-history", action="store_true", help="don't record listening history")
+    parser.add_argument(
+        "--profile", choices=sorted(PROFILES),
+        help="performance profile for this run (default: the one in settings.json)",
+    )
+    parser.add_argument(
+        "--standby", action="store_true",
+        help="warm up (Discord link, sources, artwork) without showing a presence until a client activates it",
+    )
+    parser.add_argument(
+        "--push-port", type=int, metavar="PORT",
+        default=int(os.environ["RMP_PUSH_PORT"]) if os.environ.get("RMP_PUSH_PORT") else None,
+        help="serve now-playing over SSE/WebSocket on 127.0.0.1:PORT (overlays)",
+    )
+    parser.add_argument(
+        "--push-origin", metavar="ORIGIN", action="append",
+        default=os.environ.get("RMP_PUSH_ORIGIN", "").split(),
+        help="let pages from ORIGIN (e.g. https://overlay.example, or null for a local file) read the feed; repeatable",
+    )
+    parser.add_argument(
+        "--scrobble-token", metavar="TOKEN", default=os.environ.get("RMP_SCROBBLE_TOKEN") or None,
+        help="scrobble plays to ListenBrainz (or a compatible server) with this user token",
+    )
+    parser.add_argument(
+        "--scrobble-url", metavar="URL", default=os.environ.get("RMP_SCROBBLE_URL") or LISTENBRAINZ_API,
+        help=f"ListenBrainz-compatible API root (default: {LISTENBRAINZ_API})",
+    )
+    parser.add_argument(
+        "--export-pack", metavar="PATH",
+        help="write this machine's artwork lookups (cache + installed pack) as a resolution pack, then exit",
+    )
+    parser.add_argument(
+        "--import-pack", metavar="PATH", action="append",
+        help="merge a resolution pack from another machine into the installed one, then exit (repeatable)",
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging(args.log_file or str(app_data_dir() / "presence.log"), quiet=args.quiet)
+
+    if args.export_pack or args.import_pack:
+        return pack_command(args)
+
+    if not args.no_control and asyncio.run(daemon_running()):
+        log.info("[Music] Already running")
+        return
+
+    if args.trace:
+        TRACER.start()
+
+    if args.metrics_port is not None:
+        from core.metrics import serve_metrics
+
+        server = serve_metrics(args.metrics_port)
+        log.info(f"[Metrics] http://127.0.0.1:{server.server_address[1]}/metrics")
+
+    if args.profile:
+        SETTINGS.select(args.profile, save=False)
+    log.info(f"[Settings] Profile: {SETTINGS.profile_name}")
+
+    load_resolution_cache()
+    entries = load_resolution_pack()
+    if entries:
+        log.info(f"[Lookup] Resolution pack: {entries} tracks")
+    engine = PresenceEngine(poll_seconds=SETTINGS.profile.poll_background, standby=args.standby)
+    engine.apply_profile(SETTINGS.profile)
+    SETTINGS.subscribe(engine.apply_profile)
+    SETTINGS.subscribe(lambda profile: log.info(f"[Settings] Profile: {profile.name}"))
+    if args.record:
+        engine.record(args.record)
+    log_events(engine)
+
+    history = None
+    if not args.no_history:
+        history = ListeningHistory()
+
+        def record_history(event, data):
+            # A standby daemon is only warming up; nothing the user agreed to yet
+            if engine.active:
+                history.on_event(event, data)
+
+        engine.add_listener(record_history)
+
+    scrobbler = None
+    if args.scrobble_token:
+        from core.scrobble import Scrobbler
+
+        scrobbler = Scrobbler(args.scrobble_token, args.scrobble_url, on_error=lambda msg: log.info(f"[Scrobble] {msg}"))
+
+        def scrobble(event, data):
+            if engine.active:
+                scrobbler.on_event(event, data)
+
+        engine.add_listener(scrobble)
+        log.info(f"[Scrobble] Submitting to {args.scrobble_url}")
+
+    push = None
+    if args.push_port is not None:
+        from core.push_api import PushServer
+
+        push = PushServer(engine, port=args.push_port, origins=args.push_origin)
+        push.start()
+        log.info(f"[Push] http://127.0.0.1:{push.port}/events · ws://127.0.0.1:{push.port}/ws")
+
+    if args.standby:
+        log.info("[Music] Warming up; presence starts when the window connects")
+    else:
+        log.info("[Music] Watching for music… (Ctrl+C to stop)")
+    try:
+        asyncio.run(serve(engine, control=not args.no_control))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if push:
+            push.stop()
+        if history:
+            history.close()
+        if scrobbler:
+            scrobbler.close()
+        save_resolution_cache()
+        if args.trace:
+            log.info(f"[Trace] {TRACER.dump(args.trace)} spans → {args.trace}")
 
 
 if __name__ == "__main__":
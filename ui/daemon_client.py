@@ -0,0 +1,221 @@
+# ui/daemon_client.py
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtNetwork import QAbstractSocket, QTcpSocket
+
+from core.models import EMPTY_NOW_PLAYING
+
+
+def daemon_command(standby: bool = False) -> list:
+    """How to start the background daemon from the GUI (source or frozen app)."""
+    flags = ["--daemon", "--quiet"] + (["--standby"] if standby else [])
+    if getattr(sys, "frozen", False):
+        return [sys.executable] + flags
+    app_py = Path(__file__).resolve().parents[1] / "app.py"
+    return [sys.executable, str(app_py)] + flags
+
+
+def spawn_daemon(standby: bool = False):
+    kwargs = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen(daemon_command(standby), close_fds=True, **kwargs)
+
+
+class DaemonClient(QObject):
+    """
+    Attaches the window to the background presence daemon. Same signals as
+    PresenceWorker, so MainWindow doesn't care which one it talks to; the
+    daemon keeps running when the window detaches.
+    """
+
+    status = Signal(str)
+    account = Signal(dict)       # {"name": str, "avatar_url": str}
+    now_playing = Signal(dict)   # NowPlaying dict + {"artwork_url": str}
+    attached = Signal()
+    metrics = Signal(dict)       # the daemon's Registry.snapshot()
+    trace = Signal(dict)         # {"on": bool, "path": str, "spans": int} or {"error": str}
+
+    def __init__(self, poll_seconds: int = 5, parent=None):
+        super().__init__(parent)
+        self.poll_seconds = poll_seconds
+        self._spawn = True
+        self._standby = False
+        self._spawned = False
+        self._active = False
+        self._activate = False   # activation asked for, sent once attached
+        self._stopping = False
+        self._attempts = 0
+        self._now_playing = dict(EMPTY_NOW_PLAYING)
+
+        self._socket = QTcpSocket(self)
+        self._socket.connected.connect(self._on_connected)
+        self._socket.readyRead.connect(self._on_ready_read)
+        self._socket.errorOccurred.connect(self._on_error)
+        self._socket.disconnected.connect(self._on_disconnected)
+
+        self._retry = QTimer(self)
+        self._retry.setSingleShot(True)
+        self._retry.timeout.connect(self._connect)
+
+    @property
+    def is_attached(self) -> bool:
+        return self._socket.state() == QAbstractSocket.ConnectedState
+
+    @property
+    def active(self) -> bool:
+        """False while attached to a standby daemon nobody has connected yet."""
+        return self._active or self._activate
+
+    def start(self, spawn: bool = True, standby: bool = False):
+        """
+        Attach, starting the daemon first if needed (unless spawn=False). A
+        daemon started with standby=True warms up without showing a presence
+        until activate().
+        """
+        self._spawn = spawn
+        self._standby = standby
+        self._stopping = False
+        self._attempts = 0
+        self._connect()
+
+    def activate(self):
+        """Start showing presence (the Connect click); sent as soon as we're attached."""
+        self._activate = True
+        if self.is_attached:
+            self._send({"cmd": "activate"})
+
+    def reload_settings(self):
+        """settings.json changed; the daemon re-reads it."""
+        if self.is_attached:
+            self._send({"cmd": "reload_settings"})
+
+    def stop(self):
+        """Detach; presence keeps running in the daemon."""
+        self._stopping = True
+        self._retry.stop()
+        self._socket.abort()
+
+    def shutdown(self):
+        """Ask the daemon to clear the presence and exit, then detach."""
+        if self.is_attached:
+            self._send({"cmd": "shutdown"})
+            self._socket.flush()
+            self._socket.waitForBytesWritten(500)
+        self.stop()
+
+    def set_poll_seconds(self, seconds: float):
+        self.poll_seconds = seconds
+        if self.is_attached:
+            self._send({"cmd": "poll_seconds", "seconds": seconds})
+
+    def request_metrics(self) -> bool:
+        """Ask for the daemon's metrics; they arrive on `metrics`. False if detached."""
+        if not self.is_attached:
+            return False
+        self._send({"cmd": "metrics"})
+        return True
+
+    def set_tracing(self, on: bool) -> bool:
+        """Start or stop (and save) the daemon's trace; the answer arrives on `trace`."""
+        if not self.is_attached:
+            return False
+        self._send({"cmd": "trace", "on": on})
+        return True
+
+    # ----------------------------------------------------------------
+
+    def _connect(self):
+        if self._stopping or self._socket.state() != QAbstractSocket.UnconnectedState:
+            return
+        # core.control brings asyncio along; only load it once we actually look
+        from core.control import read_control_info
+
+        self._info = read_control_info()
+        if self._info:
+            self._socket.connectToHost("127.0.0.1", int(self._info["port"]))
+        else:
+            self._on_error(None)
+
+    def _on_error(self, _error):
+        if self._stopping or self.is_attached:
+            return
+        self._socket.abort()
+        self._attempts += 1
+        if not self._spawn and not self._spawned:
+            # Only probing for a running daemon
+            self._stopping = True
+            return
+        if not self._spawned:
+            self._spawned = True
+            self.status.emit("Starting presence service…")
+            spawn_daemon(standby=self._standby and not self._activate)
+        if self._attempts == 50:
+            self.status.emit("Presence service didn't start — see presence.log")
+        # Quick retries while a daemon starts up, then back off
+        self._retry.start(200 if self._attempts < 50 else 2000)
+
+    def _on_connected(self):
+        from core.control import PROTOCOL_VERSION
+
+        # Attached: if this daemon goes away later, start a fresh one
+        self._attempts = 0
+        self._spawned = False
+        self._send({"cmd": "hello", "v": PROTOCOL_VERSION, "token": self._info.get("token", "")})
+        self._send({"cmd": "poll_seconds", "seconds": self.poll_seconds})
+        # The profile may have changed while we were detached
+        self._send({"cmd": "reload_settings"})
+        if self._activate:
+            self._send({"cmd": "activate"})
+
+    def _on_disconnected(self):
+        if self._stopping:
+            return
+        self.status.emit("Presence service stopped — reconnecting…")
+        self._retry.start(1000)
+
+    def _send(self, message: dict):
+        self._socket.write(json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n")
+
+    def _on_ready_read(self):
+        while self._socket.canReadLine():
+            try:
+                message = json.loads(bytes(self._socket.readLine()).decode("utf-8"))
+            except ValueError:
+                continue
+            self._apply(message)
+
+    def _apply(self, message: dict):
+        kind = message.get("type")
+        if kind == "snapshot":
+            state = message.get("state") or {}
+            self._now_playing = dict(EMPTY_NOW_PLAYING)
+            self._now_playing.update(state.get("now_playing") or {})
+            self._active = bool(state.get("active", True))
+            self.attached.emit()
+            if state.get("status"):
+                self.status.emit(state["status"])
+            if state.get("account"):
+                self.account.emit(state["account"])
+            self.now_playing.emit(dict(self._now_playing))
+        elif kind == "delta":
+            event, data = message.get("event"), message.get("data")
+            if event == "now_playing":
+                self._now_playing.update(data or {})
+                self.now_playing.emit(dict(self._now_playing))
+            elif event == "status":
+                self.status.emit(data)
+            elif event == "account" and data:
+                self.account.emit(data)
+            elif event == "active":
+                self._active = bool(data)
+        elif kind == "metrics":
+            self.metrics.emit(message.get("metrics") or {})
+        elif kind == "trace":
+            self.trace.emit({k: v for k, v in message.items() if k != "type"})
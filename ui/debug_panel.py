@@ -0,0 +1,75 @@
+# ui/debug_panel.py
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QFontDatabase
+from PySide6.QtWidgets import QPlainTextEdit, QVBoxLayout, QWidget
+
+from core.metrics import REGISTRY, Registry, summary_lines
+
+
+class DebugPanel(QWidget):
+    """
+    Live view of the metrics registry; only refreshes while it is shown.
+    With a DaemonClient, the engine's metrics come from the daemon and the
+    window's own (artwork download, decode, render) are listed after them.
+    """
+
+    def __init__(self, registry: Registry = REGISTRY, client=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Rich Music Presence — Metrics")
+        self.resize(640, 420)
+        self._registry = registry
+        self._client = None
+        self._daemon_lines = None
+
+        self._text = QPlainTextEdit()
+        self._text.setReadOnly(True)
+        self._text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.addWidget(self._text)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self._refresh)
+        self.set_client(client)
+
+    def set_client(self, client):
+        """Follow another DaemonClient (the window restarted it), or None for in-process."""
+        if client is self._client:
+            return
+        if self._client is not None:
+            self._client.metrics.disconnect(self._on_daemon_metrics)
+        self._client = client
+        self._daemon_lines = None
+        if client is not None:
+            client.metrics.connect(self._on_daemon_metrics)
+
+    def showEvent(self, event):
+        self._refresh()
+        self._timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def _refresh(self):
+        if self._client is not None and not self._client.request_metrics():
+            self._daemon_lines = ["(presence service not attached)"]
+        self._render()
+
+    def _on_daemon_metrics(self, snapshot: dict):
+        self._daemon_lines = summary_lines(snapshot) or ["(no metrics yet)"]
+        if self.isVisible():
+            self._render()
+
+    def _render(self):
+        local = self._registry.summary_lines()
+        if self._client is None:
+            lines = local or ["(no metrics yet)"]
+        else:
+            lines = ["# presence service"] + (self._daemon_lines or ["(waiting…)"])
+            if local:
+                lines += ["", "# window"] + local
+        self._text.setPlainText("\n".join(lines))
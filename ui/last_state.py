@@ -0,0 +1,56 @@
+# ui/last_state.py
+import json
+import os
+from typing import Optional, Tuple
+
+from core.paths import app_data_dir
+
+# What the dashboard showed when the window last closed, so the next start
+# can paint it straight away instead of an empty card.
+
+
+def _paths() -> Tuple[str, str]:
+    base = app_data_dir()
+    return str(base / "last_state.json"), str(base / "last_artwork")
+
+
+def _write(path: str, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def save_last_state(now_playing: Optional[dict], artwork: Optional[bytes] = None):
+    """Nothing playing (None or no title) forgets the previous state."""
+    state_path, artwork_path = _paths()
+    try:
+        if not now_playing or not now_playing.get("title"):
+            for path in (state_path, artwork_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+        if artwork:
+            _write(artwork_path, artwork)
+        elif os.path.exists(artwork_path):
+            os.remove(artwork_path)
+        _write(state_path, json.dumps(now_playing).encode("utf-8"))
+    except OSError:
+        pass
+
+
+def load_last_state() -> Tuple[Optional[dict], Optional[bytes]]:
+    state_path, artwork_path = _paths()
+    try:
+        with open(state_path, "r", encoding="utf-8") as fh:
+            now_playing = json.load(fh)
+    except (OSError, ValueError):
+        return None, None
+    if not isinstance(now_playing, dict) or not now_playing.get("title"):
+        return None, None
+    try:
+        with open(artwork_path, "rb") as fh:
+            artwork = fh.read()
+    except OSError:
+        artwork = None
+    return now_playing, artwork
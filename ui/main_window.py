@@ -1,12 +1,16 @@
 # ui/main_window.py
 import math
+import os
 import random
-import urllib.request
+import threading
 from pathlib import Path
 
-from PySide6.QtCore import Qt, QEasingCurve, QPoint, QPointF, QPropertyAnimation, QParallelAnimationGroup, QSequentialAnimationGroup
+from PySide6.QtCore import (
+    Qt, QAbstractAnimation, QEasingCurve, QEvent, QPoint, QPointF, QPropertyAnimation,
+    QObject, QParallelAnimationGroup, QSequentialAnimationGroup, QTimer, Signal
+)
 from PySide6.QtGui import QGuiApplication
-from PySide6.QtGui import QColor, QIcon, QPainter, QPainterPath, QPixmap
+from PySide6.QtGui import QActionGroup, QColor, QIcon, QKeySequence, QPainter, QPainterPath, QPixmap, QShortcut
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QFrame, QStackedWidget, QProgressBar,
@@ -14,30 +18,261 @@ from PySide6.QtWidgets import (
     QMenu, QSystemTrayIcon
 )
 
-from .worker import PresenceWorker
+from core.metrics import REGISTRY
+from core.settings import PROFILES, SETTINGS, Profile
+from core.trace import TRACER, new_trace_path, traced
+
+from .daemon_client import DaemonClient
+from .last_state import load_last_state, save_last_state
 
 PRIMARY = "#7289da"
 BG = "#6b7cc8"
 
+# Window-wide rules only; each page carries its own sheet so Qt doesn't
+# match every page's selectors against every widget (and the dashboard's
+# aren't parsed until it's built).
+BASE_STYLE = f"""
+    * {{
+        background: transparent;
+        outline: none;
+        selection-background-color: transparent;
+        selection-color: white;
+    }}
+
+    QWidget {{
+        color: white;
+        font-family: -apple-system, BlinkMacSystemFont,
+                     "Segoe UI", Inter, Arial;
+    }}
+
+    QMainWindow {{
+        background-color: {BG};
+    }}
+
+    QWidget#Root {{
+        background-color: {BG};
+    }}
+
+    QStackedWidget, QWidget#ConnectPage, QWidget#DashboardPage, QWidget#StatsPage {{
+        background: transparent;
+    }}
+
+    QLabel {{
+        background: transparent;
+        qproperty-textInteractionFlags: NoTextInteraction;
+    }}
+"""
+
+CONNECT_STYLE = f"""
+    QFrame#Card {{
+        background-color: {PRIMARY};
+        border-radius: 24px;
+    }}
+
+    QLabel#Title {{
+        font-size: 22px;
+        font-weight: 800;
+    }}
+
+    QLabel#Subtitle {{
+        font-size: 14px;
+        color: rgba(255,255,255,0.9);
+    }}
+
+    QFrame#Features {{
+        background-color: rgba(255,255,255,0.12);
+        border-radius: 16px;
+    }}
+
+    QLabel#Dot {{
+        font-size: 18px;
+        font-weight: 900;
+    }}
+
+    QLabel#FeatureText {{
+        font-size: 14px;
+    }}
+
+    QPushButton#CTA {{
+        background-color: white;
+        color: {PRIMARY};
+        border-radius: 16px;
+        padding: 14px;
+        font-size: 15px;
+        font-weight: 800;
+    }}
+
+    QPushButton#CTA:hover {{
+        background-color: #f0f0f0;
+    }}
+
+    QLabel#Foot {{
+        font-size: 11px;
+        color: rgba(255,255,255,0.90);
+    }}
+
+    QLabel#Foot2 {{
+        font-size: 11px;
+        color: rgba(255,255,255,0.85);
+    }}
+"""
+
+# Shared by the dashboard and the stats page
+CARD_STYLE = """
+    QFrame#GlassCard {
+        background-color: rgba(255,255,255,0.10);
+        border: 1px solid rgba(255,255,255,0.18);
+        border-radius: 22px;
+    }
+
+    QLabel#DashTitle {
+        font-size: 18px;
+        font-weight: 800;
+    }
+
+    QLabel#DashMuted {
+        font-size: 13px;
+        color: rgba(255,255,255,0.70);
+    }
+
+    QProgressBar#TrackProgress {
+        background-color: rgba(255,255,255,0.22);
+        border: 0px;
+        border-radius: 5px;
+    }
+
+    QProgressBar#TrackProgress::chunk {
+        background-color: rgba(255,255,255,0.90);
+        border-radius: 5px;
+    }
+
+    QPushButton#GhostButton {
+        background-color: rgba(255,255,255,0.16);
+        border: 1px solid rgba(255,255,255,0.24);
+        border-radius: 12px;
+        padding: 6px 14px;
+        font-size: 12px;
+        font-weight: 700;
+    }
+
+    QPushButton#GhostButton:hover {
+        background-color: rgba(255,255,255,0.24);
+    }
+
+    QLabel#StatName {
+        font-size: 13px;
+    }
+
+    QLabel#StatValue {
+        font-size: 12px;
+        color: rgba(255,255,255,0.75);
+    }
+"""
+
+DASHBOARD_STYLE = """
+    QFrame#NowCard {
+        background-color: rgba(255,255,255,0.26);
+        border: 1px solid rgba(255,255,255,0.24);
+        border-radius: 32px;
+    }
+
+    QLabel#SongTitle {
+        font-size: 20px;
+        font-weight: 900;
+    }
+
+    QLabel#ArtistName {
+        font-size: 14px;
+        color: rgba(255,255,255,0.90);
+    }
+
+    QLabel#AlbumName {
+        font-size: 12px;
+        color: rgba(255,255,255,0.75);
+    }
+
+    QLabel#PlayingLine {
+        font-size: 12px;
+        color: rgba(255,255,255,0.70);
+        border-radius: 5px;
+    }
+
+    QLabel#AlbumArtBig {
+        background-color: rgba(255,255,255,0.16);
+        border-radius: 20px;
+        color: rgba(255,255,255,0.85);
+        font-size: 28px;
+        font-weight: 800;
+    }
+
+    QLabel#TimeText {
+        font-size: 11px;
+        color: rgba(255,255,255,0.75);
+        qproperty-textInteractionFlags: NoTextInteraction;
+        selection-background-color: transparent;
+    }
+
+    QLabel#FooterNote {
+        font-size: 11px;
+        color: rgba(255,255,255,0.70);
+    }
+
+    QLabel#FooterVersion {
+        font-size: 10px;
+        color: rgba(255,255,255,0.55);
+    }
+"""
+
+
+class _ArtworkFetcher(QObject):
+    """Downloads artwork the cache doesn't have off the GUI thread; `fetched` arrives on it."""
+
+    fetched = Signal(str, object)   # url, bytes or None if the download failed
+
+    def fetch(self, url: str, timeout: float):
+        threading.Thread(target=self._run, args=(url, timeout), name="artwork-fetch", daemon=True).start()
+
+    def _run(self, url: str, timeout: float):
+        # Pulls in requests; the connect page doesn't need it
+        from core.artwork_cache import ARTWORK_CACHE
+
+        with REGISTRY.timed("artwork_download"):
+            art = ARTWORK_CACHE.get(url, timeout=timeout)
+        try:
+            self.fetched.emit(url, art.data if art is not None else None)
+        except RuntimeError:
+            # The window went away while downloading
+            pass
+
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, worker_options=None):
         super().__init__()
 
         self.setWindowTitle("Rich Music Presence")
         self.setFixedSize(520, 620)
 
         self.worker = None
+        # Extra PresenceEngine options (sources, connect, lookup) for harnesses
+        self._worker_options = worker_options or {}
         self._artwork_url = ""
         self._artwork_pixmap = None
+        self._artwork_data = None
+        self._artwork_fetcher = _ArtworkFetcher(self)
+        self._artwork_fetcher.fetched.connect(self._on_artwork_fetched)
+        self._artwork_fetching = set()   # URLs being downloaded
+        self._last_np = None        # latest live now_playing, saved on exit
         self._animating = False
         self._page_anim = None
         self._glow_effect = None
         self._glow_anim = None
         self._glow_transition = None
-        self._active_poll_seconds = 1
-        self._inactive_poll_seconds = 5
-        self._current_poll_seconds = self._active_poll_seconds
+        self._glow_playing = None
+        # Poll cadence and animation level come from the settings profile
+        self._app_active = True
+        self._current_poll_seconds = SETTINGS.profile.poll_active
+        self._animations = SETTINGS.profile.animations
+        self._profile_actions = {}
         self._last_song_sig = None
         self._bg_anim = None
         self._bg_margin = 36
@@ -45,6 +280,11 @@ class MainWindow(QMainWindow):
         self._tray = None
         self._icon = self._load_app_icon()
         self._force_quit = False
+        self._debug_panel = None
+        self._daemon_tracing = False
+        self.now_card = None
+        self.dashboard_page = None   # built on first use, see _dashboard()
+        self.stats_page = None
 
         root = QWidget()
         root.setObjectName("Root")
@@ -60,10 +300,7 @@ class MainWindow(QMainWindow):
         self.stack = QStackedWidget()
 
         self.connect_page = self._build_connect_page()
-        self.dashboard_page = self._build_dashboard_page()
-
         self.stack.addWidget(self.connect_page)
-        self.stack.addWidget(self.dashboard_page)
 
         root_layout.addWidget(self.stack)
         self.setCentralWidget(root)
@@ -72,20 +309,40 @@ class MainWindow(QMainWindow):
         self.bg_label.lower()
         self.stack.raise_()
 
-        self._apply_styles()
+        self.setStyleSheet(BASE_STYLE)
+        self.connect_page.setStyleSheet(CONNECT_STYLE)
 
-        self._fade_in_root()
+        if self._animations != "off":
+            self._fade_in_root()
 
-        self._init_tray()
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self._toggle_debug_panel)
         if self._icon:
             self.setWindowIcon(self._icon)
 
-        # Always start on connect screen for now
+        # Start on the connect screen; the tray and the daemon probe wait
+        # until it has been painted (see _after_first_frame)
         self.stack.setCurrentWidget(self.connect_page)
+        self._painted = False
 
         app = QGuiApplication.instance()
         if app:
             app.applicationStateChanged.connect(self._on_app_state_changed)
+        SETTINGS.subscribe(self._on_profile)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            QTimer.singleShot(0, self._after_first_frame)
+
+    def _after_first_frame(self):
+        self._init_tray()
+        # Warm-up: attach to the background daemon, or start one in standby
+        # (Discord link, source and artwork ready, nothing shown on Discord)
+        # so Connect only has to flip it on. If presence is already running,
+        # attaching jumps straight to the dashboard.
+        if not self._in_process():
+            self._start_worker(standby=True)
 
     # ==================================================
     # CONNECT PAGE
@@ -172,6 +429,15 @@ class MainWindow(QMainWindow):
     # DASHBOARD PAGE
     # ==================================================
 
+    def _dashboard(self) -> QWidget:
+        if self.dashboard_page is None:
+            self.dashboard_page = self._build_dashboard_page()
+            self.dashboard_page.setStyleSheet(CARD_STYLE + DASHBOARD_STYLE)
+            self.stack.addWidget(self.dashboard_page)
+            if self._last_np is not None:
+                self._show_now_playing(self._last_np)
+        return self.dashboard_page
+
     def _build_dashboard_page(self):
         page = QWidget()
         page.setObjectName("DashboardPage")
@@ -183,8 +449,9 @@ class MainWindow(QMainWindow):
         # Account card
         account = QFrame()
         account.setObjectName("GlassCard")
-        av = QVBoxLayout(account)
-        av.setContentsMargins(20, 18, 20, 18)
+        ah = QHBoxLayout(account)
+        ah.setContentsMargins(20, 18, 20, 18)
+        av = QVBoxLayout()
         av.setSpacing(4)
 
         acc_title = QLabel("Connected")
@@ -196,6 +463,13 @@ class MainWindow(QMainWindow):
         av.addWidget(acc_title)
         av.addWidget(acc_sub)
 
+        stats_btn = QPushButton("Stats")
+        stats_btn.setObjectName("GhostButton")
+        stats_btn.clicked.connect(self._show_stats)
+
+        ah.addLayout(av, 1)
+        ah.addWidget(stats_btn, 0, Qt.AlignVCenter)
+
         # Now Playing card
         now = QFrame()
         self.now_card = now
@@ -273,6 +547,20 @@ class MainWindow(QMainWindow):
 
         return page
 
+    # ==================================================
+    # STATS PAGE (built on first use)
+    # ==================================================
+
+    def _show_stats(self):
+        if self.stats_page is None:
+            from .stats_page import StatsPage
+
+            self.stats_page = StatsPage()
+            self.stats_page.setStyleSheet(CARD_STYLE)
+            self.stats_page.back.connect(lambda: self._switch_page(self._dashboard()))
+            self.stack.addWidget(self.stats_page)
+        self._switch_page(self.stats_page)
+
     # ==================================================
     # WORKER HOOKUP
     # ==================================================
@@ -281,44 +569,72 @@ class MainWindow(QMainWindow):
         self.connect_btn.setEnabled(False)
         self.connect_status.setText("Connecting…")
 
+        if isinstance(self.worker, DaemonClient):
+            self.worker.activate()
+            if not self.worker.is_attached:
+                self.worker.start()
         self._start_worker()
 
-        # Move to dashboard immediately (worker can update after)
-        self._switch_page(self.dashboard_page)
+        # Move to dashboard immediately (worker can update after); until the
+        # first live update it shows what was playing last time
+        if self._last_np is None:
+            self._restore_last_state()
+        self._switch_page(self._dashboard())
+
+    def _in_process(self) -> bool:
+        # Harnesses pass engine options and want the engine in this process
+        return bool(self._worker_options) or bool(os.environ.get("RMP_IN_PROCESS"))
 
-    def _start_worker(self):
+    def _start_worker(self, spawn: bool = True, standby: bool = False):
         if self.worker:
             return
 
-        self.worker = PresenceWorker(poll_seconds=self._current_poll_seconds, parent=self)
+        if self._in_process():
+            # Pulls in the engine, Discord RPC and requests; the daemon client doesn't
+            from .worker import PresenceWorker
+
+            self.worker = PresenceWorker(
+                poll_seconds=self._current_poll_seconds, parent=self, **self._worker_options
+            )
+        else:
+            self.worker = DaemonClient(poll_seconds=self._current_poll_seconds, parent=self)
+            self.worker.attached.connect(self._on_attached)
+            self.worker.trace.connect(self._on_daemon_trace)
 
-        # Required signal: now_playing(dict)
         self.worker.now_playing.connect(self._on_now_playing)
+        self.worker.status.connect(self._on_worker_status)
 
-        # Optional signal: status(str) — only connect if it exists
-        if hasattr(self.worker, "status"):
-            try:
-                self.worker.status.connect(self._on_worker_status)
-            except Exception:
-                pass
+        if isinstance(self.worker, DaemonClient):
+            self.worker.start(spawn=spawn, standby=standby)
+        else:
+            self.worker.start()
 
-        self.worker.start()
+    def _on_attached(self):
+        if self.worker.active and self.stack.currentWidget() is self.connect_page:
+            self.connect_btn.setEnabled(False)
+            self._switch_page(self._dashboard())
 
     def _on_app_state_changed(self, state):
-        if state == Qt.ApplicationActive:
-            if self.isHidden():
-                self._show_from_tray()
-            self._set_poll_seconds(self._active_poll_seconds)
-        else:
-            self._set_poll_seconds(self._inactive_poll_seconds)
+        self._app_active = state == Qt.ApplicationActive
+        if self._app_active and self.isHidden():
+            self._show_from_tray()
+        self._apply_poll_seconds()
+
+    def _apply_poll_seconds(self):
+        profile = SETTINGS.profile
+        self._set_poll_seconds(profile.poll_active if self._app_active else profile.poll_background)
 
     def _set_poll_seconds(self, seconds: int):
         self._current_poll_seconds = seconds
         if self.worker:
-            self.worker.poll_seconds = seconds
+            self.worker.set_poll_seconds(seconds)
 
+    @traced("on_worker_status", "gui")
     def _on_worker_status(self, msg: str):
-        # Show status on connect page and in dashboard status line
+        # Show status on connect page and in dashboard status line; a
+        # standby daemon's "Discord connected" would read as already connected
+        if isinstance(self.worker, DaemonClient) and not self.worker.active:
+            return
         self.connect_status.setText(msg)
 
     def _format_time(self, seconds: float) -> str:
@@ -330,7 +646,16 @@ class MainWindow(QMainWindow):
         secs = total % 60
         return f"{mins}:{secs:02d}"
 
+    @traced("on_now_playing", "gui")
     def _on_now_playing(self, np: dict):
+        self._last_np = np
+        # Until the dashboard is first shown there's nothing to fill; a
+        # standby daemon's snapshot at startup mustn't build it (_dashboard
+        # fills it from _last_np)
+        if self.dashboard_page is not None:
+            self._show_now_playing(np)
+
+    def _show_now_playing(self, np: dict):
         title = (np.get("title") or "").strip()
         artist = (np.get("artist") or "").strip()
         album = (np.get("album") or "").strip()
@@ -338,7 +663,7 @@ class MainWindow(QMainWindow):
         artwork_url = (np.get("artwork_url") or "").strip()
         duration = float(np.get("duration") or 0)
         position = float(np.get("position") or 0)
-        sig = (title, artist, album)
+        sig = np.get("track_id") or (title, artist, album)
 
         if title:
             self.d_song.setText(title)
@@ -382,7 +707,13 @@ class MainWindow(QMainWindow):
 
         self._set_playing_glow(playing)
 
-    def _set_artwork(self, url: str):
+    def _set_artwork(self, url: str, data: bytes = None):
+        """
+        Show the artwork at `url`; `data` (already downloaded bytes) skips the
+        download. Artwork that isn't cached is downloaded off the GUI thread
+        and shown when it arrives; the old artwork stays up until then.
+        """
+        self._artwork_data = None
         if not url:
             self.d_art.setPixmap(QPixmap())
             self.d_art.setText("♪")
@@ -390,21 +721,43 @@ class MainWindow(QMainWindow):
             self._clear_background()
             return
 
+        if data is None:
+            from core.artwork_cache import ARTWORK_CACHE
+
+            art = ARTWORK_CACHE.get_cached(url)
+            if art is None:
+                self._artwork_pixmap = None
+                if url not in self._artwork_fetching:
+                    self._artwork_fetching.add(url)
+                    self._artwork_fetcher.fetch(url, SETTINGS.profile.artwork_timeout)
+                return
+            data = art.data
+        self._show_artwork(data)
+
+    def _on_artwork_fetched(self, url: str, data):
+        self._artwork_fetching.discard(url)
+        # The track may have moved on while it downloaded
+        if url == self._artwork_url and self.dashboard_page is not None:
+            self._show_artwork(data)
+
+    def _show_artwork(self, data):
         try:
-            with urllib.request.urlopen(url, timeout=2) as resp:
-                data = resp.read()
             pix = QPixmap()
-            if pix.loadFromData(data):
+            with REGISTRY.timed("artwork_decode"):
+                loaded = data is not None and pix.loadFromData(data)
+            if loaded:
                 self._artwork_pixmap = pix
-                scaled = pix.scaled(
-                    self.d_art.size(),
-                    Qt.KeepAspectRatioByExpanding,
-                    Qt.SmoothTransformation,
-                )
-                rounded = self._rounded_pixmap(scaled, radius=22)
-                self.d_art.setPixmap(rounded)
-                self.d_art.setText("")
-                self._set_background_pixmap(pix)
+                self._artwork_data = data
+                with REGISTRY.timed("artwork_render"):
+                    scaled = pix.scaled(
+                        self.d_art.size(),
+                        Qt.KeepAspectRatioByExpanding,
+                        Qt.SmoothTransformation,
+                    )
+                    rounded = self._rounded_pixmap(scaled, radius=22)
+                    self.d_art.setPixmap(rounded)
+                    self.d_art.setText("")
+                    self._set_background_pixmap(pix)
                 return
         except Exception:
             pass
@@ -414,6 +767,17 @@ class MainWindow(QMainWindow):
         self._artwork_pixmap = None
         self._clear_background()
 
+    def _restore_last_state(self):
+        now_playing, artwork = load_last_state()
+        if now_playing is None:
+            return
+        self._dashboard()
+        url = (now_playing.get("artwork_url") or "").strip()
+        # Paint the saved artwork under its URL so the live update doesn't refetch it
+        self._artwork_url = url if artwork else ""
+        self._set_artwork(self._artwork_url, artwork)
+        self._on_now_playing(dict(now_playing, playing=False))
+
     def _set_background_pixmap(self, pixmap: QPixmap):
         if pixmap.isNull():
             self._clear_background()
@@ -449,7 +813,6 @@ class MainWindow(QMainWindow):
     def _clear_background(self):
         if self._bg_anim:
             self._bg_anim.stop()
-            self._bg_anim = None
         self.bg_label.setPixmap(QPixmap())
         self.bg_label.setVisible(False)
         self.bg_label.setGraphicsEffect(None)
@@ -461,13 +824,9 @@ class MainWindow(QMainWindow):
         self.bg_label.setGeometry(-margin, -margin, w + margin * 2, h + margin * 2)
 
     def _start_bg_motion(self):
-        if not self.bg_label.isVisible():
+        if not self.bg_label.isVisible() or not self._motion_allowed():
             return
 
-        if self._bg_anim:
-            self._bg_anim.stop()
-            self._bg_anim = None
-
         dx = random.uniform(-1.0, 1.0)
         dy = random.uniform(-1.0, 1.0)
         length = math.hypot(dx, dy)
@@ -483,45 +842,40 @@ class MainWindow(QMainWindow):
         start = base - delta
         end = base + delta
 
-        forward = QPropertyAnimation(self.bg_label, b"pos")
-        forward.setDuration(14000)
+        # One drift loop for the window's lifetime; a track change re-aims it
+        if self._bg_anim is None:
+            group = QSequentialAnimationGroup(self)
+            for _ in range(2):
+                anim = QPropertyAnimation(self.bg_label, b"pos", group)
+                anim.setDuration(14000)
+                anim.setEasingCurve(QEasingCurve.InOutSine)
+                group.addAnimation(anim)
+            group.setLoopCount(-1)
+            self._bg_anim = group
+
+        self._bg_anim.stop()
+        forward, backward = self._bg_anim.animationAt(0), self._bg_anim.animationAt(1)
         forward.setStartValue(start)
         forward.setEndValue(end)
-        forward.setEasingCurve(QEasingCurve.InOutSine)
-
-        backward = QPropertyAnimation(self.bg_label, b"pos")
-        backward.setDuration(14000)
         backward.setStartValue(end)
         backward.setEndValue(start)
-        backward.setEasingCurve(QEasingCurve.InOutSine)
-
-        group = QSequentialAnimationGroup(self)
-        group.addAnimation(forward)
-        group.addAnimation(backward)
-        group.setLoopCount(-1)
-        self._bg_anim = group
-        group.start()
+        self._bg_anim.start()
 
     def _set_playing_glow(self, playing: bool):
         if not self.now_card:
             return
 
+        # Called on every now_playing tick; only a state change animates
+        if playing == self._glow_playing:
+            return
+        self._glow_playing = playing
+
         if not self._glow_effect:
-            effect = QGraphicsDropShadowEffect(self.now_card)
-            effect.setBlurRadius(14)
-            effect.setOffset(QPointF(0.0, 0.0))
-            effect.setColor(QColor(255, 255, 255, 40))
-            self._glow_effect = effect
-            self.now_card.setGraphicsEffect(effect)
+            self._init_glow_animations()
 
         # Stop motion while transitioning states
-        if self._glow_anim:
-            self._glow_anim.stop()
-            self._glow_anim = None
-
-        if self._glow_transition:
-            self._glow_transition.stop()
-            self._glow_transition = None
+        self._glow_anim.stop()
+        self._glow_transition.stop()
 
         if playing:
             target_blur = 42
@@ -530,49 +884,81 @@ class MainWindow(QMainWindow):
             target_blur = 14
             target_color = QColor(255, 255, 255, 40)
 
-        blur_anim = QPropertyAnimation(self._glow_effect, b"blurRadius")
-        blur_anim.setDuration(320)
-        blur_anim.setEndValue(target_blur)
-        blur_anim.setEasingCurve(QEasingCurve.OutCubic)
+        if self._animations == "off":
+            self._glow_effect.setBlurRadius(target_blur)
+            self._glow_effect.setColor(target_color)
+            return
 
-        color_anim = QPropertyAnimation(self._glow_effect, b"color")
-        color_anim.setDuration(320)
+        blur_anim, color_anim = self._glow_transition.animationAt(0), self._glow_transition.animationAt(1)
+        blur_anim.setEndValue(target_blur)
         color_anim.setEndValue(target_color)
-        color_anim.setEasingCurve(QEasingCurve.OutCubic)
-
-        group = QParallelAnimationGroup(self)
-        group.addAnimation(blur_anim)
-        group.addAnimation(color_anim)
-
-        def _maybe_start_motion():
-            if not playing:
-                return
-            # Subtle glow movement around the card by animating shadow offset.
-            offsets = [
-                QPointF(0.0, 3.0),
-                QPointF(3.0, 0.0),
-                QPointF(0.0, -3.0),
-                QPointF(-3.0, 0.0),
-            ]
-            motion = QSequentialAnimationGroup(self)
-            for point in offsets:
-                anim = QPropertyAnimation(self._glow_effect, b"offset")
-                anim.setDuration(700)
-                anim.setEndValue(point)
-                anim.setEasingCurve(QEasingCurve.InOutSine)
-                motion.addAnimation(anim)
-            motion.setLoopCount(-1)
-            self._glow_anim = motion
-            motion.start()
-
-        group.finished.connect(_maybe_start_motion)
-        self._glow_transition = group
-        group.start()
+        self._glow_transition.start()
+
+    def _init_glow_animations(self):
+        # Created once and reused; the window owns them for its lifetime
+        effect = QGraphicsDropShadowEffect(self.now_card)
+        effect.setBlurRadius(14)
+        effect.setOffset(QPointF(0.0, 0.0))
+        effect.setColor(QColor(255, 255, 255, 40))
+        self._glow_effect = effect
+        self.now_card.setGraphicsEffect(effect)
+
+        transition = QParallelAnimationGroup(self)
+        for prop in (b"blurRadius", b"color"):
+            anim = QPropertyAnimation(effect, prop, transition)
+            anim.setDuration(320)
+            anim.setEasingCurve(QEasingCurve.OutCubic)
+            transition.addAnimation(anim)
+        transition.finished.connect(self._start_glow_motion)
+        self._glow_transition = transition
+
+        # Subtle glow movement around the card by animating shadow offset.
+        offsets = [
+            QPointF(0.0, 3.0),
+            QPointF(3.0, 0.0),
+            QPointF(0.0, -3.0),
+            QPointF(-3.0, 0.0),
+        ]
+        motion = QSequentialAnimationGroup(self)
+        for point in offsets:
+            anim = QPropertyAnimation(effect, b"offset", motion)
+            anim.setDuration(700)
+            anim.setEndValue(point)
+            anim.setEasingCurve(QEasingCurve.InOutSine)
+            motion.addAnimation(anim)
+        motion.setLoopCount(-1)
+        self._glow_anim = motion
+
+    def _start_glow_motion(self):
+        if self._glow_playing and self._motion_allowed():
+            self._glow_anim.start()
+
+    def _motion_allowed(self) -> bool:
+        # Looping motion ticks ~60 times a second even when nobody can see it
+        return self._animations == "full" and self.isVisible() and not self.isMinimized()
+
+    def _pause_motion(self):
+        for anim in (self._bg_anim, self._glow_anim):
+            if anim and anim.state() == QAbstractAnimation.Running:
+                anim.pause()
+
+    def _resume_motion(self):
+        if not self._motion_allowed():
+            return
+        for anim in (self._bg_anim, self._glow_anim):
+            if anim and anim.state() == QAbstractAnimation.Paused:
+                anim.resume()
+        # Whatever would have started while hidden (track change, glow transition)
+        if self._bg_anim is None or self._bg_anim.state() == QAbstractAnimation.Stopped:
+            self._start_bg_motion()
+        if self._glow_anim and self._glow_anim.state() == QAbstractAnimation.Stopped:
+            self._start_glow_motion()
 
     # ==================================================
     # PAGE TRANSITIONS
     # ==================================================
 
+    @traced("switch_page", "gui")
     def _switch_page(self, target: QWidget):
         if self._animating:
             return
@@ -581,6 +967,10 @@ class MainWindow(QMainWindow):
         if current is target:
             return
 
+        if self._animations == "off":
+            self.stack.setCurrentWidget(target)
+            return
+
         self._animating = True
         w = self.stack.width()
         h = self.stack.height()
@@ -640,7 +1030,7 @@ class MainWindow(QMainWindow):
 
         group.finished.connect(_finish)
         self._page_anim = group
-        group.start()
+        group.start(QAbstractAnimation.DeleteWhenStopped)
 
     def _fade_in_root(self):
         effect = QGraphicsOpacityEffect(self.stack)
@@ -666,15 +1056,16 @@ class MainWindow(QMainWindow):
         group = QParallelAnimationGroup(self)
         group.addAnimation(anim)
         group.addAnimation(move)
-        group.start()
 
         def _finish():
             self.stack.setGraphicsEffect(None)
             self.stack.move(end_pos)
+            self._root_fade = None
 
         group.finished.connect(_finish)
-        # Keep a ref so GC doesn't stop the animation
+        # Keep a ref so GC doesn't stop the animation; Qt deletes it when done
         self._root_fade = group
+        group.start(QAbstractAnimation.DeleteWhenStopped)
 
     def _rounded_pixmap(self, pixmap: QPixmap, radius: int) -> QPixmap:
         size = self.d_art.size()
@@ -696,6 +1087,22 @@ class MainWindow(QMainWindow):
     # CLEAN SHUTDOWN
     # ==================================================
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._resume_motion()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._pause_motion()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            if self.isMinimized():
+                self._pause_motion()
+            else:
+                self._resume_motion()
+
     def closeEvent(self, event):
         # Minimize to tray if available
         if self._tray and self._tray.isVisible() and not self._force_quit:
@@ -704,6 +1111,7 @@ class MainWindow(QMainWindow):
             return
 
         self._stop_worker()
+        SETTINGS.unsubscribe(self._on_profile)
         event.accept()
 
     def _init_tray(self):
@@ -717,16 +1125,57 @@ class MainWindow(QMainWindow):
 
         menu = QMenu()
         action_show = menu.addAction("Show")
+        performance = menu.addMenu("Performance")
+        group = QActionGroup(performance)
+        for name in PROFILES:
+            action = performance.addAction(name.capitalize())
+            action.setCheckable(True)
+            action.setChecked(name == SETTINGS.profile_name)
+            action.triggered.connect(lambda _=False, n=name: SETTINGS.select(n))
+            group.addAction(action)
+            self._profile_actions[name] = action
+        action_debug = menu.addAction("Debug Metrics")
+        action_trace = menu.addAction("Record Trace")
+        action_trace.setCheckable(True)
+        menu.addSeparator()
         action_quit = menu.addAction("Quit")
+        action_stop_quit = menu.addAction("Stop Presence && Quit")
 
         action_show.triggered.connect(self._show_from_tray)
+        action_debug.triggered.connect(self._toggle_debug_panel)
+        action_trace.toggled.connect(self._set_trace_recording)
         action_quit.triggered.connect(self._quit_from_tray)
+        action_stop_quit.triggered.connect(self._stop_presence_and_quit)
         tray.activated.connect(self._on_tray_activated)
 
         tray.setContextMenu(menu)
         tray.show()
         self._tray = tray
 
+    def _on_profile(self, profile: Profile):
+        action = self._profile_actions.get(SETTINGS.profile_name)
+        if action:
+            action.setChecked(True)
+        self._apply_poll_seconds()
+        self._set_animation_level(profile.animations)
+        if isinstance(self.worker, DaemonClient):
+            self.worker.reload_settings()
+
+    def _set_animation_level(self, level: str):
+        if level == self._animations:
+            return
+        self._animations = level
+        if level != "full":
+            # Looping motion is what costs while the window sits open
+            if self._bg_anim:
+                self._bg_anim.stop()
+            if self._glow_anim:
+                self._glow_anim.stop()
+        else:
+            self._start_bg_motion()
+            if self._glow_anim:
+                self._start_glow_motion()
+
     def _on_tray_activated(self, reason):
         if reason == QSystemTrayIcon.Trigger:
             self._show_from_tray()
@@ -738,15 +1187,77 @@ class MainWindow(QMainWindow):
         if self._icon:
             self.setWindowIcon(self._icon)
 
+    def _daemon_client(self):
+        return self.worker if isinstance(self.worker, DaemonClient) else None
+
+    def _toggle_debug_panel(self):
+        if self._debug_panel is None:
+            from .debug_panel import DebugPanel
+
+            self._debug_panel = DebugPanel()
+            if self._icon:
+                self._debug_panel.setWindowIcon(self._icon)
+        # The engine's metrics live in the daemon when we're attached to one
+        self._debug_panel.set_client(self._daemon_client())
+        if self._debug_panel.isVisible():
+            self._debug_panel.hide()
+        else:
+            self._debug_panel.show()
+            self._debug_panel.raise_()
+
+    def _set_trace_recording(self, on: bool):
+        # The engine's spans are recorded by the daemon, the GUI slots' here
+        client = self._daemon_client()
+        if on:
+            TRACER.start()
+            self._daemon_tracing = client is not None and client.set_tracing(True)
+            return
+        TRACER.stop()
+        if self._daemon_tracing and client is not None and client.set_tracing(False):
+            # Saved once the daemon answers (_on_daemon_trace)
+            return
+        path = new_trace_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            count = TRACER.dump(path)
+        except OSError as e:
+            self._tray.showMessage("Trace not saved", str(e))
+            return
+        self._tray.showMessage("Trace saved", f"{count} spans → {path}")
+
+    def _on_daemon_trace(self, result: dict):
+        if result.get("on") or not self._tray:
+            return
+        self._daemon_tracing = False
+        if result.get("error"):
+            self._tray.showMessage("Trace not saved", result["error"])
+            return
+        path = result.get("path", "")
+        count = result.get("spans", 0)
+        try:
+            count += TRACER.merge_into(path)
+        except (OSError, ValueError):
+            pass
+        self._tray.showMessage("Trace saved", f"{count} spans → {path}")
+
     def _quit_from_tray(self):
         self._force_quit = True
         self._stop_worker()
+        SETTINGS.unsubscribe(self._on_profile)
+        if self._debug_panel:
+            self._debug_panel.close()
         app = QGuiApplication.instance()
         if app:
             app.quit()
         else:
             self.close()
 
+    def _stop_presence_and_quit(self):
+        # Quit alone leaves the background daemon (and presence) running
+        if isinstance(self.worker, DaemonClient):
+            self.worker.shutdown()
+        self._quit_from_tray()
+
     def _load_app_icon(self):
         icon_path = Path(__file__).resolve().parents[1] / "logo.png"
         if icon_path.exists():
@@ -756,184 +1267,24 @@ class MainWindow(QMainWindow):
     def _stop_worker(self):
         if not self.worker:
             return
+        if self._last_np is not None:
+            save_last_state(self._last_np, self._artwork_data if self._artwork_url else None)
         try:
-            self.worker.stop()
+            if isinstance(self.worker, DaemonClient) and not self.worker.active:
+                # Never connected: cancel the warm-up rather than leave it waiting
+                self.worker.shutdown()
+            else:
+                self.worker.stop()
         except Exception:
             pass
         try:
-            if self.worker.isRunning():
+            if not isinstance(self.worker, DaemonClient) and self.worker.isRunning():
                 self.worker.quit()
                 self.worker.wait(2000)
         except Exception:
             pass
+        if isinstance(self.worker, DaemonClient):
+            self.worker.deleteLater()
         self._set_playing_glow(False)
         self._clear_background()
         self.worker = None
-
-    # ==================================================
-    # STYLES (NO HIGHLIGHTS)
-    # ==================================================
-
-    def _apply_styles(self):
-        self.setStyleSheet(f"""
-            * {{
-                background: transparent;
-                outline: none;
-                selection-background-color: transparent;
-                selection-color: white;
-            }}
-
-            QWidget {{
-                color: white;
-                font-family: -apple-system, BlinkMacSystemFont,
-                             "Segoe UI", Inter, Arial;
-            }}
-
-            QMainWindow {{
-                background-color: {BG};
-            }}
-
-            QWidget#Root {{
-                background-color: {BG};
-            }}
-
-            QStackedWidget, QWidget#ConnectPage, QWidget#DashboardPage {{
-                background: transparent;
-            }}
-
-            QLabel {{
-                background: transparent;
-                qproperty-textInteractionFlags: NoTextInteraction;
-            }}
-
-            QFrame#Card {{
-                background-color: {PRIMARY};
-                border-radius: 24px;
-            }}
-
-            QLabel#Title {{
-                font-size: 22px;
-                font-weight: 800;
-            }}
-
-            QLabel#Subtitle {{
-                font-size: 14px;
-                color: rgba(255,255,255,0.9);
-            }}
-
-            QFrame#Features {{
-                background-color: rgba(255,255,255,0.12);
-                border-radius: 16px;
-            }}
-
-            QLabel#Dot {{
-                font-size: 18px;
-                font-weight: 900;
-            }}
-
-            QLabel#FeatureText {{
-                font-size: 14px;
-            }}
-
-            QPushButton#CTA {{
-                background-color: white;
-                color: {PRIMARY};
-                border-radius: 16px;
-                padding: 14px;
-                font-size: 15px;
-                font-weight: 800;
-            }}
-
-            QPushButton#CTA:hover {{
-                background-color: #f0f0f0;
-            }}
-
-            QLabel#Foot {{
-                font-size: 11px;
-                color: rgba(255,255,255,0.90);
-            }}
-
-            QLabel#Foot2 {{
-                font-size: 11px;
-                color: rgba(255,255,255,0.85);
-            }}
-
-            QFrame#GlassCard {{
-                background-color: rgba(255,255,255,0.10);
-                border: 1px solid rgba(255,255,255,0.18);
-                border-radius: 22px;
-            }}
-
-            QFrame#NowCard {{
-                background-color: rgba(255,255,255,0.26);
-                border: 1px solid rgba(255,255,255,0.24);
-                border-radius: 32px;
-            }}
-
-            QLabel#DashTitle {{
-                font-size: 18px;
-                font-weight: 800;
-            }}
-
-            QLabel#DashMuted {{
-                font-size: 13px;
-                color: rgba(255,255,255,0.70);
-            }}
-
-            QLabel#SongTitle {{
-                font-size: 20px;
-                font-weight: 900;
-            }}
-
-            QLabel#ArtistName {{
-                font-size: 14px;
-                color: rgba(255,255,255,0.90);
-            }}
-
-            QLabel#AlbumName {{
-                font-size: 12px;
-                color: rgba(255,255,255,0.75);
-            }}
-
-            QLabel#PlayingLine {{
-                font-size: 12px;
-                color: rgba(255,255,255,0.70);
-                border-radius: 5px;
-            }}
-
-            QLabel#AlbumArtBig {{
-                background-color: rgba(255,255,255,0.16);
-                border-radius: 20px;
-                color: rgba(255,255,255,0.85);
-                font-size: 28px;
-                font-weight: 800;
-            }}
-
-            QProgressBar#TrackProgress {{
-                background-color: rgba(255,255,255,0.22);
-                border: 0px;
-                border-radius: 5px;
-            }}
-
-            QProgressBar#TrackProgress::chunk {{
-                background-color: rgba(255,255,255,0.90);
-                border-radius: 5px;
-            }}
-
-            QLabel#TimeText {{
-                font-size: 11px;
-                color: rgba(255,255,255,0.75);
-                qproperty-textInteractionFlags: NoTextInteraction;
-                selection-background-color: transparent;
-            }}
-
-            QLabel#FooterNote {{
-                font-size: 11px;
-                color: rgba(255,255,255,0.70);
-            }}
-
-            QLabel#FooterVersion {{
-                font-size: 10px;
-                color: rgba(255,255,255,0.55);
-            }}
-        """)
@@ -0,0 +1,144 @@
+# ui/stats_page.py
+import time
+from datetime import date, timedelta
+
+from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtWidgets import QFrame, QHBoxLayout, QLabel, QProgressBar, QPushButton, QVBoxLayout, QWidget
+
+from core.history import HistoryStats, day_number
+
+
+class _StatsLoader(QThread):
+    loaded = Signal(dict)
+
+    def __init__(self, stats: HistoryStats, parent=None):
+        super().__init__(parent)
+        self._stats = stats
+
+    def run(self):
+        week_ago = time.time() - 7 * 86400
+        today = date.today()
+        days = [today - timedelta(days=i) for i in range(6, -1, -1)]
+        totals = dict(
+            (day, seconds) for day, _, seconds in self._stats.daily_totals(
+                day_number(time.mktime(days[0].timetuple())), day_number(time.time())
+            )
+        )
+        self.loaded.emit({
+            "artists": self._stats.top_artists(week_ago, 5),
+            "albums": self._stats.top_albums(week_ago, 3),
+            "days": [(d, totals.get(d.year * 10000 + d.month * 100 + d.day, 0.0)) for d in days],
+        })
+
+
+def _hours(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    return f"{minutes // 60}h {minutes % 60:02d}m" if minutes >= 60 else f"{minutes}m"
+
+
+class StatsPage(QWidget):
+    """Listening stats for the last 7 days; queries run off the GUI thread each time it's shown."""
+
+    back = Signal()
+
+    def __init__(self, stats: HistoryStats = None, parent=None):
+        super().__init__(parent)
+        self.setObjectName("StatsPage")
+        self._stats = stats or HistoryStats()
+        self._loader = None
+
+        layout = QVBoxLayout(self)
+        layout.setAlignment(Qt.AlignTop)
+        layout.setContentsMargins(24, 24, 24, 24)
+        layout.setSpacing(14)
+
+        head = QHBoxLayout()
+        title = QLabel("This week")
+        title.setObjectName("DashTitle")
+        back = QPushButton("Back")
+        back.setObjectName("GhostButton")
+        back.clicked.connect(self.back.emit)
+        head.addWidget(title)
+        head.addStretch()
+        head.addWidget(back)
+        layout.addLayout(head)
+
+        self._artists = self._card(layout, "Top artists")
+        self._albums = self._card(layout, "Top albums")
+        self._days = self._card(layout, "Per day")
+        layout.addStretch()
+
+    def _card(self, layout: QVBoxLayout, heading: str) -> QVBoxLayout:
+        card = QFrame()
+        card.setObjectName("GlassCard")
+        v = QVBoxLayout(card)
+        v.setContentsMargins(18, 14, 18, 14)
+        v.setSpacing(6)
+        label = QLabel(heading)
+        label.setObjectName("DashMuted")
+        v.addWidget(label)
+        body = QVBoxLayout()
+        body.setSpacing(4)
+        v.addLayout(body)
+        layout.addWidget(card)
+        return body
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._loader is None:
+            self._loader = _StatsLoader(self._stats, self)
+            self._loader.loaded.connect(self._show)
+        if not self._loader.isRunning():
+            self._loader.start()
+
+    @staticmethod
+    def _clear(body: QVBoxLayout):
+        while body.count():
+            item = body.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+
+    @staticmethod
+    def _row(body: QVBoxLayout, left: str, right: str):
+        row = QWidget()
+        h = QHBoxLayout(row)
+        h.setContentsMargins(0, 0, 0, 0)
+        name = QLabel(left)
+        name.setObjectName("StatName")
+        value = QLabel(right)
+        value.setObjectName("StatValue")
+        h.addWidget(name, 1)
+        h.addWidget(value, 0, Qt.AlignRight)
+        body.addWidget(row)
+
+    def _show(self, data: dict):
+        for body in (self._artists, self._albums, self._days):
+            self._clear(body)
+
+        for artist, plays, seconds in data["artists"] or [("No plays yet", 0, 0)]:
+            self._row(self._artists, artist, _hours(seconds) if plays else "")
+        for album, artist, plays, seconds in data["albums"] or [("—", "", 0, 0)]:
+            self._row(self._albums, f"{album} · {artist}" if artist else album, _hours(seconds) if plays else "")
+
+        most = max([seconds for _, seconds in data["days"]] + [1.0])
+        for day, seconds in data["days"]:
+            row = QWidget()
+            h = QHBoxLayout(row)
+            h.setContentsMargins(0, 0, 0, 0)
+            label = QLabel(day.strftime("%a"))
+            label.setObjectName("StatName")
+            label.setFixedWidth(40)
+            bar = QProgressBar()
+            bar.setObjectName("TrackProgress")
+            bar.setRange(0, 1000)
+            bar.setValue(int(1000 * seconds / most))
+            bar.setTextVisible(False)
+            bar.setFixedHeight(8)
+            value = QLabel(_hours(seconds))
+            value.setObjectName("StatValue")
+            value.setFixedWidth(60)
+            value.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            h.addWidget(label)
+            h.addWidget(bar, 1)
+            h.addWidget(value)
+            self._days.addWidget(row)